@@ -1,32 +1,80 @@
-from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Request, UploadFile
-from fastapi.responses import JSONResponse
+import hashlib
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.auth import require_moderator, require_requester_token
 from app.core.config import settings
 from app.core.errors import AppError, BadRequestError, UnauthorizedError
+from app.core.metrics import CACHE_BYTES, CACHE_ENTRIES, REGISTRY
 from app.models.schemas import (
     ChallengeDetail,
     ChallengeResponse,
     ChallengeSummary,
     CreateChallengeRequest,
+    JobResponse,
+    MergeQueueItem,
     SubmissionItem,
     SyncResponse,
     WebhookResponse,
 )
 from app.services.challenge_service import ChallengeService
+from app.services.webhook_queue import WebhookDispatcher
 from app.services.webhook_service import WebhookService
 
 
-def build_router(challenge_service: ChallengeService, webhook_service: WebhookService) -> APIRouter:
+def _accepted(job: dict) -> JSONResponse:
+    return JSONResponse(status_code=202, content=job, headers={"Location": f"/api/v1/jobs/{job['job_id']}"})
+
+
+def build_router(
+    challenge_service: ChallengeService,
+    webhook_service: WebhookService,
+    webhooks: Optional[WebhookDispatcher] = None,
+) -> APIRouter:
     router = APIRouter(prefix="/api/v1")
 
     @router.get("/health")
-    def health():
+    async def health():
         return {"success": True, "status": "ok"}
 
+    @router.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        # Prometheus text exposition; values are per process.
+        size = challenge_service.cache.stats()
+        CACHE_ENTRIES.set(size["entries"])
+        CACHE_BYTES.set(size["bytes"])
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+    @router.get("/stats/github")
+    async def github_stats(_=Depends(require_moderator)):
+        return challenge_service.github.stats()
+
+    @router.get("/stats/challenges")
+    async def challenge_stats(_=Depends(require_moderator)):
+        return challenge_service.stats()
+
+    @router.get("/stats/webhooks")
+    async def webhook_stats(_=Depends(require_moderator)):
+        return {**(webhooks.stats() if webhooks else {}), "auto_merge": webhook_service.stats()}
+
     @router.post("/challenges", response_model=ChallengeResponse)
-    def create_challenge(payload: CreateChallengeRequest, _=Depends(require_moderator)):
-        return challenge_service.create_challenge(payload.title, payload.description, payload.version_count)
+    async def create_challenge(
+        payload: CreateChallengeRequest,
+        run_async: bool = Query(False, alias="async"),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+        _=Depends(require_moderator),
+    ):
+        if run_async:
+            return _accepted(
+                challenge_service.submit_challenge_job(
+                    payload.title, payload.description, payload.version_count, idempotency_key=idempotency_key
+                )
+            )
+        return await challenge_service.create_challenge(
+            payload.title, payload.description, payload.version_count, idempotency_key=idempotency_key
+        )
 
     @router.post("/challenges/request")
     async def create_challenge_by_requester(
@@ -34,45 +82,82 @@ def build_router(challenge_service: ChallengeService, webhook_service: WebhookSe
         description: str = Form(...),
         version_count: int = Form(2),
         problem_file: UploadFile = File(...),
+        run_async: bool = Query(False, alias="async"),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
         requester_token: str = Depends(require_requester_token),
     ):
         content = (await problem_file.read()).decode("utf-8", errors="ignore")
         if not content.strip():
             raise BadRequestError("problem file cannot be empty")
-        return challenge_service.create_challenge_for_requester(
+        if run_async:
+            return _accepted(
+                challenge_service.submit_requester_challenge_job(
+                    title=title,
+                    description=description,
+                    requester_token=requester_token,
+                    problem_filename=problem_file.filename or "problem.md",
+                    problem_content=content,
+                    version_count=version_count,
+                    idempotency_key=idempotency_key,
+                )
+            )
+        return await challenge_service.create_challenge_for_requester(
             title=title,
             description=description,
             requester_token=requester_token,
             problem_filename=problem_file.filename or "problem.md",
             problem_content=content,
             version_count=version_count,
+            idempotency_key=idempotency_key,
         )
 
+    @router.get("/jobs/{job_id}", response_model=JobResponse)
+    async def get_job(job_id: str):
+        # Job ids are unguessable; holding one is what grants access to its status.
+        return challenge_service.jobs.get(job_id)
+
     @router.get("/challenges", response_model=list[ChallengeSummary])
-    def list_challenges():
-        return challenge_service.list_challenges()
+    async def list_challenges(
+        response: Response,
+        limit: Optional[int] = Query(None, ge=1, le=100),
+        cursor: Optional[str] = None,
+        sort: str = "name",
+        order: Optional[str] = None,
+        q: str = "",
+    ):
+        # The body stays a plain list; paging state travels in headers.
+        page = await challenge_service.page_challenges(limit=limit, cursor=cursor, sort=sort, order=order, query=q)
+        response.headers["X-Total-Count"] = str(page["total"])
+        if page["next_cursor"]:
+            response.headers["X-Next-Cursor"] = page["next_cursor"]
+        return page["items"]
 
     @router.get("/challenges/{challenge_id}", response_model=ChallengeDetail)
-    def get_challenge(challenge_id: str):
-        return challenge_service.get_challenge_detail(challenge_id)
+    async def get_challenge(challenge_id: str):
+        return await challenge_service.get_challenge_detail(challenge_id)
 
     @router.get("/challenges/{challenge_id}/submissions", response_model=list[SubmissionItem])
-    def list_submissions(challenge_id: str):
-        return challenge_service.list_submissions(challenge_id)
+    async def list_submissions(challenge_id: str):
+        return await challenge_service.list_submissions(challenge_id)
+
+    @router.get("/challenges/{challenge_id}/merge-queue", response_model=list[MergeQueueItem])
+    async def get_merge_queue(challenge_id: str):
+        # PRs waiting for auto-merge per version branch; position 0 is being merged.
+        return webhook_service.merge_queue.positions(settings.github_org, challenge_id)
 
     @router.post("/challenges/{challenge_id}/sync", response_model=SyncResponse)
-    def sync_challenge(challenge_id: str, _=Depends(require_moderator)):
-        return challenge_service.sync_challenge(challenge_id)
+    async def sync_challenge(challenge_id: str, _=Depends(require_moderator)):
+        return await challenge_service.sync_challenge(challenge_id)
 
     @router.post("/challenges/{challenge_id}/pulls/{pull_number}/evaluate")
-    def evaluate_pull(
+    async def evaluate_pull(
         challenge_id: str,
         pull_number: int,
         requester_token: str = Depends(require_requester_token),
     ):
-        if not challenge_service.requester_can_operate_pull(challenge_id, pull_number, requester_token):
+        if not await challenge_service.requester_can_operate_pull(challenge_id, pull_number, requester_token):
             raise UnauthorizedError("requester is not allowed to evaluate this pull request")
-        return webhook_service.evaluate_pull(
+        return await webhook_service.evaluate_pull(
             owner=settings.github_org,
             repo=challenge_id,
             pull_number=pull_number,
@@ -81,8 +166,10 @@ def build_router(challenge_service: ChallengeService, webhook_service: WebhookSe
     @router.post("/webhooks/github", response_model=WebhookResponse)
     async def github_webhook(
         request: Request,
+        response: Response,
         x_github_event: str = Header(default=""),
         x_hub_signature_256: str = Header(default=""),
+        x_github_delivery: str = Header(default=""),
     ):
         raw = await request.body()
         if not webhook_service.verify_signature(raw, x_hub_signature_256):
@@ -92,11 +179,26 @@ def build_router(challenge_service: ChallengeService, webhook_service: WebhookSe
             raise HTTPException(status_code=400, detail="missing x-github-event")
 
         payload = await request.json()
-        result = webhook_service.process(x_github_event, payload)
-        return WebhookResponse(ok=result.get("ok", True), action=result.get("action", ""), processed=result.get("processed", False))
+        if webhooks is None:
+            result = await webhook_service.process(x_github_event, payload)
+            return WebhookResponse(ok=result.get("ok", True), action=result.get("action", ""), processed=result.get("processed", False))
+
+        # Acknowledge as soon as the delivery is durably queued; workers run the handlers.
+        if not isinstance(payload, dict):
+            raise BadRequestError("webhook payload must be a JSON object")
+        delivery_id = x_github_delivery or hashlib.sha256(raw).hexdigest()
+        accepted = webhooks.submit(delivery_id, x_github_event, raw)
+        response.status_code = 202
+        return WebhookResponse(
+            ok=True,
+            action=payload.get("action", ""),
+            processed=False,
+            delivery_id=delivery_id,
+            duplicate=not accepted,
+        )
 
     @router.get("/")
-    def root():
+    async def root():
         return {"name": "SciLand MVP API", "version": "1.0.0"}
 
     return router
@@ -9,14 +9,61 @@ class Settings(BaseSettings):
     github_token: str = Field("", env="GITHUB_TOKEN")
     github_org: str = Field("SciLand-9", env="GITHUB_ORG")
     github_api_base: str = Field("https://api.github.com", env="GITHUB_API_BASE")
+    github_graphql_enabled: bool = Field(True, env="GITHUB_GRAPHQL_ENABLED")
+    # Empty derives it from GITHUB_API_BASE (`.../api/v3` -> `.../api/graphql` on GHES).
+    github_graphql_url: str = Field("", env="GITHUB_GRAPHQL_URL")
+    github_http2: bool = Field(True, env="GITHUB_HTTP2")
+    github_max_connections: int = Field(100, env="GITHUB_MAX_CONNECTIONS")
+    github_max_keepalive_connections: int = Field(20, env="GITHUB_MAX_KEEPALIVE_CONNECTIONS")
+    github_keepalive_expiry_seconds: float = Field(30.0, env="GITHUB_KEEPALIVE_EXPIRY_SECONDS")
+    github_timeout_seconds: float = Field(30.0, env="GITHUB_TIMEOUT_SECONDS")
+    github_pagination_concurrency: int = Field(8, env="GITHUB_PAGINATION_CONCURRENCY")
+    github_conditional_cache_size: int = Field(2000, env="GITHUB_CONDITIONAL_CACHE_SIZE")
+    github_rate_limit_reserve: int = Field(100, env="GITHUB_RATE_LIMIT_RESERVE")
+    github_rate_limit_pacing_threshold: int = Field(500, env="GITHUB_RATE_LIMIT_PACING_THRESHOLD")
+    github_rate_limit_max_retries: int = Field(3, env="GITHUB_RATE_LIMIT_MAX_RETRIES")
+    github_secondary_backoff_seconds: float = Field(60.0, env="GITHUB_SECONDARY_BACKOFF_SECONDS")
 
     moderator_api_key: str = Field("", env="MODERATOR_API_KEY")
     webhook_secret: str = Field("", env="GITHUB_WEBHOOK_SECRET")
 
+    requester_identity_cache_size: int = Field(1024, env="REQUESTER_IDENTITY_CACHE_SIZE")
+    requester_identity_ttl_seconds: int = Field(300, env="REQUESTER_IDENTITY_TTL_SECONDS")
+
     challenge_repo_prefix: str = Field("challenge", env="CHALLENGE_REPO_PREFIX")
+    branch_setup_concurrency: int = Field(8, env="BRANCH_SETUP_CONCURRENCY")
 
+    cache_backend: str = Field("file", env="CACHE_BACKEND")
     cache_ttl_seconds: int = Field(30, env="CACHE_TTL_SECONDS")
+    cache_stale_seconds: int = Field(300, env="CACHE_STALE_SECONDS")
+    cache_sqlite_path: str = Field("data/cache.sqlite3", env="CACHE_SQLITE_PATH")
     cache_file: str = Field("data/webhook_cache.json", env="CACHE_FILE")
+    cache_flush_interval_seconds: float = Field(1.0, env="CACHE_FLUSH_INTERVAL_SECONDS")
+    cache_flush_batch_size: int = Field(100, env="CACHE_FLUSH_BATCH_SIZE")
+    cache_compact_every: int = Field(1000, env="CACHE_COMPACT_EVERY")
+    cache_max_entries: int = Field(5000, env="CACHE_MAX_ENTRIES")
+    cache_max_bytes: int = Field(50 * 1024 * 1024, env="CACHE_MAX_BYTES")
+    cache_sweep_interval_seconds: float = Field(60.0, env="CACHE_SWEEP_INTERVAL_SECONDS")
+    challenge_index_file: str = Field("data/challenge_index.json", env="CHALLENGE_INDEX_FILE")
+    challenge_index_reconcile_seconds: float = Field(900.0, env="CHALLENGE_INDEX_RECONCILE_SECONDS")
+    submission_store_dir: str = Field("data/submissions", env="SUBMISSION_STORE_DIR")
+    submission_poll_seconds: float = Field(60.0, env="SUBMISSION_POLL_SECONDS")
+    challenge_job_concurrency: int = Field(2, env="CHALLENGE_JOB_CONCURRENCY")
+    challenge_job_max_pending: int = Field(100, env="CHALLENGE_JOB_MAX_PENDING")
+    challenge_job_retention_seconds: float = Field(3600.0, env="CHALLENGE_JOB_RETENTION_SECONDS")
+    provisioning_dir: str = Field("data/provisioning", env="PROVISIONING_DIR")
+    provisioning_retention_seconds: float = Field(604800.0, env="PROVISIONING_RETENTION_SECONDS")
+    webhook_queue_path: str = Field("data/webhooks.sqlite3", env="WEBHOOK_QUEUE_PATH")
+    webhook_workers: int = Field(4, env="WEBHOOK_WORKERS")
+    webhook_max_attempts: int = Field(5, env="WEBHOOK_MAX_ATTEMPTS")
+    webhook_retry_seconds: float = Field(10.0, env="WEBHOOK_RETRY_SECONDS")
+    webhook_lease_seconds: float = Field(300.0, env="WEBHOOK_LEASE_SECONDS")
+    webhook_retention_seconds: float = Field(604800.0, env="WEBHOOK_RETENTION_SECONDS")
+    merge_debounce_seconds: float = Field(2.0, env="MERGE_DEBOUNCE_SECONDS")
+    merge_queue_max_attempts: int = Field(3, env="MERGE_QUEUE_MAX_ATTEMPTS")
+    merge_queue_retry_seconds: float = Field(2.0, env="MERGE_QUEUE_RETRY_SECONDS")
+    check_run_store_path: str = Field("data/check_runs.sqlite3", env="CHECK_RUN_STORE_PATH")
+    check_run_retention_seconds: float = Field(604800.0, env="CHECK_RUN_RETENTION_SECONDS")
 
     class Config:
         env_file = ".env"
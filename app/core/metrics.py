@@ -0,0 +1,185 @@
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Sequence, Tuple
+
+from app.core.config import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        ...
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            # [bucket counts..., sum, count]
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels: str) -> float:
+        series = self._series.get(self._key(labels))
+        return series[-1] if series else 0.0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            for index, bound in enumerate(self.buckets):
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {_format_value(series[index])}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {_format_value(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+CACHE_LOOKUPS = REGISTRY.register(
+    Counter("sciland_cache_lookups_total", "Cache lookups by key family and result (hit, stale, miss, expired).", ["family", "result"])
+)
+CACHE_FLUSH_SECONDS = REGISTRY.register(
+    Histogram("sciland_cache_flush_seconds", "Time spent persisting cache mutations to disk.")
+)
+CACHE_ENTRIES = REGISTRY.register(Gauge("sciland_cache_entries", "Entries currently held by the cache."))
+CACHE_BYTES = REGISTRY.register(Gauge("sciland_cache_bytes", "Approximate serialized size of the cache."))
+GITHUB_REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "sciland_github_request_seconds",
+        "GitHub API request latency by method, endpoint template and status.",
+        ["method", "endpoint", "status"],
+    )
+)
+GITHUB_RATE_LIMIT_REMAINING = REGISTRY.register(
+    Gauge("sciland_github_rate_limit_remaining", "Remaining core REST rate-limit budget reported by GitHub.")
+)
+WEBHOOK_PROCESSING_SECONDS = REGISTRY.register(
+    Histogram("sciland_webhook_processing_seconds", "Webhook processing time by GitHub event type.", ["event"])
+)
+AUTO_MERGE_TRIGGERS = REGISTRY.register(
+    Counter(
+        "sciland_auto_merge_triggers_total",
+        "Auto-merge triggers from webhooks by outcome (evaluated, scheduled, coalesced, stale).",
+        ["outcome"],
+    )
+)
+
+_ENDPOINT_PATTERNS = [
+    (re.compile(r"^/repos/[^/]+/[^/]+"), "/repos/{owner}/{repo}"),
+    (re.compile(r"^/orgs/[^/]+"), "/orgs/{org}"),
+    (re.compile(r"/git/refs/heads/.+$"), "/git/refs/heads/{branch}"),
+    (re.compile(r"/branches/.+/protection$"), "/branches/{branch}/protection"),
+    (re.compile(r"/branches/(?!\{branch\}).+$"), "/branches/{branch}"),
+    (re.compile(r"/contents/.+$"), "/contents/{path}"),
+    (re.compile(r"/commits/[^/]+"), "/commits/{ref}"),
+    (re.compile(r"/collaborators/[^/]+"), "/collaborators/{username}"),
+    (re.compile(r"/\d+(?=/|$)"), "/{id}"),
+]
+
+
+def endpoint_template(path: str) -> str:
+    # Collapses concrete paths into low-cardinality labels, e.g.
+    # /repos/SciLand-9/challenge-x/pulls/12/merge -> /repos/{owner}/{repo}/pulls/{id}/merge
+    template = path.split("?", 1)[0]
+    for pattern, replacement in _ENDPOINT_PATTERNS:
+        template = pattern.sub(replacement, template)
+    return template
+
+
+def cache_key_family(key: str) -> str:
+    # challenge:detail:challenge-demo-abc123 -> challenge:detail
+    prefix = f"{settings.challenge_repo_prefix}-"
+    parts = [part for part in key.split(":") if not part.startswith(prefix)]
+    return ":".join(parts) or key
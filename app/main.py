@@ -1,28 +1,82 @@
+from contextlib import asynccontextmanager
+from typing import Optional
+
 from fastapi import FastAPI
 
 from app.api.routes import build_router, register_exception_handlers
 from app.core.config import settings
 from app.core.errors import AppError
-from app.services.cache_store import CacheStore
+from app.services.cache_store import create_cache_store
+from app.services.challenge_index import ChallengeIndex
 from app.services.challenge_service import ChallengeService
+from app.services.check_run_store import CheckRunStore
 from app.services.github_client import GithubClient
+from app.services.job_service import JobService
+from app.services.merge_queue import MergeQueue
+from app.services.provisioning_store import ProvisioningStore
+from app.services.submission_store import SubmissionStore
+from app.services.webhook_queue import WebhookDispatcher, WebhookQueue
 from app.services.webhook_service import WebhookService
 
 
-def create_app() -> FastAPI:
+def create_app(github: Optional[GithubClient] = None) -> FastAPI:
     if not settings.github_token:
         raise AppError("Missing required env var: GITHUB_TOKEN", 500)
     if not settings.moderator_api_key:
         raise AppError("Missing required env var: MODERATOR_API_KEY", 500)
 
-    app = FastAPI(title=settings.app_name)
+    cache = create_cache_store()
+    github = github or GithubClient()
+    index = ChallengeIndex(settings.challenge_index_file)
+    submissions = SubmissionStore(settings.submission_store_dir)
+    jobs = JobService(
+        concurrency=settings.challenge_job_concurrency,
+        max_pending=settings.challenge_job_max_pending,
+        retention_seconds=settings.challenge_job_retention_seconds,
+    )
+    provisioning = ProvisioningStore(settings.provisioning_dir, settings.provisioning_retention_seconds)
+    challenge_service = ChallengeService(
+        github=github,
+        cache=cache,
+        index=index,
+        submissions=submissions,
+        jobs=jobs,
+        provisioning=provisioning,
+    )
+    webhook_queue = WebhookQueue(
+        settings.webhook_queue_path,
+        max_attempts=settings.webhook_max_attempts,
+        retry_seconds=settings.webhook_retry_seconds,
+        lease_seconds=settings.webhook_lease_seconds,
+        retention_seconds=settings.webhook_retention_seconds,
+    )
+    webhook_service = WebhookService(
+        github=github,
+        cache=cache,
+        index=index,
+        submissions=submissions,
+        check_runs=CheckRunStore(settings.check_run_store_path, settings.check_run_retention_seconds),
+        merge_queue=MergeQueue(settings.merge_queue_max_attempts, settings.merge_queue_retry_seconds),
+        merge_debounce_seconds=settings.merge_debounce_seconds,
+        queue=webhook_queue,
+    )
+    webhooks = WebhookDispatcher(webhook_queue, webhook_service, workers=settings.webhook_workers)
+
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI):
+        # Also started lazily by the first delivery, for servers that skip the lifespan.
+        webhooks.start()
+        yield
+        await webhooks.close()
+        await webhook_service.close()
+        await jobs.close()
+        await github.aclose()
+        cache.close()
 
-    cache = CacheStore(settings.cache_file, settings.cache_ttl_seconds)
-    github = GithubClient()
-    challenge_service = ChallengeService(github=github, cache=cache)
-    webhook_service = WebhookService(github=github, cache=cache)
+    app = FastAPI(title=settings.app_name, lifespan=lifespan)
+    app.state.webhooks = webhooks
 
-    app.include_router(build_router(challenge_service, webhook_service))
+    app.include_router(build_router(challenge_service, webhook_service, webhooks))
     register_exception_handlers(app)
 
     return app
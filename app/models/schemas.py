@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -13,6 +13,8 @@ class ChallengeResponse(BaseModel):
     challenge_id: str
     repo_url: str
     branches: List[str]
+    # Branch -> why it was left unprotected.
+    protection_failures: Dict[str, str] = {}
 
 
 class ChallengeSummary(BaseModel):
@@ -20,6 +22,9 @@ class ChallengeSummary(BaseModel):
     title: str
     repo_url: str
     default_branch: str
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    submission_count: Optional[int] = None
 
 
 class SubmissionItem(BaseModel):
@@ -48,7 +53,30 @@ class SyncResponse(BaseModel):
     submission_count: int
 
 
+class MergeQueueItem(BaseModel):
+    base_ref: str
+    pull_number: int
+    head_sha: str
+    position: int
+    attempts: int
+    enqueued_at: float
+
+
 class WebhookResponse(BaseModel):
     ok: bool
     action: str
     processed: bool
+    delivery_id: Optional[str] = None
+    duplicate: Optional[bool] = None
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    progress: Dict[str, Any]
+    result: Optional[Dict[str, Any]]
+    error: Optional[Dict[str, Any]]
+    created_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
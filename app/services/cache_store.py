@@ -2,57 +2,281 @@ import json
 import os
 import threading
 import time
-from typing import Any, Dict, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
+from app.core.config import settings
+from app.core.errors import AppError
+from app.core.metrics import CACHE_FLUSH_SECONDS, CACHE_LOOKUPS, cache_key_family
 
-class CacheStore:
-    def __init__(self, file_path: str, ttl_seconds: int = 30):
+HIT = "hit"
+STALE = "stale"
+MISS = "miss"
+EXPIRED = "expired"
+
+
+class CacheStore(ABC):
+    # Backend-neutral cache API used by the services. Values must be JSON-serializable.
+    # Entries are fresh for `ttl_seconds`, then stale (kept, but only returned by lookup())
+    # for another `stale_seconds` before they expire.
+    ttl_seconds: int
+    stale_seconds: int = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        value, stale = self.lookup(key)
+        return None if stale else value
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], bool]:
+        value, result = self._lookup(key)
+        CACHE_LOOKUPS.inc(family=cache_key_family(key), result=result)
+        return value, result == STALE
+
+    @abstractmethod
+    def _lookup(self, key: str) -> Tuple[Optional[Any], str]:
+        # Returns (value, result) where result is one of HIT, STALE, MISS or EXPIRED.
+        ...
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": 0, "bytes": 0}
+
+    @abstractmethod
+    def set(self, key: str, value: Any):
+        ...
+
+    @abstractmethod
+    def clear(self, key: str):
+        ...
+
+    def close(self):
+        return None
+
+
+# In-memory cache persisted write-behind: get/set/clear only touch memory, and a background
+# thread appends mutations to `<file>.log` in batches. The log is periodically compacted into
+# the JSON snapshot at `file_path`; on startup the snapshot is loaded and the log replayed.
+# Entries are kept in LRU order and bounded by `max_entries` / `max_bytes` (serialized size);
+# the same background thread sweeps expired entries every `sweep_interval_seconds`.
+# Each process keeps its own copy, so this backend is for single-worker deployments.
+class FileCacheStore(CacheStore):
+    def __init__(
+        self,
+        file_path: str,
+        ttl_seconds: int = 30,
+        stale_seconds: int = 0,
+        flush_interval_seconds: float = 1.0,
+        flush_batch_size: int = 100,
+        compact_every: int = 1000,
+        max_entries: int = 5000,
+        max_bytes: int = 50 * 1024 * 1024,
+        sweep_interval_seconds: float = 60.0,
+    ):
         self.file_path = file_path
+        self.log_path = f"{file_path}.log"
         self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.flush_interval_seconds = flush_interval_seconds
+        self.flush_batch_size = flush_batch_size
+        self.compact_every = compact_every
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval_seconds = sweep_interval_seconds
         self._lock = threading.Lock()
-        self._data: Dict[str, Dict[str, Any]] = {}
+        self._flush_lock = threading.Lock()
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._pending: List[str] = []
+        self._last_sweep = time.monotonic()
+        self._log_entries = 0
+        self._wake = threading.Event()
+        self._closed = False
         self._load()
+        self._flusher = threading.Thread(target=self._run_flusher, name="cache-store-flusher", daemon=True)
+        self._flusher.start()
 
     def _load(self):
-        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-        if not os.path.exists(self.file_path):
-            self._flush()
-            return
-        try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                raw = json.load(f)
-                if isinstance(raw, dict):
-                    self._data = raw
-        except Exception:
-            self._data = {}
-            self._flush()
-
-    def _flush(self):
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.file_path):
+            try:
+                with open(self.file_path, "r", encoding="utf-8") as f:
+                    raw = json.load(f)
+                    if isinstance(raw, dict):
+                        self._data = OrderedDict(raw)
+            except Exception:
+                self._data = OrderedDict()
+        else:
+            self._write_snapshot(self._data)
+
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn final line from a crash mid-append; everything before it is intact.
+                        break
+                    self._apply(entry)
+        self._sizes = {key: len(json.dumps(item, ensure_ascii=True)) for key, item in self._data.items()}
+        self._bytes = sum(self._sizes.values())
+        self._sweep_expired(time.time())
+        self._evict_over_budget()
+        dropped = bool(self._pending)
+        self._pending = []
+
+        if dropped or os.path.exists(self.log_path):
+            # Fold the replayed log into the snapshot so new appends never follow a torn line.
+            self._write_snapshot(self._data)
+            with open(self.log_path, "w", encoding="utf-8"):
+                pass
+
+    def _apply(self, entry: Dict[str, Any]):
+        if entry.get("op") == "set":
+            self._data[entry["key"]] = {"updated_at": entry["updated_at"], "value": entry["value"]}
+            self._data.move_to_end(entry["key"])
+        elif entry.get("op") == "clear":
+            self._data.pop(entry["key"], None)
+
+    def _is_expired(self, item: Dict[str, Any], now: float) -> bool:
+        return now - item.get("updated_at", 0) > self.ttl_seconds + self.stale_seconds
+
+    def _remove(self, key: str):
+        # Caller holds self._lock.
+        self._data.pop(key, None)
+        self._bytes -= self._sizes.pop(key, 0)
+        self._pending.append(json.dumps({"op": "clear", "key": key}, ensure_ascii=True))
+
+    def _evict_over_budget(self):
+        # Caller holds self._lock. The newest entry is always kept, even if it alone is over budget.
+        while len(self._data) > 1 and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._data)))
+
+    def _sweep_expired(self, now: float):
+        # Caller holds self._lock.
+        for key in [key for key, item in self._data.items() if self._is_expired(item, now)]:
+            self._remove(key)
+
+    def sweep(self):
+        with self._lock:
+            self._sweep_expired(time.time())
+        self._last_sweep = time.monotonic()
+
+    def _write_snapshot(self, data: Dict[str, Any]):
         temp_path = f"{self.file_path}.tmp"
         with open(temp_path, "w", encoding="utf-8") as f:
-            json.dump(self._data, f, ensure_ascii=True, indent=2)
+            json.dump(data, f, ensure_ascii=True)
             f.write("\n")
         os.replace(temp_path, self.file_path)
 
-    def get(self, key: str) -> Optional[Any]:
+    def _run_flusher(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval_seconds)
+            self._wake.clear()
+            try:
+                if time.monotonic() - self._last_sweep >= self.sweep_interval_seconds:
+                    self.sweep()
+                self.flush()
+            except OSError:
+                continue
+
+    def flush(self, compact: bool = False):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                compact = compact or self._log_entries + len(pending) >= self.compact_every
+                snapshot = dict(self._data) if compact else None
+            if not pending and snapshot is None:
+                return
+
+            started = time.perf_counter()
+            try:
+                if pending:
+                    with open(self.log_path, "a", encoding="utf-8") as f:
+                        f.write("".join(line + "\n" for line in pending))
+                if snapshot is not None:
+                    # The snapshot already contains every logged mutation, so the log can restart.
+                    self._write_snapshot(snapshot)
+                    with open(self.log_path, "w", encoding="utf-8"):
+                        pass
+                    self._log_entries = 0
+                else:
+                    self._log_entries += len(pending)
+            except OSError:
+                with self._lock:
+                    self._pending = pending + self._pending
+                raise
+            CACHE_FLUSH_SECONDS.observe(time.perf_counter() - started)
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self._flusher.join(timeout=5)
+        self.flush(compact=True)
+
+    def _lookup(self, key: str) -> Tuple[Optional[Any], str]:
         with self._lock:
             item = self._data.get(key)
             if not item:
-                return None
-            if time.time() - item.get("updated_at", 0) > self.ttl_seconds:
-                return None
-            return item.get("value")
+                return None, MISS
+            now = time.time()
+            if self._is_expired(item, now):
+                self._remove(key)
+                return None, EXPIRED
+            self._data.move_to_end(key)
+            return item.get("value"), STALE if now - item.get("updated_at", 0) > self.ttl_seconds else HIT
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self._bytes}
 
     def set(self, key: str, value: Any):
+        updated_at = time.time()
+        # Serialized once: the line is both the size estimate and the log record.
+        line = json.dumps({"op": "set", "key": key, "updated_at": updated_at, "value": value}, ensure_ascii=True)
         with self._lock:
+            self._bytes -= self._sizes.pop(key, 0)
             self._data[key] = {
-                "updated_at": time.time(),
+                "updated_at": updated_at,
                 "value": value,
             }
-            self._flush()
+            self._data.move_to_end(key)
+            self._sizes[key] = len(line)
+            self._bytes += len(line)
+            self._pending.append(line)
+            self._evict_over_budget()
+            backlog = len(self._pending)
+        if backlog >= self.flush_batch_size:
+            self._wake.set()
 
     def clear(self, key: str):
         with self._lock:
             if key in self._data:
-                self._data.pop(key, None)
-                self._flush()
+                self._remove(key)
+
+
+def create_cache_store() -> CacheStore:
+    if settings.cache_backend == "sqlite":
+        from app.services.sqlite_cache_store import SqliteCacheStore
+
+        return SqliteCacheStore(
+            settings.cache_sqlite_path,
+            settings.cache_ttl_seconds,
+            stale_seconds=settings.cache_stale_seconds,
+            max_entries=settings.cache_max_entries,
+            sweep_interval_seconds=settings.cache_sweep_interval_seconds,
+        )
+    if settings.cache_backend != "file":
+        raise AppError(f"Unsupported CACHE_BACKEND: {settings.cache_backend}", 500)
+    return FileCacheStore(
+        settings.cache_file,
+        settings.cache_ttl_seconds,
+        stale_seconds=settings.cache_stale_seconds,
+        flush_interval_seconds=settings.cache_flush_interval_seconds,
+        flush_batch_size=settings.cache_flush_batch_size,
+        compact_every=settings.cache_compact_every,
+        max_entries=settings.cache_max_entries,
+        max_bytes=settings.cache_max_bytes,
+        sweep_interval_seconds=settings.cache_sweep_interval_seconds,
+    )
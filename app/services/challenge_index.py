@@ -0,0 +1,292 @@
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.services.storage import write_json_atomic
+
+# Sort name -> entry field; "name" orders by challenge_id alone.
+SORT_FIELDS = {"name": None, "created": "created_at", "updated": "updated_at", "submissions": "submission_count"}
+SEARCH_FIELDS = ("challenge_id", "title", "description")
+
+
+def index_entry(repo: Dict[str, Any]) -> Dict[str, Any]:
+    # Same shape for REST repo payloads and `repository` webhook payloads.
+    name = repo.get("name", "")
+    return {
+        "challenge_id": name,
+        "title": repo.get("description") or name,
+        "repo_url": repo.get("html_url"),
+        "default_branch": repo.get("default_branch", "main"),
+        "created_at": repo.get("created_at"),
+        "updated_at": repo.get("updated_at"),
+    }
+
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+
+# Local index of the org's challenge repos, keyed by repo name. It is seeded by one full org
+# scan, then kept current by challenge creation and `repository` webhooks; a periodic
+# reconciliation scan replaces it wholesale to repair any drift (missed or failed deliveries).
+# Each upsert and removal records when it happened, so one made after a scan started wins
+# over that scan's result. Fields learned from challenge detail (description,
+# submission_count) are kept across scans.
+# The index is persisted as a JSON snapshot at `file_path` (None keeps it in memory only).
+# Workers sharing the file pick up each other's writes by reloading when its mtime changes.
+#
+# For listing, an inverted index maps search tokens to challenge ids and one sorted
+# (sort key, challenge_id) list per sort order is built lazily after each mutation, so a page
+# is a bisect plus a slice rather than a scan of every challenge.
+class ChallengeIndex:
+    def __init__(self, file_path: Optional[str] = None):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # challenge_id -> time of its last upsert or removal since the last scan.
+        self._touched: Dict[str, float] = {}
+        self._reconciled_at: Optional[float] = None
+        self._mtime: Optional[float] = None
+        self._postings: Dict[str, Set[str]] = {}
+        self._tokens: Dict[str, Set[str]] = {}
+        self._vocabulary: Optional[List[str]] = None
+        self._orders: Dict[str, List[Tuple[Any, str]]] = {}
+        self._load()
+
+    def _load(self):
+        if not self.file_path:
+            return
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            mtime = os.stat(self.file_path).st_mtime
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(raw, dict) and isinstance(raw.get("challenges"), dict):
+            self._entries = raw["challenges"]
+            self._touched = raw.get("touched") or {}
+            self._reconciled_at = raw.get("reconciled_at")
+            self._mtime = mtime
+            self._rebuild()
+
+    def _refresh(self):
+        # Caller holds self._lock.
+        if not self.file_path:
+            return
+        try:
+            mtime = os.stat(self.file_path).st_mtime
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self._load()
+
+    def _persist(self):
+        # Caller holds self._lock.
+        if not self.file_path:
+            return
+        self._mtime = write_json_atomic(
+            self.file_path,
+            {"reconciled_at": self._reconciled_at, "touched": self._touched, "challenges": self._entries},
+        )
+
+    def _rebuild(self):
+        # Caller holds self._lock.
+        self._postings = {}
+        self._tokens = {}
+        for challenge_id, entry in self._entries.items():
+            self._index_tokens(challenge_id, entry)
+        self._vocabulary = None
+        self._orders = {}
+
+    def _index_tokens(self, challenge_id: str, entry: Dict[str, Any]):
+        # Caller holds self._lock.
+        tokens = set()
+        for field in SEARCH_FIELDS:
+            tokens.update(tokenize(entry.get(field) or ""))
+        for token in self._tokens.get(challenge_id, set()) - tokens:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.discard(challenge_id)
+                if not postings:
+                    del self._postings[token]
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(challenge_id)
+        self._tokens[challenge_id] = tokens
+        self._vocabulary = None
+
+    def _put(self, challenge_id: str, entry: Dict[str, Any]):
+        # Caller holds self._lock.
+        self._entries[challenge_id] = entry
+        self._index_tokens(challenge_id, entry)
+        self._orders = {}
+
+    def _drop(self, challenge_id: str) -> bool:
+        # Caller holds self._lock.
+        if self._entries.pop(challenge_id, None) is None:
+            return False
+        self._index_tokens(challenge_id, {})
+        self._tokens.pop(challenge_id, None)
+        self._orders = {}
+        return True
+
+    def _sort_key(self, sort: str, challenge_id: str) -> Tuple[Any, str]:
+        field = SORT_FIELDS[sort]
+        if field is None:
+            return "", challenge_id
+        value = self._entries[challenge_id].get(field)
+        if value is None:
+            value = 0 if sort == "submissions" else ""
+        return value, challenge_id
+
+    def _order(self, sort: str) -> List[Tuple[Any, str]]:
+        # Caller holds self._lock.
+        order = self._orders.get(sort)
+        if order is None:
+            order = sorted(self._sort_key(sort, challenge_id) for challenge_id in self._entries)
+            self._orders[sort] = order
+        return order
+
+    def _search(self, query: str) -> Set[str]:
+        # Caller holds self._lock. Every term must match; the last one also matches as a prefix.
+        terms = tokenize(query)
+        matches: Optional[Set[str]] = None
+        for position, term in enumerate(terms):
+            if position == len(terms) - 1:
+                found = self._prefix_postings(term)
+            else:
+                found = self._postings.get(term, set())
+            matches = set(found) if matches is None else matches & found
+            if not matches:
+                return set()
+        return matches if matches is not None else set(self._entries)
+
+    def _prefix_postings(self, prefix: str) -> Set[str]:
+        # Caller holds self._lock.
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        found: Set[str] = set()
+        position = bisect_left(self._vocabulary, prefix)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(prefix):
+            found |= self._postings[self._vocabulary[position]]
+            position += 1
+        return found
+
+    @property
+    def seeded(self) -> bool:
+        with self._lock:
+            self._refresh()
+            return self._reconciled_at is not None
+
+    def reconcile_due(self, interval_seconds: float) -> bool:
+        with self._lock:
+            return self._reconciled_at is None or time.time() - self._reconciled_at >= interval_seconds
+
+    def items(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return [dict(self._entries[key]) for key in sorted(self._entries)]
+
+    def page(
+        self,
+        sort: str = "name",
+        descending: bool = False,
+        after: Optional[Tuple[Any, str]] = None,
+        limit: Optional[int] = 50,
+        query: str = "",
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, str]], int]:
+        # Returns (items, key of the last item when more follow, total matches). `after` is
+        # the key returned by the previous page; it raises TypeError if it does not fit `sort`.
+        # A None limit returns every match after `after`.
+        with self._lock:
+            self._refresh()
+            if query.strip():
+                order = sorted(self._sort_key(sort, challenge_id) for challenge_id in self._search(query))
+            else:
+                order = self._order(sort)
+
+            if limit is None:
+                limit = len(order)
+            if descending:
+                end = bisect_left(order, after) if after is not None else len(order)
+                start = max(0, end - limit)
+                chosen = order[start:end][::-1]
+                more = start > 0
+            else:
+                start = bisect_right(order, after) if after is not None else 0
+                chosen = order[start:start + limit]
+                more = start + limit < len(order)
+            items = [dict(self._entries[challenge_id]) for _, challenge_id in chosen]
+            return items, (chosen[-1] if more and chosen else None), len(order)
+
+    def get(self, challenge_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(challenge_id)
+            return dict(entry) if entry else None
+
+    def upsert(self, entry: Dict[str, Any]):
+        with self._lock:
+            self._refresh()
+            challenge_id = entry["challenge_id"]
+            self._put(challenge_id, {**self._entries.get(challenge_id, {}), **entry})
+            self._touched[challenge_id] = time.time()
+            self._persist()
+
+    def annotate(self, challenge_id: str, **fields: Any):
+        # Records fields learned outside the org scan; only known challenges are touched.
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(challenge_id)
+            if entry is None or all(entry.get(key) == value for key, value in fields.items()):
+                return
+            self._put(challenge_id, {**entry, **fields})
+            self._persist()
+
+    def remove(self, challenge_id: str):
+        with self._lock:
+            self._refresh()
+            # Recorded even when absent, so a scan that listed the repo before it went away
+            # does not bring it back.
+            self._drop(challenge_id)
+            self._touched[challenge_id] = time.time()
+            self._persist()
+
+    def replace_all(self, entries: Iterable[Dict[str, Any]], started_at: Optional[float] = None):
+        # `started_at` is when the scan producing `entries` began; upserts and removals made
+        # since then are applied on top of it.
+        with self._lock:
+            self._refresh()
+            previous = self._entries
+            scanned = {
+                entry["challenge_id"]: {**previous.get(entry["challenge_id"], {}), **entry} for entry in entries
+            }
+            newer = {
+                challenge_id: touched_at
+                for challenge_id, touched_at in self._touched.items()
+                if started_at is not None and touched_at >= started_at
+            }
+            for challenge_id in newer:
+                if challenge_id in previous:
+                    scanned[challenge_id] = {**scanned.get(challenge_id, {}), **previous[challenge_id]}
+                else:
+                    scanned.pop(challenge_id, None)
+            self._entries = scanned
+            self._touched = newer
+            self._reconciled_at = time.time()
+            self._rebuild()
+            self._persist()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "challenges": len(self._entries),
+                "search_terms": len(self._postings),
+                "reconciled_at": self._reconciled_at,
+            }
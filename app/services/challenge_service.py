@@ -1,17 +1,55 @@
+import asyncio
+import base64
+import json
 import re
 import time
-from typing import Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from app.core.config import settings
-from app.core.errors import BadRequestError, NotFoundError
+from app.core.errors import BadRequestError, GithubApiError, NotFoundError
 from app.services.cache_store import CacheStore
+from app.services.challenge_index import SORT_FIELDS, ChallengeIndex, index_entry
 from app.services.github_client import GithubClient
+from app.services.github_scheduler import PRIORITY_LOW
+from app.services.job_service import JobService
+from app.services.provisioning_store import ProvisioningStore, provisioning_key
+from app.services.single_flight import SingleFlight
+from app.services.submission_store import SubmissionStore, to_submission
+
+RECENT_SUBMISSIONS = 20
+# Page size when a cursor is given without a limit.
+DEFAULT_PAGE_SIZE = 50
 
 
 class ChallengeService:
-    def __init__(self, github: GithubClient, cache: CacheStore):
+    def __init__(
+        self,
+        github: GithubClient,
+        cache: CacheStore,
+        index: Optional[ChallengeIndex] = None,
+        submissions: Optional[SubmissionStore] = None,
+        jobs: Optional[JobService] = None,
+        provisioning: Optional[ProvisioningStore] = None,
+    ):
         self.github = github
         self.cache = cache
+        self.index = index or ChallengeIndex()
+        self.submissions = submissions or SubmissionStore()
+        self.jobs = jobs or JobService()
+        self.provisioning = provisioning or ProvisioningStore()
+        self._flights = SingleFlight()
+        self._background = set()
+        # Provision flight key -> shared progress and the callers' progress dicts that mirror it.
+        self._provision_progress: Dict[str, Dict[str, Any]] = {}
+
+    def stats(self) -> Dict:
+        return {
+            "single_flight": self._flights.stats(),
+            "index": self.index.stats(),
+            "submissions": self.submissions.stats(),
+            "jobs": self.jobs.stats(),
+            "provisioning": self.provisioning.pending(),
+        }
 
     def _slugify(self, text: str) -> str:
         slug = re.sub(r"[^a-z0-9]+", "-", text.lower().strip())
@@ -31,9 +69,7 @@ class ChallengeService:
             raise BadRequestError("version_count must be 500 or less")
         return [f"version/v{i}" for i in range(1, version_count + 1)]
 
-    def _extract_version_branches_from_repo(self, owner: str, repo: str) -> List[str]:
-        branches = self.github.list_branches(owner, repo, per_page=100)
-        names = [item.get("name", "") for item in branches]
+    def _filter_version_branches(self, names: List[str]) -> List[str]:
         version_branches = []
         for name in names:
             if re.match(r"^version/v[1-9][0-9]*$", name):
@@ -41,6 +77,10 @@ class ChallengeService:
         version_branches.sort(key=lambda x: int(x.replace("version/v", "", 1)))
         return version_branches
 
+    async def _extract_version_branches_from_repo(self, owner: str, repo: str) -> List[str]:
+        branches = await self.github.list_branches(owner, repo, per_page=100)
+        return self._filter_version_branches([item.get("name", "") for item in branches])
+
     def _build_challenge_md(self, title: str, description: str, version_branches: List[str]) -> str:
         lines = [
             f"# {title}",
@@ -75,70 +115,226 @@ class ChallengeService:
         ]
         return "\n".join(lines)
 
-    def _create_repo_with_branches(self, title: str, description: str, version_count: int = 2) -> Dict:
+    async def _run_per_branch(
+        self,
+        branches: List[str],
+        step: Callable[[str], Awaitable],
+        counter: Optional[Dict[str, int]] = None,
+        on_done: Optional[Callable[[str, Any], None]] = None,
+    ) -> Dict[str, str]:
+        semaphore = asyncio.Semaphore(max(1, settings.branch_setup_concurrency))
+
+        async def run(branch: str):
+            async with semaphore:
+                result = await step(branch)
+            if counter is not None:
+                counter["done"] += 1
+            if on_done is not None:
+                on_done(branch, result)
+
+        results = await asyncio.gather(*(run(branch) for branch in branches), return_exceptions=True)
+        return {
+            branch: str(result) or type(result).__name__
+            for branch, result in zip(branches, results)
+            if isinstance(result, Exception)
+        }
+
+    async def _create_or_resume_repo(self, checkpoint_key: str, checkpoint: Dict, description: str) -> Dict:
+        repo_name = checkpoint["repo_name"]
+        if checkpoint["repo"]:
+            return checkpoint["repo"]
+        try:
+            repo = await self.github.create_org_repo(name=repo_name, description=description)
+        except GithubApiError as exc:
+            # An earlier attempt may have created the repo and died before checkpointing it.
+            if exc.status_code != 422 or checkpoint["attempts"] < 2:
+                raise
+            repo = await self.github.get_repo(settings.github_org, repo_name)
+        repo = {
+            "name": repo.get("name", repo_name),
+            "description": repo.get("description"),
+            "html_url": repo["html_url"],
+            "default_branch": repo.get("default_branch", "main"),
+            "owner": {"login": repo["owner"]["login"]},
+            "created_at": repo.get("created_at"),
+            "updated_at": repo.get("updated_at"),
+        }
+        self.provisioning.update(checkpoint_key, repo=repo)
+        return repo
+
+    def _checkpoint_protection(self, checkpoint_key: str, branch: str, applied: Optional[bool], rejected: List[str]):
+        # A rejected (fail-soft) protection is reported, and retried by the next attempt.
+        if applied is False:
+            rejected.append(branch)
+        else:
+            self.provisioning.add(checkpoint_key, "protected", branch)
+
+    async def _create_repo_with_branches(
+        self,
+        title: str,
+        description: str,
+        version_count: int = 2,
+        extra_files: Optional[Dict[str, str]] = None,
+        progress: Optional[Dict] = None,
+        checkpoint_key: Optional[str] = None,
+    ) -> Dict:
         version_branches = self._resolve_version_branches(version_count)
-        repo_name = f"{settings.challenge_repo_prefix}-{self._slugify(title)}-{self._short_id()}"
-        repo = self.github.create_org_repo(
-            name=repo_name,
-            description=f"SciLand challenge: {title.strip()}",
+        checkpoint_key = checkpoint_key or provisioning_key("challenge", title.strip(), description.strip(), version_count)
+        # Concurrent duplicates of one request share a single provisioning run, and its progress.
+        flight_key = f"provision:{checkpoint_key}"
+        shared = self._provision_progress.setdefault(flight_key, {"state": {}, "watchers": [], "callers": 0})
+        shared["callers"] += 1
+        if progress is not None:
+            progress.update(shared["state"])
+            shared["watchers"].append(progress)
+        try:
+            return await self._flights.run(
+                flight_key,
+                lambda: self._provision(title, description, version_branches, extra_files, shared, checkpoint_key),
+            )
+        finally:
+            if progress is not None:
+                shared["watchers"].remove(progress)
+            shared["callers"] -= 1
+            if not shared["callers"]:
+                self._provision_progress.pop(flight_key, None)
+
+    async def _provision(
+        self,
+        title: str,
+        description: str,
+        version_branches: List[str],
+        extra_files: Optional[Dict[str, str]],
+        shared: Dict[str, Any],
+        checkpoint_key: str,
+    ) -> Dict:
+        # Every completed step is checkpointed; a retry after a failure or restart reuses the
+        # repo name and skips work that is already done.
+        checkpoint = self.provisioning.begin(
+            checkpoint_key, f"{settings.challenge_repo_prefix}-{self._slugify(title)}-{self._short_id()}"
+        )
+        repo_name = checkpoint["repo_name"]
+        branches_done = set(checkpoint["branches"])
+        protected = set(checkpoint["protected"])
+
+        # Updated in place as steps complete, in every waiting caller's progress dict; async jobs
+        # report it through GET /jobs/{id}. The step counters are shared objects.
+        def report(**fields: Any):
+            shared["state"].update(fields)
+            for watcher in shared["watchers"]:
+                watcher.update(fields)
+
+        report(
+            step="create_repo",
+            repo_name=repo_name,
+            resumed=checkpoint["attempts"] > 1,
+            repo_created=False,
+            scaffold_committed=False,
+            branches={"done": len(branches_done), "total": len(version_branches)},
+            protection={"done": len(protected), "total": len(version_branches) + 1},
         )
+        progress = shared["state"]
+        repo = await self._create_or_resume_repo(checkpoint_key, checkpoint, f"SciLand challenge: {title.strip()}")
+        report(step="scaffold", repo_created=True)
 
         owner = repo["owner"]["login"]
         default_branch = repo.get("default_branch", "main")
-        base_sha = self.github.get_branch(owner, repo_name, default_branch)["commit"]["sha"]
-
-        self.github.put_file(
-            owner=owner,
-            repo=repo_name,
-            branch=default_branch,
-            path="CHALLENGE.md",
-            content=self._build_challenge_md(title.strip(), description.strip(), version_branches),
-            message="docs: add challenge",
-        )
 
-        for branch in version_branches:
-            self.github.ensure_branch(owner, repo_name, branch, base_sha)
-
-        ci_workflow = self._build_default_ci_workflow(version_branches)
-        for branch in [default_branch] + version_branches:
-            self.github.put_file(
+        base_sha = checkpoint["base_sha"]
+        if not base_sha:
+            # Scaffold the default branch in a single commit; version branches fork from it.
+            files = {
+                "CHALLENGE.md": self._build_challenge_md(title.strip(), description.strip(), version_branches),
+                ".github/workflows/skill-ci.yml": self._build_default_ci_workflow(version_branches),
+                **(extra_files or {}),
+            }
+            base_sha = await self.github.commit_files(
                 owner=owner,
                 repo=repo_name,
-                branch=branch,
-                path=".github/workflows/skill-ci.yml",
-                content=ci_workflow,
-                message=f"chore(ci): add skill workflow on {branch}",
+                branch=default_branch,
+                files=files,
+                message="chore: scaffold challenge",
+            )
+            self.provisioning.update(checkpoint_key, base_sha=base_sha)
+        report(step="branches", scaffold_committed=True)
+
+        failed = await self._run_per_branch(
+            [branch for branch in version_branches if branch not in branches_done],
+            lambda branch: self.github.ensure_branch(owner, repo_name, branch, base_sha),
+            progress["branches"],
+            lambda branch, _result: self.provisioning.add(checkpoint_key, "branches", branch),
+        )
+        self.provisioning.flush(checkpoint_key)
+        if failed:
+            raise GithubApiError(
+                f"failed to create {len(failed)} version branch(es)",
+                502,
+                {"repo": repo_name, "failed_branches": failed, "resumable": True},
             )
 
-        for branch in version_branches:
-            self.github.protect_branch(owner, repo_name, branch)
-
-        self.github.protect_branch(owner, repo_name, default_branch)
+        # protect_branch is fail-soft; rejections and anything it raises are recorded, not fatal.
+        report(step="protection")
+        rejected: List[str] = []
+        protection_failures = await self._run_per_branch(
+            [branch for branch in version_branches + [default_branch] if branch not in protected],
+            lambda branch: self.github.protect_branch(owner, repo_name, branch),
+            progress["protection"],
+            lambda branch, applied: self._checkpoint_protection(checkpoint_key, branch, applied, rejected),
+        )
+        protection_failures.update({branch: "protection rejected by GitHub" for branch in rejected})
+        report(step="done")
+        self.provisioning.finish(checkpoint_key)
+        self.index.upsert(index_entry(repo))
         return {
             "owner": owner,
             "repo_name": repo_name,
             "repo_url": repo["html_url"],
             "default_branch": default_branch,
             "version_branches": version_branches,
+            "protection_failures": protection_failures,
         }
 
-    def create_challenge(self, title: str, description: str, version_count: int = 2) -> Dict:
+    def _validate_challenge(self, title: str, description: str, version_count: int):
         if not title.strip():
             raise BadRequestError("title is required")
         if not description.strip():
             raise BadRequestError("description is required")
+        self._resolve_version_branches(version_count)
+
+    def _validate_requester_upload(self, requester_token: str, problem_filename: str, problem_content: str):
+        if not requester_token.strip():
+            raise BadRequestError("requester token is required")
+        if not problem_filename.strip():
+            raise BadRequestError("problem file name is required")
+        if not problem_content.strip():
+            raise BadRequestError("problem file content is required")
 
-        created = self._create_repo_with_branches(title, description, version_count=version_count)
+    async def create_challenge(
+        self,
+        title: str,
+        description: str,
+        version_count: int = 2,
+        progress: Optional[Dict] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict:
+        self._validate_challenge(title, description, version_count)
 
-        self.cache.clear(f"challenges:list")
+        created = await self._create_repo_with_branches(
+            title,
+            description,
+            version_count=version_count,
+            progress=progress,
+            checkpoint_key=provisioning_key("challenge", idempotency_key) if idempotency_key else None,
+        )
 
         return {
             "challenge_id": created["repo_name"],
             "repo_url": created["repo_url"],
             "branches": [created["default_branch"]] + created["version_branches"],
+            "protection_failures": created["protection_failures"],
         }
 
-    def create_challenge_for_requester(
+    async def create_challenge_for_requester(
         self,
         title: str,
         description: str,
@@ -146,34 +342,35 @@ class ChallengeService:
         problem_filename: str,
         problem_content: str,
         version_count: int = 2,
+        progress: Optional[Dict] = None,
+        idempotency_key: Optional[str] = None,
     ) -> Dict:
-        if not requester_token.strip():
-            raise BadRequestError("requester token is required")
-        if not problem_filename.strip():
-            raise BadRequestError("problem file name is required")
-        if not problem_content.strip():
-            raise BadRequestError("problem file content is required")
+        self._validate_requester_upload(requester_token, problem_filename, problem_content)
 
-        requester = self.github.get_authenticated_user(requester_token)
+        requester = await self.github.get_authenticated_user(requester_token)
         requester_login = requester.get("login", "").strip()
         if not requester_login:
             raise BadRequestError("unable to resolve requester from token")
 
-        created = self._create_repo_with_branches(title, description, version_count=version_count)
-
         safe_file = problem_filename.strip().replace("\\", "/").split("/")[-1] or "problem.md"
-        self.github.put_file(
-            owner=created["owner"],
-            repo=created["repo_name"],
-            branch=created["default_branch"],
-            path=safe_file,
-            content=problem_content,
-            message=f"docs: add problem file {safe_file}",
+        if idempotency_key:
+            checkpoint_key = provisioning_key("requester", requester_login, idempotency_key)
+        else:
+            checkpoint_key = provisioning_key(
+                "requester", requester_login, title.strip(), description.strip(), version_count, safe_file, problem_content
+            )
+        created = await self._create_repo_with_branches(
+            title,
+            description,
+            version_count=version_count,
+            extra_files={safe_file: problem_content},
+            progress=progress,
+            checkpoint_key=checkpoint_key,
         )
 
         collaborator_granted = False
         try:
-            self.github.add_repo_collaborator(
+            await self.github.add_repo_collaborator(
                 owner=created["owner"],
                 repo=created["repo_name"],
                 username=requester_login,
@@ -184,121 +381,272 @@ class ChallengeService:
             # Some org policies force fork-only contribution. We keep flow working via fork+PR.
             collaborator_granted = False
 
-        self.cache.clear("challenges:list")
         return {
             "challenge_id": created["repo_name"],
             "repo_url": created["repo_url"],
             "branches": [created["default_branch"]] + created["version_branches"],
+            "protection_failures": created["protection_failures"],
             "requester": requester_login,
             "problem_file": safe_file,
             "collaborator_granted": collaborator_granted,
         }
 
-    def list_challenges(self) -> List[Dict]:
-        cache_key = "challenges:list"
-        cached = self.cache.get(cache_key)
-        if cached is not None:
-            return cached
-
-        repos = self.github.list_org_repos()
-        items = []
-        for repo in repos:
-            name = repo.get("name", "")
-            if not self._is_challenge_repo(name):
-                continue
-            items.append(
-                {
-                    "challenge_id": name,
-                    "title": repo.get("description") or name,
-                    "repo_url": repo.get("html_url"),
-                    "default_branch": repo.get("default_branch", "main"),
-                }
-            )
+    async def _run_job(self, work: Awaitable[Dict]) -> Dict:
+        # Background creation yields the rate-limit budget to interactive and webhook calls.
+        with self.github.priority(PRIORITY_LOW):
+            return await work
 
-        self.cache.set(cache_key, items)
-        return items
+    def submit_challenge_job(
+        self, title: str, description: str, version_count: int = 2, idempotency_key: Optional[str] = None
+    ) -> Dict:
+        self._validate_challenge(title, description, version_count)
+        return self.jobs.submit(
+            "create_challenge",
+            lambda progress: self._run_job(
+                self.create_challenge(
+                    title, description, version_count, progress=progress, idempotency_key=idempotency_key
+                )
+            ),
+        )
 
-    def get_challenge_detail(self, challenge_id: str) -> Dict:
-        if not self._is_challenge_repo(challenge_id):
-            raise NotFoundError("challenge not found")
+    def submit_requester_challenge_job(
+        self,
+        title: str,
+        description: str,
+        requester_token: str,
+        problem_filename: str,
+        problem_content: str,
+        version_count: int = 2,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict:
+        self._validate_requester_upload(requester_token, problem_filename, problem_content)
+        self._resolve_version_branches(version_count)
+        return self.jobs.submit(
+            "create_challenge_for_requester",
+            lambda progress: self._run_job(
+                self.create_challenge_for_requester(
+                    title,
+                    description,
+                    requester_token,
+                    problem_filename,
+                    problem_content,
+                    version_count=version_count,
+                    progress=progress,
+                    idempotency_key=idempotency_key,
+                )
+            ),
+        )
 
-        cache_key = f"challenge:detail:{challenge_id}"
-        cached = self.cache.get(cache_key)
+    async def _read_through(self, cache_key: str, load: Callable[[], Awaitable]):
+        cached, stale = self.cache.lookup(cache_key)
         if cached is not None:
+            if stale:
+                # Serve the stale copy now; one background refresh replaces it.
+                self._revalidate(cache_key, load)
             return cached
+        # Concurrent misses share one upstream fetch instead of stampeding GitHub.
+        return await self._flights.run(cache_key, load)
+
+    def _revalidate(self, cache_key: str, load: Callable[[], Awaitable]):
+        task = asyncio.ensure_future(self._flights.run(cache_key, load))
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: asyncio.Future):
+        self._background.discard(task)
+        if not task.cancelled():
+            # A failed refresh keeps serving the stale copy until it expires.
+            task.exception()
+
+    async def _ensure_index(self):
+        if not self.index.seeded:
+            # First request on an empty index pays for the one full scan.
+            await self._flights.run("challenges:reconcile", self.reconcile_index)
+        elif self.index.reconcile_due(settings.challenge_index_reconcile_seconds):
+            self._revalidate("challenges:reconcile", self.reconcile_index)
+
+    def _encode_cursor(self, sort: str, descending: bool, key: Tuple[Any, str]) -> str:
+        raw = json.dumps([sort, descending, key[0], key[1]], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    def _decode_cursor(self, cursor: str, sort: str, descending: bool) -> Tuple[Any, str]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            cursor_sort, cursor_descending, value, challenge_id = json.loads(raw)
+        except (TypeError, ValueError):
+            raise BadRequestError("invalid cursor")
+        if cursor_sort != sort or cursor_descending != descending:
+            raise BadRequestError("cursor does not match sort order")
+        return value, challenge_id
+
+    async def page_challenges(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        sort: str = "name",
+        order: Optional[str] = None,
+        query: str = "",
+    ) -> Dict:
+        if sort not in SORT_FIELDS:
+            raise BadRequestError(f"sort must be one of: {', '.join(SORT_FIELDS)}")
+        if order not in {None, "asc", "desc"}:
+            raise BadRequestError("order must be asc or desc")
+        if limit is None and cursor:
+            limit = DEFAULT_PAGE_SIZE
+        # Without limit or cursor the whole list comes back, as it did before paging existed.
+        if limit is not None and not 1 <= limit <= 100:
+            raise BadRequestError("limit must be between 1 and 100")
+        # Names read naturally A-Z; dates and counts newest / largest first.
+        descending = order == "desc" if order else sort != "name"
+        after = self._decode_cursor(cursor, sort, descending) if cursor else None
+
+        await self._ensure_index()
+        try:
+            items, last_key, total = self.index.page(sort, descending, after, limit, query)
+        except TypeError:
+            raise BadRequestError("cursor does not match sort order")
+        return {
+            "items": items,
+            "next_cursor": self._encode_cursor(sort, descending, last_key) if last_key else None,
+            "total": total,
+        }
 
-        repo = self.github.get_repo(settings.github_org, challenge_id)
-        pulls = self.github.list_pulls(settings.github_org, challenge_id, state="all", per_page=20)
-
-        submissions = []
-        for pr in pulls:
-            status = "merged" if pr.get("merged_at") else pr.get("state", "open")
-            submissions.append(
-                {
-                    "number": pr["number"],
-                    "title": pr["title"],
-                    "url": pr["html_url"],
-                    "base_ref": pr["base"]["ref"],
-                    "head_ref": pr["head"]["ref"],
-                    "status": status,
-                    "merged": bool(pr.get("merged_at")),
-                }
-            )
+    async def reconcile_index(self) -> int:
+        started_at = time.time()
+        entries = []
+        with self.github.priority(PRIORITY_LOW):
+            async for repo in self.github.iter_org_repos():
+                if self._is_challenge_repo(repo.get("name", "")):
+                    entries.append(index_entry(repo))
+        self.index.replace_all(entries, started_at)
+        return len(entries)
+
+    async def _fetch_detail_graphql(self, challenge_id: str) -> Dict:
+        snapshot = await self.github.get_challenge_snapshot(settings.github_org, challenge_id, pulls_limit=RECENT_SUBMISSIONS)
+        description = snapshot["readme"]
+        if description is None:
+            description = await self.github.get_repo_readme(settings.github_org, challenge_id)
+        return {
+            "challenge_id": challenge_id,
+            "title": snapshot.get("description") or challenge_id,
+            "description": description,
+            "repo_url": snapshot["html_url"],
+            "default_branch": snapshot.get("default_branch", "main"),
+            "version_branches": self._filter_version_branches(snapshot["branches"]),
+            "recent_submissions": [to_submission(pr) for pr in snapshot["pulls"]],
+        }
 
-        detail = {
+    async def _fetch_detail_rest(self, challenge_id: str) -> Dict:
+        repo = await self.github.get_repo(settings.github_org, challenge_id)
+        pulls = await self.github.list_pulls(settings.github_org, challenge_id, state="all", per_page=RECENT_SUBMISSIONS)
+        return {
             "challenge_id": challenge_id,
             "title": repo.get("description") or challenge_id,
-            "description": self.github.get_repo_readme(settings.github_org, challenge_id),
+            "description": await self.github.get_repo_readme(settings.github_org, challenge_id),
             "repo_url": repo["html_url"],
             "default_branch": repo.get("default_branch", "main"),
-            "version_branches": self._extract_version_branches_from_repo(settings.github_org, challenge_id),
-            "recent_submissions": submissions,
+            "version_branches": await self._extract_version_branches_from_repo(settings.github_org, challenge_id),
+            "recent_submissions": [to_submission(pr) for pr in pulls],
         }
 
+    async def get_challenge_detail(self, challenge_id: str) -> Dict:
+        if not self._is_challenge_repo(challenge_id):
+            raise NotFoundError("challenge not found")
+
+        cache_key = f"challenge:detail:{challenge_id}"
+        detail = await self._read_through(cache_key, lambda: self._load_challenge_detail(challenge_id, cache_key))
+        # Detail pages warm the submission store without waiting on a full backfill.
+        self._refresh_submissions_in_background(challenge_id)
+        if self.submissions.is_backfilled(challenge_id):
+            detail = {**detail, "recent_submissions": self.submissions.list(challenge_id, limit=RECENT_SUBMISSIONS)}
+        return detail
+
+    async def _load_challenge_detail(self, challenge_id: str, cache_key: str) -> Dict:
+        detail = None
+        if settings.github_graphql_enabled:
+            try:
+                detail = await self._fetch_detail_graphql(challenge_id)
+            except GithubApiError:
+                # GraphQL can be unavailable or over its own budget; REST stays the source of truth.
+                detail = None
+        if detail is None:
+            detail = await self._fetch_detail_rest(challenge_id)
+
+        if self.submissions.is_backfilled(challenge_id):
+            submission_count = self.submissions.count(challenge_id)
+        else:
+            # A lower bound until the submission store has been backfilled.
+            submission_count = len(detail["recent_submissions"])
+        self.index.annotate(
+            challenge_id,
+            title=detail["title"],
+            description=detail["description"],
+            submission_count=submission_count,
+        )
         self.cache.set(cache_key, detail)
         return detail
 
-    def list_submissions(self, challenge_id: str) -> List[Dict]:
+    async def _backfill_submissions(self, challenge_id: str) -> int:
+        started_at = time.time()
+        items = [to_submission(pr) async for pr in self.github.iter_pulls(settings.github_org, challenge_id)]
+        self.submissions.replace(challenge_id, items, started_at)
+        count = self.submissions.count(challenge_id)
+        self.index.annotate(challenge_id, submission_count=count)
+        return count
+
+    async def _poll_submissions(self, challenge_id: str) -> int:
+        since = self.submissions.high_water(challenge_id)
+        items = [
+            to_submission(pr)
+            async for pr in self.github.iter_pulls_updated_since(settings.github_org, challenge_id, since)
+        ]
+        changed = self.submissions.upsert(challenge_id, items, polled=True)
+        if changed:
+            self.index.annotate(challenge_id, submission_count=self.submissions.count(challenge_id))
+        return changed
+
+    def _refresh_submissions_in_background(self, challenge_id: str):
+        flight_key = f"submissions:{challenge_id}"
+        if not self.submissions.is_backfilled(challenge_id):
+            self._revalidate(flight_key, lambda: self._backfill_submissions(challenge_id))
+        elif self.submissions.poll_due(challenge_id, settings.submission_poll_seconds):
+            self._revalidate(flight_key, lambda: self._poll_submissions(challenge_id))
+
+    async def list_submissions(self, challenge_id: str) -> List[Dict]:
         if not self._is_challenge_repo(challenge_id):
             raise NotFoundError("challenge not found")
 
-        pulls = self.github.list_pulls(settings.github_org, challenge_id, state="all", per_page=100)
-        items = []
-        for pr in pulls:
-            items.append(
-                {
-                    "number": pr["number"],
-                    "title": pr["title"],
-                    "url": pr["html_url"],
-                    "base_ref": pr["base"]["ref"],
-                    "head_ref": pr["head"]["ref"],
-                    "status": "merged" if pr.get("merged_at") else pr.get("state", "open"),
-                    "merged": bool(pr.get("merged_at")),
-                }
-            )
-        return items
+        if not self.submissions.is_backfilled(challenge_id):
+            await self._flights.run(f"submissions:{challenge_id}", lambda: self._backfill_submissions(challenge_id))
+        else:
+            self._refresh_submissions_in_background(challenge_id)
+        return self.submissions.list(challenge_id)
+
+    async def sync_challenge(self, challenge_id: str) -> Dict:
+        if not self._is_challenge_repo(challenge_id):
+            raise NotFoundError("challenge not found")
 
-    def sync_challenge(self, challenge_id: str) -> Dict:
-        submissions = self.list_submissions(challenge_id)
+        # A moderator sync always pages through every PR again; its own flight key keeps it
+        # from joining a background poll, which only fetches recent changes.
+        await self._flights.run(f"submissions:sync:{challenge_id}", lambda: self._backfill_submissions(challenge_id))
         self.cache.clear(f"challenge:detail:{challenge_id}")
-        self.cache.clear(f"submissions:{challenge_id}")
         return {
             "challenge_id": challenge_id,
             "synced": True,
-            "submission_count": len(submissions),
+            "submission_count": self.submissions.count(challenge_id),
         }
 
-    def requester_can_operate_pull(self, challenge_id: str, pull_number: int, requester_token: str) -> bool:
+    async def requester_can_operate_pull(self, challenge_id: str, pull_number: int, requester_token: str) -> bool:
         if not self._is_challenge_repo(challenge_id):
             raise NotFoundError("challenge not found")
         if pull_number <= 0:
             raise BadRequestError("pull number must be positive")
-        requester = self.github.get_authenticated_user(requester_token)
+        requester = await self.github.get_authenticated_user(requester_token)
         requester_login = requester.get("login", "")
         if not requester_login:
             return False
 
-        pr = self.github.get_pull(settings.github_org, challenge_id, pull_number)
+        pr = await self.github.get_pull(settings.github_org, challenge_id, pull_number)
         author_login = (pr.get("user") or {}).get("login", "")
         head_owner_login = ((pr.get("head") or {}).get("repo") or {}).get("owner", {}).get("login", "")
         return requester_login in {author_login, head_owner_login}
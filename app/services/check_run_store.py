@@ -0,0 +1,168 @@
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.services.storage import SqliteDatabase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS check_runs (
+    check_id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    head_sha TEXT NOT NULL,
+    name TEXT,
+    app_id INTEGER,
+    status TEXT NOT NULL,
+    conclusion TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS check_runs_head ON check_runs (owner, repo, head_sha);
+CREATE TABLE IF NOT EXISTS check_heads (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    head_sha TEXT NOT NULL,
+    seeded_at REAL NOT NULL,
+    PRIMARY KEY (owner, repo, head_sha)
+);
+CREATE TABLE IF NOT EXISTS actions_checks (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    head_sha TEXT NOT NULL,
+    checked_at REAL NOT NULL,
+    listings INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (owner, repo, head_sha)
+);
+"""
+
+# A completed run is never rolled back by a late `created` / `in_progress` delivery.
+UPSERT = """
+INSERT INTO check_runs (check_id, owner, repo, head_sha, name, app_id, status, conclusion, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (check_id) DO UPDATE SET
+    status = excluded.status, conclusion = excluded.conclusion, updated_at = excluded.updated_at
+WHERE check_runs.status != 'completed' OR excluded.status = 'completed'
+"""
+
+
+# Per-commit check-run state for auto-merge decisions, kept current by `check_run` webhooks.
+# A commit is listed from GitHub the first time it is evaluated (`seed`); after that its runs
+# are read from the table. Like GitHub's `filter=latest`, only the newest run per check name
+# and app counts, so a re-run replaces the failed run it repeats. For each commit it also
+# remembers whether its Actions runs still need an approval listing: not once the runs were
+# seen or a workflow_run delivery arrived, nor after `max_listings` listings found none.
+# Lives in one WAL-mode SQLite file shared by every worker on the host (None keeps it in
+# memory), and rows older than `retention_seconds` are pruned.
+class CheckRunStore:
+    def __init__(self, db_path: Optional[str] = None, retention_seconds: float = 7 * 24 * 3600):
+        self.retention_seconds = retention_seconds
+        self._db = SqliteDatabase(db_path, SCHEMA)
+        self._last_prune = time.monotonic()
+
+    def _rows(self, owner: str, repo: str, head_sha: str, runs: Iterable[Dict[str, Any]]) -> List[tuple]:
+        now = time.time()
+        return [
+            (
+                run["id"],
+                owner,
+                repo,
+                head_sha,
+                run.get("name"),
+                (run.get("app") or {}).get("id"),
+                run.get("status") or "queued",
+                run.get("conclusion"),
+                now,
+            )
+            for run in runs
+            if isinstance(run.get("id"), int)
+        ]
+
+    def record(self, owner: str, repo: str, run: Dict[str, Any]):
+        # One `check_run` webhook payload.
+        head_sha = run.get("head_sha")
+        if not head_sha:
+            return
+        self._db.conn().executemany(UPSERT, self._rows(owner, repo, head_sha, [run]))
+        self._maybe_prune()
+
+    def seed(self, owner: str, repo: str, head_sha: str, runs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Merges a full listing from GitHub and marks the commit as tracked.
+        with self._db.transaction() as conn:
+            conn.executemany(UPSERT, self._rows(owner, repo, head_sha, runs))
+            conn.execute(
+                "INSERT OR REPLACE INTO check_heads (owner, repo, head_sha, seeded_at) VALUES (?, ?, ?, ?)",
+                (owner, repo, head_sha, time.time()),
+            )
+        return self.runs(owner, repo, head_sha) or []
+
+    def runs(self, owner: str, repo: str, head_sha: str) -> Optional[List[Dict[str, Any]]]:
+        # None until the commit has been seeded.
+        conn = self._db.conn()
+        seeded = conn.execute(
+            "SELECT 1 FROM check_heads WHERE owner = ? AND repo = ? AND head_sha = ?",
+            (owner, repo, head_sha),
+        ).fetchone()
+        if seeded is None:
+            return None
+        rows = conn.execute(
+            """
+            SELECT check_id, name, status, conclusion FROM check_runs AS run
+            WHERE owner = ? AND repo = ? AND head_sha = ? AND check_id = (
+                SELECT MAX(check_id) FROM check_runs
+                WHERE owner = run.owner AND repo = run.repo AND head_sha = run.head_sha
+                AND name IS run.name AND app_id IS run.app_id
+            )
+            ORDER BY check_id
+            """,
+            (owner, repo, head_sha),
+        ).fetchall()
+        return [{"id": row[0], "name": row[1], "status": row[2], "conclusion": row[3]} for row in rows]
+
+    def actions_checked(self, owner: str, repo: str, head_sha: str, max_listings: int) -> bool:
+        row = self._db.conn().execute(
+            "SELECT done, listings FROM actions_checks WHERE owner = ? AND repo = ? AND head_sha = ?",
+            (owner, repo, head_sha),
+        ).fetchone()
+        return row is not None and (bool(row[0]) or row[1] >= max_listings)
+
+    def mark_actions_checked(self, owner: str, repo: str, head_sha: str):
+        self._db.conn().execute(
+            """
+            INSERT INTO actions_checks (owner, repo, head_sha, checked_at, listings, done) VALUES (?, ?, ?, ?, 0, 1)
+            ON CONFLICT (owner, repo, head_sha) DO UPDATE SET done = 1, checked_at = excluded.checked_at
+            """,
+            (owner, repo, head_sha, time.time()),
+        )
+        self._maybe_prune()
+
+    def note_actions_listing(self, owner: str, repo: str, head_sha: str):
+        # A listing that found no runs yet; the commit is listed again on a later evaluation.
+        self._db.conn().execute(
+            """
+            INSERT INTO actions_checks (owner, repo, head_sha, checked_at, listings, done) VALUES (?, ?, ?, ?, 1, 0)
+            ON CONFLICT (owner, repo, head_sha) DO UPDATE SET
+                listings = actions_checks.listings + 1, checked_at = excluded.checked_at
+            """,
+            (owner, repo, head_sha, time.time()),
+        )
+        self._maybe_prune()
+
+    def _maybe_prune(self):
+        now = time.monotonic()
+        if now - self._last_prune < 3600:
+            return
+        self._last_prune = now
+        cutoff = time.time() - self.retention_seconds
+        conn = self._db.conn()
+        conn.execute("DELETE FROM check_runs WHERE updated_at < ?", (cutoff,))
+        conn.execute("DELETE FROM check_heads WHERE seeded_at < ?", (cutoff,))
+        conn.execute("DELETE FROM actions_checks WHERE checked_at < ?", (cutoff,))
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._db.conn()
+        return {
+            "check_runs": conn.execute("SELECT COUNT(*) FROM check_runs").fetchone()[0],
+            "commits": conn.execute("SELECT COUNT(*) FROM check_heads").fetchone()[0],
+        }
+
+    def close(self):
+        self._db.close()
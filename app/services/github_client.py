@@ -1,30 +1,119 @@
+import asyncio
 import base64
-from typing import Any, Dict, List, Optional
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import quote
 
-import requests
+import httpx
 
 from app.core.config import settings
 from app.core.errors import GithubApiError, NotFoundError
+from app.core.metrics import GITHUB_RATE_LIMIT_REMAINING, GITHUB_REQUEST_SECONDS, endpoint_template
+from app.services.github_scheduler import PRIORITY_NORMAL, RateLimitScheduler
+from app.services.single_flight import SingleFlight
+
+CHALLENGE_SNAPSHOT_QUERY = """
+query($owner: String!, $name: String!, $pulls: Int!, $refsAfter: String) {
+  repository(owner: $owner, name: $name) {
+    description
+    url
+    defaultBranchRef { name }
+    readme: object(expression: "HEAD:README.md") { ... on Blob { text } }
+    refs(refPrefix: "refs/heads/version/", first: 100, after: $refsAfter) {
+      nodes { name }
+      pageInfo { hasNextPage endCursor }
+    }
+    pullRequests(first: $pulls, orderBy: {field: CREATED_AT, direction: DESC}) {
+      nodes { number title url state mergedAt baseRefName headRefName }
+    }
+  }
+}
+"""
+
+# Later pages of version/* refs, without re-sending the rest of the snapshot.
+CHALLENGE_REFS_QUERY = """
+query($owner: String!, $name: String!, $refsAfter: String) {
+  repository(owner: $owner, name: $name) {
+    refs(refPrefix: "refs/heads/version/", first: 100, after: $refsAfter) {
+      nodes { name }
+      pageInfo { hasNextPage endCursor }
+    }
+  }
+}
+"""
+
+_request_priority: ContextVar[int] = ContextVar("github_request_priority", default=PRIORITY_NORMAL)
+
+
+def graphql_url_for(base_url: str) -> str:
+    # GitHub Enterprise Server serves REST under /api/v3 and GraphQL under /api/graphql.
+    if base_url.endswith("/api/v3"):
+        return base_url[: -len("/v3")] + "/graphql"
+    return f"{base_url}/graphql"
 
 
 class GithubClient:
-    def __init__(self):
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
         self.base_url = settings.github_api_base.rstrip("/")
+        self.graphql_url = settings.github_graphql_url.rstrip("/") or graphql_url_for(self.base_url)
         self.org = settings.github_org
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
+        self.timeout = httpx.Timeout(settings.github_timeout_seconds)
+        self.session = self._build_session(transport, {"Authorization": f"Bearer {settings.github_token}"})
+        # Requester tokens get their own keep-alive pool, separate from the app credentials.
+        self.requester_session = self._build_session(transport, {})
+        # sha256(token) -> (expires_at, user); raw requester tokens are never stored.
+        self._identities: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._identities_max_entries = settings.requester_identity_cache_size
+        self._identities_ttl_seconds = settings.requester_identity_ttl_seconds
+        self._identity_stats = {"hits": 0, "misses": 0}
+        # url -> {"etag", "last_modified", "data"}; replayed on 304 Not Modified.
+        self._validators: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._validators_max_entries = settings.github_conditional_cache_size
+        self._conditional_stats = {"conditional_requests": 0, "not_modified": 0, "full_responses": 0}
+        self.scheduler = RateLimitScheduler(
+            reserve=settings.github_rate_limit_reserve,
+            pacing_threshold=settings.github_rate_limit_pacing_threshold,
+            secondary_backoff_seconds=settings.github_secondary_backoff_seconds,
+        )
+        self.max_rate_limit_retries = settings.github_rate_limit_max_retries
+        self._flights = SingleFlight()
+
+    def _build_session(self, transport: Optional[httpx.AsyncBaseTransport], headers: Dict[str, str]) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            headers={
                 "Accept": "application/vnd.github+json",
-                "Authorization": f"Bearer {settings.github_token}",
                 "X-GitHub-Api-Version": "2022-11-28",
                 "User-Agent": "sciland-mvp-api",
-            }
+                **headers,
+            },
+            http2=settings.github_http2,
+            limits=httpx.Limits(
+                max_connections=settings.github_max_connections,
+                max_keepalive_connections=settings.github_max_keepalive_connections,
+                keepalive_expiry=settings.github_keepalive_expiry_seconds,
+            ),
+            timeout=self.timeout,
+            transport=transport,
         )
 
-    def _request(self, method: str, path: str, expected=(200,), json_body=None):
-        url = f"{self.base_url}{path}"
-        response = self.session.request(method=method, url=url, json=json_body, timeout=30)
+    async def aclose(self):
+        await self.session.aclose()
+        await self.requester_session.aclose()
+
+    @contextmanager
+    def priority(self, level: int):
+        token = _request_priority.set(level)
+        try:
+            yield
+        finally:
+            _request_priority.reset(token)
 
+    def _handle_response(self, response: httpx.Response, expected):
         data = None
         if response.text:
             try:
@@ -40,36 +129,166 @@ class GithubClient:
 
         return data
 
-    def _request_with_token(self, token: str, method: str, path: str, expected=(200,), json_body=None):
-        url = f"{self.base_url}{path}"
-        headers = {
-            "Accept": "application/vnd.github+json",
-            "Authorization": f"Bearer {token}",
-            "X-GitHub-Api-Version": "2022-11-28",
-            "User-Agent": "sciland-mvp-api",
+    def _conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _remember_validators(self, url: str, response: httpx.Response, data):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            self._validators.pop(url, None)
+            return
+        self._validators[url] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "link": response.headers.get("Link", ""),
+            "data": data,
+        }
+        self._validators.move_to_end(url)
+        while len(self._validators) > self._validators_max_entries:
+            self._validators.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "conditional": {**self._conditional_stats, "stored_entries": len(self._validators)},
+            "rate_limit": self.scheduler.stats(),
+            "requester_identity": {**self._identity_stats, "stored_entries": len(self._identities)},
+            "single_flight": self._flights.stats(),
         }
-        response = requests.request(method=method, url=url, headers=headers, json=json_body, timeout=30)
 
-        data = None
-        if response.text:
-            try:
-                data = response.json()
-            except Exception:
-                data = {"raw": response.text}
+    async def _request(self, method: str, path: str, expected=(200,), json_body=None):
+        data, _ = await self._request_with_link(method, path, expected=expected, json_body=json_body)
+        return data
 
-        if response.status_code not in expected:
-            message = data.get("message") if isinstance(data, dict) else "GitHub API error"
-            if response.status_code == 404:
-                raise NotFoundError(message or "resource not found")
-            raise GithubApiError(message or "GitHub API error", response.status_code, data)
+    async def _request_with_link(self, method: str, path: str, expected=(200,), json_body=None) -> Tuple[Any, str]:
+        if method == "GET":
+            # Identical in-flight reads share one upstream call.
+            url = f"{self.base_url}{path}"
+            return await self._flights.run(url, lambda: self._send(method, path, expected, json_body))
+        return await self._send(method, path, expected, json_body)
+
+    async def _send(
+        self, method: str, path: str, expected=(200,), json_body=None, url: Optional[str] = None, resource: str = "core"
+    ) -> Tuple[Any, str]:
+        # `url` overrides base_url + path; `resource` names the rate-limit budget the call spends.
+        url = url or f"{self.base_url}{path}"
+        # Kept for the whole round trip: a 304 replays this entry even if the LRU evicted it
+        # from `_validators` in the meantime.
+        cached = self._validators.get(url) if method == "GET" else None
+        headers = self._conditional_headers(cached)
+        if headers:
+            self._conditional_stats["conditional_requests"] += 1
+
+        priority = _request_priority.get()
+        attempt = 0
+        while True:
+            await self.scheduler.acquire(priority, resource)
+            started = time.perf_counter()
+            response = await self.session.request(method=method, url=url, json=json_body, headers=headers)
+            self._observe_latency(method, path, response.status_code, time.perf_counter() - started)
+            throttled = self.scheduler.observe(response.status_code, response.headers, response.text)
+            if self.scheduler.remaining is not None:
+                GITHUB_RATE_LIMIT_REMAINING.set(self.scheduler.remaining)
+            if not throttled or attempt >= self.max_rate_limit_retries:
+                break
+            attempt += 1
+
+        if headers and response.status_code == 304:
+            # GitHub does not count 304s against the rate limit.
+            self._conditional_stats["not_modified"] += 1
+            if url in self._validators:
+                self._validators.move_to_end(url)
+            return cached["data"], cached.get("link", "")
+
+        data = self._handle_response(response, expected)
+        if method == "GET":
+            self._conditional_stats["full_responses"] += 1
+            self._remember_validators(url, response, data)
+        return data, response.headers.get("Link", "")
+
+    def _observe_latency(self, method: str, path: str, status: int, seconds: float):
+        GITHUB_REQUEST_SECONDS.observe(seconds, method=method, endpoint=endpoint_template(path), status=str(status))
+
+    def _last_page(self, link: str) -> Optional[int]:
+        match = re.search(r'<[^>]*[?&]page=(\d+)[^>]*>;\s*rel="last"', link or "")
+        return int(match.group(1)) if match else None
+
+    async def _iter_pages(self, path: str, per_page: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        # The first page's Link header tells us the last page; the rest are fetched
+        # concurrently and yielded in page order as soon as each one is available.
+        separator = "&" if "?" in path else "?"
+        page_path = f"{path}{separator}per_page={per_page}&page="
+        first, link = await self._request_with_link("GET", f"{page_path}1")
+        for item in first or []:
+            yield item
+        if not first or len(first) < per_page:
+            return
 
-        return data
+        last_page = self._last_page(link)
+        if last_page is None:
+            page = 2
+            while True:
+                chunk = await self._request("GET", f"{page_path}{page}")
+                for item in chunk or []:
+                    yield item
+                if not chunk or len(chunk) < per_page:
+                    return
+                page += 1
+
+        semaphore = asyncio.Semaphore(max(1, settings.github_pagination_concurrency))
 
-    def get_authenticated_user(self, token: str) -> Dict[str, Any]:
-        return self._request_with_token(token, "GET", "/user")
+        async def fetch(page: int):
+            async with semaphore:
+                return await self._request("GET", f"{page_path}{page}")
 
-    def create_org_repo(self, name: str, description: str) -> Dict[str, Any]:
-        return self._request(
+        tasks = [asyncio.ensure_future(fetch(page)) for page in range(2, last_page + 1)]
+        try:
+            for task in tasks:
+                for item in await task or []:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _request_with_token(self, token: str, method: str, path: str, expected=(200,), json_body=None):
+        url = f"{self.base_url}{path}"
+        started = time.perf_counter()
+        response = await self.requester_session.request(
+            method=method,
+            url=url,
+            headers={"Authorization": f"Bearer {token}"},
+            json=json_body,
+        )
+        self._observe_latency(method, path, response.status_code, time.perf_counter() - started)
+        return self._handle_response(response, expected)
+
+    async def get_authenticated_user(self, token: str) -> Dict[str, Any]:
+        fingerprint = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        now = time.monotonic()
+        cached = self._identities.get(fingerprint)
+        if cached and cached[0] > now:
+            self._identity_stats["hits"] += 1
+            self._identities.move_to_end(fingerprint)
+            return dict(cached[1])
+
+        self._identity_stats["misses"] += 1
+        user = await self._request_with_token(token, "GET", "/user")
+        if isinstance(user, dict) and user.get("login"):
+            self._identities[fingerprint] = (now + self._identities_ttl_seconds, {"login": user["login"], "id": user.get("id")})
+            self._identities.move_to_end(fingerprint)
+            while len(self._identities) > self._identities_max_entries:
+                self._identities.popitem(last=False)
+        return user
+
+    async def create_org_repo(self, name: str, description: str) -> Dict[str, Any]:
+        return await self._request(
             "POST",
             f"/orgs/{self.org}/repos",
             expected=(201,),
@@ -84,57 +303,40 @@ class GithubClient:
             },
         )
 
-    def get_repo(self, owner: str, repo: str) -> Dict[str, Any]:
-        return self._request("GET", f"/repos/{owner}/{repo}")
+    async def get_repo(self, owner: str, repo: str) -> Dict[str, Any]:
+        return await self._request("GET", f"/repos/{owner}/{repo}")
 
-    def list_org_repos(self) -> List[Dict[str, Any]]:
-        repos = []
-        page = 1
-        while True:
-            chunk = self._request("GET", f"/orgs/{self.org}/repos?per_page=100&page={page}")
-            if not chunk:
-                break
-            repos.extend(chunk)
-            if len(chunk) < 100:
-                break
-            page += 1
-        return repos
+    def iter_org_repos(self) -> AsyncIterator[Dict[str, Any]]:
+        return self._iter_pages(f"/orgs/{self.org}/repos", per_page=100)
 
-    def list_branches(self, owner: str, repo: str, per_page: int = 100) -> List[Dict[str, Any]]:
-        branches = []
-        page = 1
-        while True:
-            chunk = self._request("GET", f"/repos/{owner}/{repo}/branches?per_page={per_page}&page={page}")
-            if not chunk:
-                break
-            branches.extend(chunk)
-            if len(chunk) < per_page:
-                break
-            page += 1
-        return branches
+    async def list_org_repos(self) -> List[Dict[str, Any]]:
+        return [repo async for repo in self.iter_org_repos()]
+
+    async def list_branches(self, owner: str, repo: str, per_page: int = 100) -> List[Dict[str, Any]]:
+        return [branch async for branch in self._iter_pages(f"/repos/{owner}/{repo}/branches", per_page=per_page)]
 
-    def get_branch(self, owner: str, repo: str, branch: str) -> Dict[str, Any]:
-        return self._request("GET", f"/repos/{owner}/{repo}/branches/{branch}")
+    async def get_branch(self, owner: str, repo: str, branch: str) -> Dict[str, Any]:
+        return await self._request("GET", f"/repos/{owner}/{repo}/branches/{branch}")
 
-    def create_branch(self, owner: str, repo: str, branch: str, sha: str):
-        return self._request(
+    async def create_branch(self, owner: str, repo: str, branch: str, sha: str):
+        return await self._request(
             "POST",
             f"/repos/{owner}/{repo}/git/refs",
             expected=(201,),
             json_body={"ref": f"refs/heads/{branch}", "sha": sha},
         )
 
-    def ensure_branch(self, owner: str, repo: str, branch: str, base_sha: str):
+    async def ensure_branch(self, owner: str, repo: str, branch: str, base_sha: str):
         try:
-            self.get_branch(owner, repo, branch)
+            await self.get_branch(owner, repo, branch)
             return
         except NotFoundError:
-            self.create_branch(owner, repo, branch, base_sha)
+            await self.create_branch(owner, repo, branch, base_sha)
 
-    def put_file(self, owner: str, repo: str, branch: str, path: str, content: str, message: str):
+    async def put_file(self, owner: str, repo: str, branch: str, path: str, content: str, message: str):
         encoded = base64.b64encode(content.encode("utf-8")).decode("ascii")
-        encoded_path = "/".join(requests.utils.quote(segment, safe="") for segment in path.split("/"))
-        return self._request(
+        encoded_path = "/".join(quote(segment, safe="") for segment in path.split("/"))
+        return await self._request(
             "PUT",
             f"/repos/{owner}/{repo}/contents/{encoded_path}",
             expected=(200, 201),
@@ -145,10 +347,48 @@ class GithubClient:
             },
         )
 
-    def protect_branch(self, owner: str, repo: str, branch: str):
-        # Some org plans/repo settings may reject full protection. We fail-soft for MVP.
+    async def create_tree(self, owner: str, repo: str, base_tree: str, files: Dict[str, str]) -> Dict[str, Any]:
+        return await self._request(
+            "POST",
+            f"/repos/{owner}/{repo}/git/trees",
+            expected=(201,),
+            json_body={
+                "base_tree": base_tree,
+                "tree": [
+                    {"path": path, "mode": "100644", "type": "blob", "content": content}
+                    for path, content in files.items()
+                ],
+            },
+        )
+
+    async def create_commit(self, owner: str, repo: str, message: str, tree_sha: str, parents: List[str]) -> Dict[str, Any]:
+        return await self._request(
+            "POST",
+            f"/repos/{owner}/{repo}/git/commits",
+            expected=(201,),
+            json_body={"message": message, "tree": tree_sha, "parents": parents},
+        )
+
+    async def update_branch_ref(self, owner: str, repo: str, branch: str, sha: str):
+        return await self._request(
+            "PATCH",
+            f"/repos/{owner}/{repo}/git/refs/heads/{branch}",
+            json_body={"sha": sha, "force": False},
+        )
+
+    async def commit_files(self, owner: str, repo: str, branch: str, files: Dict[str, str], message: str) -> str:
+        # One tree + one commit for any number of files, instead of a contents-API commit per file.
+        head = (await self.get_branch(owner, repo, branch))["commit"]
+        tree = await self.create_tree(owner, repo, head["commit"]["tree"]["sha"], files)
+        commit = await self.create_commit(owner, repo, message, tree["sha"], [head["sha"]])
+        await self.update_branch_ref(owner, repo, branch, commit["sha"])
+        return commit["sha"]
+
+    async def protect_branch(self, owner: str, repo: str, branch: str) -> bool:
+        # Some org plans/repo settings may reject full protection. We fail-soft for MVP and
+        # report whether protection was applied.
         try:
-            self._request(
+            await self._request(
                 "PUT",
                 f"/repos/{owner}/{repo}/branches/{branch}/protection",
                 json_body={
@@ -169,69 +409,160 @@ class GithubClient:
                 },
             )
         except GithubApiError:
-            return
+            return False
+        return True
 
-    def list_pulls(self, owner: str, repo: str, state: str = "open", per_page: int = 30) -> List[Dict[str, Any]]:
-        return self._request(
+    async def list_pulls(self, owner: str, repo: str, state: str = "open", per_page: int = 30) -> List[Dict[str, Any]]:
+        return await self._request(
             "GET",
             f"/repos/{owner}/{repo}/pulls?state={state}&per_page={per_page}",
         )
 
-    def get_pull(self, owner: str, repo: str, pull_number: int) -> Dict[str, Any]:
-        return self._request("GET", f"/repos/{owner}/{repo}/pulls/{pull_number}")
+    def iter_pulls(self, owner: str, repo: str, state: str = "all") -> AsyncIterator[Dict[str, Any]]:
+        return self._iter_pages(f"/repos/{owner}/{repo}/pulls?state={state}", per_page=100)
 
-    def merge_pull(self, owner: str, repo: str, pull_number: int, commit_title: str):
-        return self._request(
-            "PUT",
-            f"/repos/{owner}/{repo}/pulls/{pull_number}/merge",
-            json_body={
-                "commit_title": commit_title,
-                "merge_method": "squash",
-            },
-        )
+    async def iter_pulls_updated_since(
+        self, owner: str, repo: str, since: Optional[str], per_page: int = 100
+    ) -> AsyncIterator[Dict[str, Any]]:
+        # The pulls API has no `since`; walk pages sorted by `updated`, newest first, and stop
+        # at the first PR older than `since`. Pages are fetched one at a time so an idle repo
+        # costs a single (usually 304) request.
+        page = 1
+        while True:
+            chunk = await self._request(
+                "GET",
+                f"/repos/{owner}/{repo}/pulls?state=all&sort=updated&direction=desc&per_page={per_page}&page={page}",
+            )
+            for pr in chunk or []:
+                if since and (pr.get("updated_at") or "") < since:
+                    return
+                yield pr
+            if not chunk or len(chunk) < per_page:
+                return
+            page += 1
+
+    async def get_pull(self, owner: str, repo: str, pull_number: int) -> Dict[str, Any]:
+        return await self._request("GET", f"/repos/{owner}/{repo}/pulls/{pull_number}")
 
-    def add_repo_collaborator(self, owner: str, repo: str, username: str, permission: str = "push"):
-        return self._request(
+    async def merge_pull(self, owner: str, repo: str, pull_number: int, commit_title: str, sha: Optional[str] = None):
+        body = {"commit_title": commit_title, "merge_method": "squash"}
+        if sha:
+            # GitHub answers 409 when the head is no longer `sha`.
+            body["sha"] = sha
+        return await self._request("PUT", f"/repos/{owner}/{repo}/pulls/{pull_number}/merge", json_body=body)
+
+    async def add_repo_collaborator(self, owner: str, repo: str, username: str, permission: str = "push"):
+        return await self._request(
             "PUT",
             f"/repos/{owner}/{repo}/collaborators/{username}",
             expected=(201, 204),
             json_body={"permission": permission},
         )
 
-    def get_check_runs(self, owner: str, repo: str, ref: str) -> Dict[str, Any]:
-        return self._request("GET", f"/repos/{owner}/{repo}/commits/{ref}/check-runs")
-
-    def list_check_suites_for_ref(self, owner: str, repo: str, ref: str) -> Dict[str, Any]:
-        return self._request("GET", f"/repos/{owner}/{repo}/commits/{ref}/check-suites")
-
-    def list_actions_runs(self, owner: str, repo: str, per_page: int = 50) -> Dict[str, Any]:
-        return self._request("GET", f"/repos/{owner}/{repo}/actions/runs?per_page={per_page}")
-
-    def approve_actions_run(self, owner: str, repo: str, run_id: int) -> bool:
+    async def get_check_runs(self, owner: str, repo: str, ref: str) -> Dict[str, Any]:
+        return await self._request("GET", f"/repos/{owner}/{repo}/commits/{ref}/check-runs")
+
+    async def list_check_suites_for_ref(self, owner: str, repo: str, ref: str) -> Dict[str, Any]:
+        return await self._request("GET", f"/repos/{owner}/{repo}/commits/{ref}/check-suites")
+
+    async def list_actions_runs(
+        self,
+        owner: str,
+        repo: str,
+        per_page: int = 50,
+        head_sha: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        path = f"/repos/{owner}/{repo}/actions/runs?per_page={per_page}"
+        if head_sha:
+            path += f"&head_sha={head_sha}"
+        if status:
+            path += f"&status={status}"
+        return await self._request("GET", path)
+
+    async def approve_actions_run(self, owner: str, repo: str, run_id: int) -> bool:
         try:
-            self._request("POST", f"/repos/{owner}/{repo}/actions/runs/{run_id}/approve", expected=(201, 202, 204))
+            await self._request("POST", f"/repos/{owner}/{repo}/actions/runs/{run_id}/approve", expected=(201, 202, 204))
             return True
         except GithubApiError:
             return False
 
-    def approve_action_required_runs_for_sha(self, owner: str, repo: str, sha: str):
+    async def approve_action_required_runs_for_sha(self, owner: str, repo: str, sha: str) -> Optional[Dict[str, int]]:
+        # Lists only the runs of `sha`, however busy the repo is, and approves those waiting for
+        # approval. Returns how many runs the commit has ("listed") and how many were approved,
+        # or None when the runs could not be listed.
         try:
-            runs = self.list_actions_runs(owner, repo, per_page=50).get("workflow_runs", [])
+            listing = await self.list_actions_runs(owner, repo, per_page=100, head_sha=sha)
         except Exception:
-            return
-        for run in runs:
+            return None
+        listed = approved = 0
+        for run in listing.get("workflow_runs", []):
             if run.get("head_sha") != sha:
                 continue
+            listed += 1
             if run.get("status") == "completed" and run.get("conclusion") == "action_required":
                 run_id = run.get("id")
-                if isinstance(run_id, int):
-                    self.approve_actions_run(owner, repo, run_id)
+                if isinstance(run_id, int) and await self.approve_actions_run(owner, repo, run_id):
+                    approved += 1
+        return {"listed": listed, "approved": approved}
 
-    def get_repo_readme(self, owner: str, repo: str) -> Optional[str]:
+    async def get_repo_readme(self, owner: str, repo: str) -> Optional[str]:
         try:
-            readme = self._request("GET", f"/repos/{owner}/{repo}/readme")
+            readme = await self._request("GET", f"/repos/{owner}/{repo}/readme")
             if isinstance(readme, dict) and readme.get("content"):
                 return base64.b64decode(readme["content"]).decode("utf-8", errors="ignore")
         except Exception:
             return None
         return None
+
+    async def graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            data, _ = await self._send(
+                "POST", "/graphql", json_body={"query": query, "variables": variables}, url=self.graphql_url, resource="graphql"
+            )
+        except NotFoundError:
+            # The endpoint itself is missing (wrong URL, GraphQL disabled on the server); a repo
+            # that does not exist comes back as a NOT_FOUND error in the response body.
+            raise GithubApiError("GitHub GraphQL endpoint not found", 404)
+        errors = data.get("errors") if isinstance(data, dict) else None
+        if errors:
+            message = errors[0].get("message", "GitHub GraphQL error")
+            if any(error.get("type") == "NOT_FOUND" for error in errors):
+                raise NotFoundError(message)
+            raise GithubApiError(message, 502, errors)
+        return data.get("data") or {}
+
+    async def get_challenge_snapshot(self, owner: str, repo: str, pulls_limit: int = 20) -> Dict[str, Any]:
+        # Repo metadata, README, version/* refs and recent PRs in one GraphQL round trip.
+        # Pull requests are returned in the REST shape so callers can share mapping code.
+        variables = {"owner": owner, "name": repo, "pulls": pulls_limit, "refsAfter": None}
+        node = (await self.graphql(CHALLENGE_SNAPSHOT_QUERY, variables)).get("repository")
+        if not node:
+            raise NotFoundError("resource not found")
+
+        refs = node["refs"]
+        ref_names = [ref["name"] for ref in refs["nodes"]]
+        while refs["pageInfo"]["hasNextPage"]:
+            page_variables = {"owner": owner, "name": repo, "refsAfter": refs["pageInfo"]["endCursor"]}
+            refs = (await self.graphql(CHALLENGE_REFS_QUERY, page_variables))["repository"]["refs"]
+            ref_names.extend(ref["name"] for ref in refs["nodes"])
+
+        return {
+            "description": node.get("description"),
+            "html_url": node["url"],
+            "default_branch": (node.get("defaultBranchRef") or {}).get("name", "main"),
+            "readme": (node.get("readme") or {}).get("text"),
+            "branches": [f"version/{name}" for name in ref_names],
+            "pulls": [
+                {
+                    "number": pr["number"],
+                    "title": pr["title"],
+                    "html_url": pr["url"],
+                    "base": {"ref": pr["baseRefName"]},
+                    "head": {"ref": pr["headRefName"]},
+                    "state": "open" if pr["state"] == "OPEN" else "closed",
+                    "merged_at": pr.get("mergedAt"),
+                }
+                for pr in node["pullRequests"]["nodes"]
+            ],
+        }
@@ -0,0 +1,170 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_NORMAL: "normal", PRIORITY_LOW: "low"}
+
+
+# Paces GitHub calls against the budget reported in X-RateLimit-* headers.
+# Calls pass straight through while the budget is healthy. Once it runs low they queue by
+# priority: below `reserve` only high-priority calls (webhook auto-merge) are admitted, and
+# below `pacing_threshold` the remaining budget is spread evenly until the window resets.
+# Retry-After and secondary limits block every caller. Calls against another budget (GraphQL)
+# are held back only by those blocks and do not spend the core budget.
+class RateLimitScheduler:
+    def __init__(
+        self,
+        reserve: int = 100,
+        pacing_threshold: int = 500,
+        secondary_backoff_seconds: float = 60.0,
+    ):
+        self.reserve = reserve
+        self.pacing_threshold = pacing_threshold
+        self.secondary_backoff_seconds = secondary_backoff_seconds
+
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+        self._secondary_strikes = 0
+        self._last_admit = 0.0
+
+        self._queue: List[Tuple[int, int, asyncio.Future, str]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        self._stats = {
+            "admitted": {name: 0 for name in PRIORITY_NAMES.values()},
+            "queued": 0,
+            "throttled": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def _delay_for(self, priority: int, now: float, resource: str = "core") -> float:
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if resource != "core":
+            return 0.0
+        if self.remaining is None or now >= self.reset_at:
+            return 0.0
+        if self.remaining <= 0:
+            return self.reset_at - now
+        if priority > PRIORITY_HIGH and self.remaining <= self.reserve:
+            return self.reset_at - now
+        if self.remaining < self.pacing_threshold:
+            interval = (self.reset_at - now) / self.remaining
+            return max(0.0, self._last_admit + interval - now)
+        return 0.0
+
+    def _admit(self, priority: int, now: float, resource: str = "core"):
+        if resource == "core":
+            if self.remaining is not None and now < self.reset_at:
+                self.remaining -= 1
+            self._last_admit = now
+        self._stats["admitted"][PRIORITY_NAMES.get(priority, "normal")] += 1
+
+    def _record_wait(self, waited: float):
+        self._stats["queued"] += 1
+        self._stats["total_wait_seconds"] += waited
+        self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL, resource: str = "core"):
+        now = time.time()
+        if not self._queue and self._delay_for(priority, now, resource) <= 0:
+            self._admit(priority, now, resource)
+            return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), future, resource))
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wake()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = loop.create_task(self._dispatch())
+
+        started = time.monotonic()
+        try:
+            await future
+        finally:
+            self._record_wait(time.monotonic() - started)
+
+    async def _dispatch(self):
+        while self._queue:
+            priority, _, future, resource = self._queue[0]
+            if future.done():
+                heapq.heappop(self._queue)
+                continue
+            now = time.time()
+            delay = self._delay_for(priority, now, resource)
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._queue)
+            self._admit(priority, now, resource)
+            future.set_result(None)
+
+    def observe(self, status_code: int, headers: Mapping[str, str], body: str = "") -> bool:
+        now = time.time()
+        # GraphQL and search have their own budgets; only the core REST budget is tracked.
+        if headers.get("X-RateLimit-Resource", "core") == "core":
+            if headers.get("X-RateLimit-Limit"):
+                self.limit = int(headers["X-RateLimit-Limit"])
+            if headers.get("X-RateLimit-Remaining"):
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+            if headers.get("X-RateLimit-Reset"):
+                self.reset_at = float(headers["X-RateLimit-Reset"])
+
+        throttled = False
+        retry_after = headers.get("Retry-After")
+        if status_code in (403, 429):
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + float(retry_after))
+                throttled = True
+            elif self.remaining == 0:
+                self.blocked_until = max(self.blocked_until, self.reset_at)
+                throttled = True
+            elif "secondary rate limit" in (body or "").lower():
+                # No Retry-After: GitHub asks for at least a minute, growing on repeats.
+                backoff = self.secondary_backoff_seconds * (2 ** self._secondary_strikes)
+                self._secondary_strikes += 1
+                self.blocked_until = max(self.blocked_until, now + backoff)
+                throttled = True
+        elif status_code < 400:
+            self._secondary_strikes = 0
+
+        if throttled:
+            self._stats["throttled"] += 1
+        self._wake()
+        return throttled
+
+    def stats(self) -> Dict[str, Any]:
+        queued = self._stats["queued"]
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset_at": self.reset_at,
+            "blocked_until": self.blocked_until,
+            "queue_depth": sum(1 for _, _, future, _ in self._queue if not future.done()),
+            "admitted": dict(self._stats["admitted"]),
+            "queued": queued,
+            "throttled": self._stats["throttled"],
+            "avg_wait_seconds": self._stats["total_wait_seconds"] / queued if queued else 0.0,
+            "max_wait_seconds": self._stats["max_wait_seconds"],
+        }
@@ -0,0 +1,89 @@
+import asyncio
+import secrets
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from app.core.errors import AppError, NotFoundError
+
+
+# Runs long operations (challenge provisioning) outside the HTTP request. At most
+# `concurrency` jobs run at once; the rest wait in submission order. Each job gets a mutable
+# `progress` dict that the operation updates as it goes and GET /jobs/{id} reports.
+# Jobs live in process memory and finished ones are dropped after `retention_seconds`.
+class JobService:
+    def __init__(self, concurrency: int = 2, max_pending: int = 100, retention_seconds: float = 3600.0):
+        self.concurrency = max(1, concurrency)
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Future] = {}
+
+    def _pending(self) -> int:
+        return sum(1 for job in self._jobs.values() if job["status"] in {"queued", "running"})
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _view(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        return {**job, "progress": dict(job["progress"])}
+
+    def submit(self, kind: str, run: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        self._prune()
+        if self._pending() >= self.max_pending:
+            raise AppError("too many pending jobs, retry later", 429)
+
+        job_id = secrets.token_urlsafe(16)
+        job = {
+            "job_id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "progress": {},
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        self._jobs[job_id] = job
+        task = asyncio.ensure_future(self._run(job, run))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _done, job_id=job_id: self._tasks.pop(job_id, None))
+        return self._view(job)
+
+    async def _run(self, job: Dict[str, Any], run: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]):
+        async with self._slots:
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            try:
+                job["result"] = await run(job["progress"])
+                job["status"] = "succeeded"
+            except AppError as exc:
+                job["status"] = "failed"
+                job["error"] = {"message": exc.message, "status_code": exc.status_code, "details": exc.details}
+            except Exception as exc:
+                job["status"] = "failed"
+                job["error"] = {"message": str(exc) or type(exc).__name__, "status_code": 500, "details": None}
+            finally:
+                job["finished_at"] = time.time()
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise NotFoundError("job not found")
+        return self._view(job)
+
+    def stats(self) -> Dict[str, Any]:
+        statuses: Dict[str, int] = {}
+        for job in self._jobs.values():
+            statuses[job["status"]] = statuses.get(job["status"], 0) + 1
+        return {"concurrency": self.concurrency, "jobs": statuses}
+
+    async def close(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
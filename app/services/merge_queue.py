@@ -0,0 +1,110 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from app.core.errors import GithubApiError
+
+BranchKey = Tuple[str, str, str]
+
+
+# Serializes auto-merges per (owner, repo, base branch). With `required_linear_history` on the
+# version branches, concurrent squash merges into one branch race each other and GitHub turns
+# the losers away with 405 until it has recomputed mergeability. Here the PRs that went green
+# wait their turn, oldest first, and a 405 is retried up to `max_attempts` times with a linear
+# backoff from `retry_seconds`. Queues live in process memory.
+class MergeQueue:
+    def __init__(self, max_attempts: int = 3, retry_seconds: float = 2.0):
+        self.max_attempts = max(1, max_attempts)
+        self.retry_seconds = retry_seconds
+        self._queues: Dict[BranchKey, Dict[int, Dict[str, Any]]] = {}
+        self._runners: Dict[BranchKey, asyncio.Task] = {}
+
+    async def merge(
+        self,
+        owner: str,
+        repo: str,
+        base_ref: str,
+        pull_number: int,
+        head_sha: str,
+        run: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        # Resolves with `run()`'s result once the PR's turn comes, or raises its last error.
+        key = (owner, repo, base_ref)
+        queue = self._queues.setdefault(key, {})
+        entry = queue.get(pull_number)
+        if entry is None:
+            entry = {
+                "future": asyncio.get_running_loop().create_future(),
+                "enqueued_at": time.time(),
+                "attempts": 0,
+                "running": False,
+            }
+            queue[pull_number] = entry
+        if not entry["running"]:
+            # A re-evaluation of a waiting PR keeps its place and merges the newer head.
+            entry.update(head_sha=head_sha, run=run)
+        if key not in self._runners:
+            self._runners[key] = asyncio.ensure_future(self._drain(key))
+        return await asyncio.shield(entry["future"])
+
+    async def _drain(self, key: BranchKey):
+        queue = self._queues[key]
+        try:
+            while queue:
+                pull_number, entry = next(iter(queue.items()))
+                entry["running"] = True
+                try:
+                    entry["future"].set_result(await self._attempt(entry))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    entry["future"].set_exception(exc)
+                    # Waiters may all have gone away; don't warn about an unretrieved error.
+                    entry["future"].exception()
+                del queue[pull_number]
+        finally:
+            self._runners.pop(key, None)
+            if not queue:
+                self._queues.pop(key, None)
+
+    async def _attempt(self, entry: Dict[str, Any]) -> Any:
+        while True:
+            entry["attempts"] += 1
+            try:
+                return await entry["run"]()
+            except GithubApiError as exc:
+                if exc.status_code != 405 or entry["attempts"] >= self.max_attempts:
+                    raise
+            await asyncio.sleep(self.retry_seconds * entry["attempts"])
+
+    def positions(self, owner: str, repo: str) -> List[Dict[str, Any]]:
+        # Position 0 is the PR being merged right now.
+        items = []
+        for (queue_owner, queue_repo, base_ref), queue in self._queues.items():
+            if (queue_owner, queue_repo) != (owner, repo):
+                continue
+            for position, (pull_number, entry) in enumerate(queue.items()):
+                items.append(
+                    {
+                        "base_ref": base_ref,
+                        "pull_number": pull_number,
+                        "head_sha": entry["head_sha"],
+                        "position": position,
+                        "attempts": entry["attempts"],
+                        "enqueued_at": entry["enqueued_at"],
+                    }
+                )
+        return sorted(items, key=lambda item: (item["base_ref"], item["position"]))
+
+    def stats(self) -> Dict[str, int]:
+        return {"branches": len(self._queues), "queued": sum(len(queue) for queue in self._queues.values())}
+
+    async def close(self):
+        tasks = list(self._runners.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for queue in self._queues.values():
+            for entry in queue.values():
+                entry["future"].cancel()
+        self._queues.clear()
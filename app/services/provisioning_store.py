@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from app.services.storage import write_json_atomic
+
+
+def provisioning_key(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=True).encode("utf-8")).hexdigest()
+
+
+# Checkpoints of challenge provisioning that has not finished yet, one JSON file per attempt
+# under `directory` (None keeps them in memory). A record is written before the first GitHub
+# call and updated after every completed step, so a retry of the same request continues with
+# the same repo name, skips the scaffold commit and only touches branches and protections that
+# are still missing. Completed branches and protections are written at most every
+# `flush_seconds` and on flush(); a crash in between only repeats those idempotent steps.
+# Records are deleted once provisioning completes; abandoned ones are dropped after
+# `retention_seconds`.
+class ProvisioningStore:
+    def __init__(
+        self, directory: Optional[str] = None, retention_seconds: float = 7 * 24 * 3600, flush_seconds: float = 1.0
+    ):
+        self.directory = directory
+        self.retention_seconds = retention_seconds
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        # Keys with changes not written yet, and the monotonic time of each key's last write.
+        self._dirty: Set[str] = set()
+        self._written_at: Dict[str, float] = {}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load(self):
+        cutoff = time.time() - self.retention_seconds
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if record.get("updated_at", 0) < cutoff:
+                os.remove(path)
+                continue
+            self._records[name[: -len(".json")]] = record
+
+    def _persist(self, key: str):
+        # Caller holds self._lock.
+        self._dirty.discard(key)
+        if not self.directory:
+            return
+        write_json_atomic(self._path(key), self._records[key])
+        self._written_at[key] = time.monotonic()
+
+    def begin(self, key: str, repo_name: str) -> Dict[str, Any]:
+        # Returns the existing checkpoint for `key`, or starts one that reserves `repo_name`.
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                now = time.time()
+                record = {
+                    "repo_name": repo_name,
+                    "repo": None,
+                    "base_sha": None,
+                    "branches": [],
+                    "protected": [],
+                    "attempts": 0,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                self._records[key] = record
+            record["attempts"] += 1
+            self._persist(key)
+            return dict(record)
+
+    def update(self, key: str, **fields: Any):
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                return
+            record.update(fields)
+            record["updated_at"] = time.time()
+            self._persist(key)
+
+    def add(self, key: str, field: str, value: str):
+        # Appends one completed branch/protection to the checkpoint.
+        with self._lock:
+            record = self._records.get(key)
+            if record is None or value in record[field]:
+                return
+            record[field].append(value)
+            record["updated_at"] = time.time()
+            if time.monotonic() - self._written_at.get(key, 0.0) >= self.flush_seconds:
+                self._persist(key)
+            else:
+                self._dirty.add(key)
+
+    def flush(self, key: str):
+        # Writes changes add() has held back.
+        with self._lock:
+            if key in self._dirty and key in self._records:
+                self._persist(key)
+
+    def finish(self, key: str):
+        with self._lock:
+            self._dirty.discard(key)
+            self._written_at.pop(key, None)
+            if self._records.pop(key, None) is not None and self.directory:
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+
+    def pending(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "repo_name": record["repo_name"],
+                    "attempts": record["attempts"],
+                    "branches": len(record["branches"]),
+                    "protected": len(record["protected"]),
+                    "updated_at": record["updated_at"],
+                }
+                for record in self._records.values()
+            ]
@@ -0,0 +1,32 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+# Collapses concurrent calls with the same key into one execution; every caller awaits the
+# shared result. The work runs in its own task so a cancelled caller does not cancel it for
+# the others.
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {"executed": 0, "coalesced": 0}
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            self._stats["executed"] += 1
+        else:
+            self._stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception retrieved; callers that are still waiting re-raise it.
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "in_flight": len(self._inflight)}
@@ -0,0 +1,95 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.cache_store import EXPIRED, HIT, MISS, STALE, CacheStore
+from app.services.storage import SqliteDatabase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_entries_expires_at ON cache_entries (expires_at);
+CREATE INDEX IF NOT EXISTS cache_entries_updated_at ON cache_entries (updated_at);
+"""
+
+
+# Cache shared by every worker on the host through one WAL-mode SQLite file. Writes are
+# single-row upserts/deletes; readers never block the writer. Expired rows are deleted by a
+# background sweeper via the expires_at index, which also trims the table to `max_entries`
+# by dropping the least recently written rows.
+class SqliteCacheStore(CacheStore):
+    def __init__(
+        self,
+        db_path: str,
+        ttl_seconds: int = 30,
+        stale_seconds: int = 0,
+        max_entries: int = 5000,
+        sweep_interval_seconds: float = 60.0,
+    ):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._db = SqliteDatabase(db_path, SCHEMA)
+        self._closed = threading.Event()
+
+        self._sweeper = threading.Thread(target=self._run_sweeper, name="cache-store-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def _run_sweeper(self):
+        while not self._closed.wait(self.sweep_interval_seconds):
+            try:
+                self.sweep()
+            except sqlite3.Error:
+                continue
+
+    def sweep(self):
+        conn = self._db.conn()
+        conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (time.time(),))
+        conn.execute(
+            """
+            DELETE FROM cache_entries WHERE key IN (
+                SELECT key FROM cache_entries ORDER BY updated_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    def close(self):
+        self._closed.set()
+        self._sweeper.join(timeout=5)
+        self._db.close()
+
+    def _lookup(self, key: str) -> Tuple[Optional[Any], str]:
+        now = time.time()
+        row = self._db.conn().execute(
+            "SELECT value, updated_at, expires_at FROM cache_entries WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None, MISS
+        if row[2] < now:
+            # Left for the sweeper; deleting here would turn every read into a write.
+            return None, EXPIRED
+        return json.loads(row[0]), STALE if now - row[1] > self.ttl_seconds else HIT
+
+    def stats(self) -> Dict[str, int]:
+        row = self._db.conn().execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM cache_entries").fetchone()
+        return {"entries": row[0], "bytes": row[1]}
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        self._db.conn().execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, updated_at, expires_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=True), now, now + self.ttl_seconds + self.stale_seconds),
+        )
+
+    def clear(self, key: str):
+        self._db.conn().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
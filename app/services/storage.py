@@ -0,0 +1,71 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+
+def write_json_atomic(path: str, data: Any) -> float:
+    # Readers in other processes see either the old or the new file, never a partial one.
+    # Returns the new file's mtime.
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=True)
+        f.write("\n")
+    os.replace(temp_path, path)
+    return os.stat(path).st_mtime
+
+
+# One WAL-mode SQLite file shared by every worker on the host, with one connection per
+# thread so readers run concurrently with the single writer. None keeps the database in
+# memory, private to the process: every thread then uses one shared connection, and
+# multi-statement writes go through transaction() so they don't interleave.
+class SqliteDatabase:
+    def __init__(self, db_path: Optional[str], schema: str):
+        self.db_path = db_path or ":memory:"
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._shared: Optional[sqlite3.Connection] = None
+        if not db_path:
+            self._shared = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+
+        directory = os.path.dirname(db_path) if db_path else ""
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self.conn()
+        if db_path:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(schema)
+
+    def conn(self) -> sqlite3.Connection:
+        if self._shared is not None:
+            return self._shared
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            conn = self.conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        if self._shared is not None:
+            self._shared.close()
+            return
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
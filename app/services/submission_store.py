@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.services.storage import write_json_atomic
+
+
+def to_submission(pr: Dict[str, Any]) -> Dict[str, Any]:
+    # Same shape for REST/GraphQL pull payloads and `pull_request` webhook payloads.
+    return {
+        "number": pr["number"],
+        "title": pr["title"],
+        "url": pr["html_url"],
+        "base_ref": pr["base"]["ref"],
+        "head_ref": pr["head"]["ref"],
+        "head_sha": pr["head"].get("sha"),
+        "status": "merged" if pr.get("merged_at") else pr.get("state", "open"),
+        "merged": bool(pr.get("merged_at")),
+        "updated_at": pr.get("updated_at"),
+    }
+
+
+# Per-challenge record of every submission PR. A challenge is backfilled once by paging through
+# all of its pulls; after that `pull_request` webhooks upsert single PRs and a periodic poll of
+# pulls sorted by `updated` picks up anything a missed delivery left behind. A backfill that
+# runs again (moderator sync) keeps PRs upserted since it started. Each challenge is
+# persisted as its own JSON file under `directory` (None keeps everything in memory), so a
+# webhook rewrites one small file; workers sharing the directory reload a file when its mtime
+# changes.
+class SubmissionStore:
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._mtimes: Dict[str, float] = {}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, challenge_id: str) -> str:
+        if os.path.basename(challenge_id) != challenge_id or challenge_id.startswith("."):
+            raise ValueError(f"invalid challenge id: {challenge_id!r}")
+        return os.path.join(self.directory, f"{challenge_id}.json")
+
+    def _state(self, challenge_id: str) -> Dict[str, Any]:
+        # Caller holds self._lock.
+        state = self._states.get(challenge_id)
+        if self.directory:
+            path = self._path(challenge_id)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                mtime = None
+            if mtime is not None and mtime != self._mtimes.get(challenge_id):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        state = json.load(f)
+                    self._mtimes[challenge_id] = mtime
+                except (OSError, ValueError):
+                    pass
+        if not isinstance(state, dict) or not isinstance(state.get("pulls"), dict):
+            state = {"backfilled": False, "polled_at": None, "poll_high_water": None, "pulls": {}, "touched": {}}
+        self._states[challenge_id] = state
+        return state
+
+    def _persist(self, challenge_id: str):
+        # Caller holds self._lock.
+        if not self.directory:
+            return
+        self._mtimes[challenge_id] = write_json_atomic(self._path(challenge_id), self._states[challenge_id])
+
+    def is_backfilled(self, challenge_id: str) -> bool:
+        with self._lock:
+            return self._state(challenge_id)["backfilled"]
+
+    def poll_due(self, challenge_id: str, interval_seconds: float) -> bool:
+        with self._lock:
+            polled_at = self._state(challenge_id)["polled_at"]
+            return polled_at is None or time.time() - polled_at >= interval_seconds
+
+    def high_water(self, challenge_id: str) -> Optional[str]:
+        # Latest `updated_at` returned by a backfill or poll. Webhook upserts don't move it: a
+        # delivery for one PR says nothing about a missed delivery for another.
+        with self._lock:
+            return self._state(challenge_id)["poll_high_water"]
+
+    def _advance_high_water(self, state: Dict[str, Any], submissions: List[Dict[str, Any]]):
+        # ISO-8601 UTC timestamps compare correctly as strings.
+        stamps = [item.get("updated_at") or "" for item in submissions] + [state["poll_high_water"] or ""]
+        state["poll_high_water"] = max(stamps) or None
+
+    def replace(self, challenge_id: str, submissions: Iterable[Dict[str, Any]], started_at: Optional[float] = None):
+        # `started_at` is when the listing producing `submissions` began; PRs upserted since
+        # then are kept, and no PR is rolled back to an older `updated_at`.
+        with self._lock:
+            previous = self._state(challenge_id)
+            items = list(submissions)
+            pulls = {str(item["number"]): item for item in items}
+            touched = {
+                key: touched_at
+                for key, touched_at in previous["touched"].items()
+                if started_at is not None and touched_at >= started_at
+            }
+            for key, current in previous["pulls"].items():
+                scanned = pulls.get(key)
+                if scanned is None:
+                    if key in touched:
+                        pulls[key] = current
+                elif (current.get("updated_at") or "") > (scanned.get("updated_at") or ""):
+                    pulls[key] = current
+            state = {
+                "backfilled": True,
+                "polled_at": time.time(),
+                "poll_high_water": None,
+                "pulls": pulls,
+                "touched": touched,
+            }
+            self._advance_high_water(state, items)
+            self._states[challenge_id] = state
+            self._persist(challenge_id)
+
+    def upsert(self, challenge_id: str, submissions: Iterable[Dict[str, Any]], polled: bool = False) -> int:
+        with self._lock:
+            state = self._state(challenge_id)
+            items = list(submissions)
+            changed = 0
+            for item in items:
+                key = str(item["number"])
+                current = state["pulls"].get(key)
+                # Out-of-order deliveries must not roll a PR back to an older state.
+                if current and (current.get("updated_at") or "") > (item.get("updated_at") or ""):
+                    continue
+                if current != item:
+                    state["pulls"][key] = item
+                    state["touched"][key] = time.time()
+                    changed += 1
+            if polled:
+                state["polled_at"] = time.time()
+                self._advance_high_water(state, items)
+            if changed or polled:
+                self._persist(challenge_id)
+            return changed
+
+    def list(self, challenge_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        # Newest PR first, like GitHub's default pulls listing.
+        with self._lock:
+            pulls = self._state(challenge_id)["pulls"]
+            numbers = sorted((int(key) for key in pulls), reverse=True)
+            if limit is not None:
+                numbers = numbers[:limit]
+            return [dict(pulls[str(number)]) for number in numbers]
+
+    def get(self, challenge_id: str, number: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._state(challenge_id)["pulls"].get(str(number))
+            return dict(item) if item else None
+
+    def count(self, challenge_id: str) -> int:
+        with self._lock:
+            return len(self._state(challenge_id)["pulls"])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "challenges": len(self._states),
+                "backfilled": sum(1 for state in self._states.values() if state["backfilled"]),
+                "submissions": sum(len(state["pulls"]) for state in self._states.values()),
+            }
@@ -0,0 +1,288 @@
+import asyncio
+import json
+import sqlite3
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from app.services.storage import SqliteDatabase
+
+if TYPE_CHECKING:
+    from app.services.webhook_service import WebhookService
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS webhook_deliveries (
+    delivery_id TEXT PRIMARY KEY,
+    event TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    received_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    locked_until REAL,
+    finished_at REAL,
+    last_error TEXT,
+    rerun INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS webhook_deliveries_ready ON webhook_deliveries (status, available_at);
+"""
+
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+
+# Durable inbox for verified webhook deliveries, in one WAL-mode SQLite file shared by every
+# worker on the host. The delivery id is the primary key, so a redelivery of a known id is
+# dropped at insert time, unless the row was parked as failed: then it is queued again.
+# Deliveries are claimed with a lease; a worker that dies mid-delivery lets the lease lapse
+# and another worker picks the row up again, until `max_attempts` is used up. Finished rows
+# are kept for `retention_seconds` so late redeliveries are still recognised. Work the service
+# schedules for itself (debounced auto-merge evaluations) goes through `defer` and is retried
+# and survives restarts the same way.
+class WebhookQueue:
+    def __init__(
+        self,
+        db_path: str,
+        max_attempts: int = 5,
+        retry_seconds: float = 10.0,
+        lease_seconds: float = 300.0,
+        retention_seconds: float = 7 * 24 * 3600,
+    ):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        self._db = SqliteDatabase(db_path, SCHEMA)
+
+    def enqueue(self, delivery_id: str, event: str, payload: str) -> bool:
+        # Returns False for a delivery id that is already queued or was processed.
+        now = time.time()
+        cursor = self._db.conn().execute(
+            """
+            INSERT INTO webhook_deliveries (delivery_id, event, payload, status, received_at, available_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (delivery_id) DO UPDATE SET
+                payload = excluded.payload, status = excluded.status, attempts = 0,
+                available_at = excluded.available_at, finished_at = NULL, last_error = NULL
+            WHERE webhook_deliveries.status = ?
+            """,
+            (delivery_id, event, payload, PENDING, now, now, FAILED),
+        )
+        return cursor.rowcount == 1
+
+    def defer(self, delivery_id: str, event: str, payload: str, delay: float, max_delay: float) -> str:
+        # Debounced delivery: becomes ready `delay` seconds after the latest call, but no later
+        # than `max_delay` after the first. One that is mid-processing runs once more afterwards.
+        now = time.time()
+        with self._db.transaction() as conn:
+            row = conn.execute(
+                "SELECT status, received_at FROM webhook_deliveries WHERE delivery_id = ?", (delivery_id,)
+            ).fetchone()
+            if row is None or row[0] in (DONE, FAILED):
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO webhook_deliveries (delivery_id, event, payload, status, received_at, available_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (delivery_id, event, payload, PENDING, now, now + delay),
+                )
+                outcome = "scheduled"
+            elif row[0] == PROCESSING:
+                conn.execute(
+                    "UPDATE webhook_deliveries SET rerun = 1, payload = ?, available_at = ? WHERE delivery_id = ?",
+                    (payload, now + delay, delivery_id),
+                )
+                outcome = "coalesced"
+            else:
+                conn.execute(
+                    "UPDATE webhook_deliveries SET available_at = ?, payload = ? WHERE delivery_id = ?",
+                    (min(now + delay, row[1] + max_delay), payload, delivery_id),
+                )
+                outcome = "coalesced"
+        return outcome
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        # Oldest ready delivery, or one whose lease expired, leased to the caller.
+        now = time.time()
+        conn = self._db.conn()
+        # A delivery whose worker died on every attempt is parked rather than retried forever.
+        conn.execute(
+            """
+            UPDATE webhook_deliveries SET status = ?, finished_at = ?, locked_until = NULL, last_error = ?
+            WHERE status = ? AND locked_until < ? AND attempts >= ?
+            """,
+            (FAILED, now, "lease expired", PROCESSING, now, self.max_attempts),
+        )
+        row = conn.execute(
+            """
+            UPDATE webhook_deliveries
+            SET status = ?, attempts = attempts + 1, locked_until = ?
+            WHERE delivery_id = (
+                SELECT delivery_id FROM webhook_deliveries
+                WHERE (status = ? AND available_at <= ?) OR (status = ? AND locked_until < ?)
+                ORDER BY received_at LIMIT 1
+            )
+            RETURNING delivery_id, event, payload, attempts
+            """,
+            (PROCESSING, now + self.lease_seconds, PENDING, now, PROCESSING, now),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"delivery_id": row[0], "event": row[1], "payload": json.loads(row[2]), "attempts": row[3]}
+
+    def complete(self, delivery_id: str):
+        now = time.time()
+        conn = self._db.conn()
+        # A deferred delivery that was triggered again while it ran goes back to pending.
+        rerun = conn.execute(
+            """
+            UPDATE webhook_deliveries SET status = ?, attempts = 0, received_at = ?,
+                locked_until = NULL, last_error = NULL, rerun = 0
+            WHERE delivery_id = ? AND rerun = 1
+            """,
+            (PENDING, now, delivery_id),
+        ).rowcount
+        if not rerun:
+            conn.execute(
+                "UPDATE webhook_deliveries SET status = ?, finished_at = ?, locked_until = NULL, payload = '{}' WHERE delivery_id = ?",
+                (DONE, now, delivery_id),
+            )
+
+    def fail(self, delivery_id: str, attempts: int, error: str):
+        # Exponential backoff from `retry_seconds`; parked as failed after `max_attempts`.
+        now = time.time()
+        if attempts >= self.max_attempts:
+            self._db.conn().execute(
+                "UPDATE webhook_deliveries SET status = ?, finished_at = ?, locked_until = NULL, last_error = ?, rerun = 0 WHERE delivery_id = ?",
+                (FAILED, now, error, delivery_id),
+            )
+            return
+        self._db.conn().execute(
+            "UPDATE webhook_deliveries SET status = ?, available_at = ?, locked_until = NULL, last_error = ? WHERE delivery_id = ?",
+            (PENDING, now + self.retry_seconds * 2 ** (attempts - 1), error, delivery_id),
+        )
+
+    def has_ready(self) -> bool:
+        row = self._db.conn().execute(
+            "SELECT 1 FROM webhook_deliveries WHERE status = ? AND available_at <= ? LIMIT 1",
+            (PENDING, time.time()),
+        ).fetchone()
+        return row is not None
+
+    def outstanding(self, event: str) -> int:
+        # Deliveries of `event` not yet finished, including deferred ones that are not due yet.
+        row = self._db.conn().execute(
+            "SELECT COUNT(*) FROM webhook_deliveries WHERE event = ? AND status IN (?, ?)",
+            (event, PENDING, PROCESSING),
+        ).fetchone()
+        return row[0]
+
+    def prune(self):
+        self._db.conn().execute(
+            "DELETE FROM webhook_deliveries WHERE status IN (?, ?) AND finished_at < ?",
+            (DONE, FAILED, time.time() - self.retention_seconds),
+        )
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._db.conn().execute("SELECT status, COUNT(*) FROM webhook_deliveries GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self):
+        self._db.close()
+
+
+# Pool of `workers` asyncio tasks draining the queue through WebhookService.process. Workers
+# are woken by enqueue() and also poll every `poll_seconds` for retries that came due and for
+# rows enqueued by other processes.
+class WebhookDispatcher:
+    def __init__(self, queue: WebhookQueue, service: "WebhookService", workers: int = 4, poll_seconds: float = 1.0):
+        self.queue = queue
+        self.service = service
+        self.workers = max(1, workers)
+        self.poll_seconds = poll_seconds
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._busy = 0
+        self._last_prune = 0.0
+        self._stats = {"accepted": 0, "duplicates": 0, "processed": 0, "retried": 0, "failed": 0, "db_errors": 0}
+
+    def start(self):
+        # Idempotent; called from the app lifespan and lazily from the first delivery.
+        if self._tasks:
+            return
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+
+    def submit(self, delivery_id: str, event: str, raw: bytes) -> bool:
+        self.start()
+        accepted = self.queue.enqueue(delivery_id, event, raw.decode("utf-8"))
+        self._stats["accepted" if accepted else "duplicates"] += 1
+        if accepted:
+            self._wake.set()
+        return accepted
+
+    async def _work(self):
+        while True:
+            try:
+                delivery = self.queue.claim()
+            except sqlite3.Error:
+                # A locked or briefly unavailable database; back off and keep the worker alive.
+                self._stats["db_errors"] += 1
+                await asyncio.sleep(self.poll_seconds)
+                continue
+            if delivery is None:
+                self._maybe_prune()
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._busy += 1
+            try:
+                await self.service.process(delivery["event"], delivery["payload"])
+            except asyncio.CancelledError:
+                # Shutting down; the lease runs out and the delivery is picked up again.
+                raise
+            except Exception as exc:
+                self._settle(self.queue.fail, delivery["delivery_id"], delivery["attempts"], str(exc) or type(exc).__name__)
+                self._stats["failed" if delivery["attempts"] >= self.queue.max_attempts else "retried"] += 1
+            else:
+                self._settle(self.queue.complete, delivery["delivery_id"])
+                self._stats["processed"] += 1
+            finally:
+                self._busy -= 1
+
+    def _settle(self, update, *args):
+        # If the row can't be updated, its lease runs out and the delivery is retried.
+        try:
+            update(*args)
+        except sqlite3.Error:
+            self._stats["db_errors"] += 1
+
+    def _maybe_prune(self):
+        now = time.monotonic()
+        if now - self._last_prune >= 3600:
+            self._last_prune = now
+            self._settle(self.queue.prune)
+
+    async def wait_idle(self, timeout: float = 30.0):
+        # Until nothing is ready to claim and no worker is mid-delivery (tests, benchmarks).
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if not self._busy and not self.queue.stats().get(PROCESSING) and not self.queue.has_ready():
+                return
+            await asyncio.sleep(0.01)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "workers": self.workers, "busy": self._busy, "queue": self.queue.stats()}
+
+    async def close(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.queue.close()
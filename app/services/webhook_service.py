@@ -1,17 +1,65 @@
+import asyncio
 import hashlib
 import hmac
+import json
 import re
-from typing import Dict, List
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.core.config import settings
+from app.core.errors import GithubApiError
+from app.core.metrics import AUTO_MERGE_TRIGGERS, WEBHOOK_PROCESSING_SECONDS
 from app.services.cache_store import CacheStore
+from app.services.challenge_index import ChallengeIndex, index_entry
+from app.services.check_run_store import CheckRunStore
 from app.services.github_client import GithubClient
+from app.services.github_scheduler import PRIORITY_HIGH
+from app.services.merge_queue import MergeQueue
+from app.services.submission_store import SubmissionStore, to_submission
+from app.services.webhook_queue import WebhookQueue
+
+PULL_FIELDS = {"number", "title", "html_url", "base", "head"}
+# A PR that keeps receiving events is still evaluated after this many debounce windows.
+MAX_DEBOUNCE_WINDOWS = 5
+MAX_TRACKED_PULLS = 10000
+SUPERSEDED_SHAS = 20
+# Approval listings per commit that may come back empty before the commit is left to
+# workflow_run deliveries.
+MAX_ACTIONS_LISTINGS = 3
+# Queue event of a debounced evaluation; never sent by GitHub.
+AUTO_MERGE_EVENT = "auto_merge"
+
+PullKey = Tuple[str, str, int]
 
 
 class WebhookService:
-    def __init__(self, github: GithubClient, cache: CacheStore):
+    def __init__(
+        self,
+        github: GithubClient,
+        cache: CacheStore,
+        index: Optional[ChallengeIndex] = None,
+        submissions: Optional[SubmissionStore] = None,
+        check_runs: Optional[CheckRunStore] = None,
+        merge_queue: Optional[MergeQueue] = None,
+        merge_debounce_seconds: float = 0.0,
+        queue: Optional[WebhookQueue] = None,
+    ):
         self.github = github
         self.cache = cache
+        self.index = index or ChallengeIndex()
+        self.submissions = submissions or SubmissionStore()
+        self.check_runs = check_runs or CheckRunStore()
+        self.merge_queue = merge_queue or MergeQueue()
+        # 0 evaluates auto-merge inline on every trigger.
+        self.merge_debounce_seconds = merge_debounce_seconds
+        # With a queue, debounced evaluations are deferred deliveries: retried when they fail and
+        # kept across restarts. Without one they are in-memory tasks.
+        self.queue = queue
+        # Pending in-memory debounced evaluation per PR: due/deadline (monotonic), running, rerun, task.
+        self._merges: Dict[PullKey, Dict[str, Any]] = {}
+        # Newest head SHA per PR and the heads it replaced, in least recently touched order.
+        self._heads: Dict[PullKey, Dict[str, Any]] = {}
+        self._closed = False
 
     def verify_signature(self, body: bytes, signature_header: str) -> bool:
         if not settings.webhook_secret:
@@ -30,9 +78,12 @@ class WebhookService:
     def _is_allowed_base(self, base_ref: str) -> bool:
         return bool(re.match(r"^version/v[1-9][0-9]*$", base_ref or ""))
 
-    def _is_ci_success(self, owner: str, repo: str, sha: str) -> bool:
-        checks = self.github.get_check_runs(owner, repo, sha)
-        runs = checks.get("check_runs", []) if isinstance(checks, dict) else []
+    async def _fetch_check_runs(self, owner: str, repo: str, sha: str) -> List[Dict]:
+        checks = await self.github.get_check_runs(owner, repo, sha)
+        fetched = checks.get("check_runs", []) if isinstance(checks, dict) else []
+        return self.check_runs.seed(owner, repo, sha, fetched)
+
+    def _all_green(self, runs: List[Dict]) -> bool:
         if not runs:
             return False
 
@@ -43,35 +94,247 @@ class WebhookService:
                 return False
         return True
 
-    def _try_auto_merge(self, owner: str, repo: str, pull_number: int) -> bool:
-        pr = self.github.get_pull(owner, repo, pull_number)
+    async def _is_ci_success(self, owner: str, repo: str, sha: str) -> bool:
+        runs = self.check_runs.runs(owner, repo, sha)
+        if runs is None:
+            # First evaluation of this commit; check_run webhooks keep it current afterwards.
+            return self._all_green(await self._fetch_check_runs(owner, repo, sha))
+        if not self._all_green(runs):
+            return False
+        # The table misses runs whose `created` delivery was lost, so GitHub confirms before a merge.
+        return self._all_green(await self._fetch_check_runs(owner, repo, sha))
+
+    async def _load_pull(self, owner: str, repo: str, pull_number: int, refresh: bool = False) -> Dict:
+        # The last pull_request payload recorded in the submission store, unless this process
+        # has since seen a newer head; GitHub is only asked on such a gap.
+        if not refresh:
+            item = self.submissions.get(repo, pull_number)
+            heads = self._heads.get((owner, repo, pull_number))
+            if item and item.get("head_sha") and (heads is None or heads["head"] == item["head_sha"]):
+                return {
+                    "state": "open" if item["status"] == "open" else "closed",
+                    "base": {"ref": item["base_ref"]},
+                    "head": {"sha": item["head_sha"]},
+                }
+        pr = await self.github.get_pull(owner, repo, pull_number)
+        if PULL_FIELDS <= pr.keys():
+            self._record_submission(repo, pr)
+        return pr
 
-        if pr.get("state") != "open":
+    async def _approve_actions_runs(self, owner: str, repo: str, head_sha: str):
+        # One targeted listing per commit once its runs exist; runs that need approval later
+        # arrive as workflow_run webhooks and are approved from there.
+        if self.check_runs.actions_checked(owner, repo, head_sha, MAX_ACTIONS_LISTINGS):
+            return
+        result = await self.github.approve_action_required_runs_for_sha(owner, repo, head_sha)
+        if result is None:
+            return
+        if result["listed"]:
+            self.check_runs.mark_actions_checked(owner, repo, head_sha)
+        else:
+            # Evaluated before Actions created the runs.
+            self.check_runs.note_actions_listing(owner, repo, head_sha)
+
+    async def _apply_workflow_run(self, owner: str, repo: str, run: Dict) -> bool:
+        head_sha = run.get("head_sha")
+        if not head_sha:
             return False
-        if not self._is_allowed_base(pr["base"]["ref"]):
+        # workflow_run deliveries are flowing for this commit, so its listing is not needed.
+        self.check_runs.mark_actions_checked(owner, repo, head_sha)
+        run_id = run.get("id")
+        if run.get("conclusion") != "action_required" or not isinstance(run_id, int):
             return False
+        with self.github.priority(PRIORITY_HIGH):
+            return await self.github.approve_actions_run(owner, repo, run_id)
+
+    async def _try_auto_merge(self, owner: str, repo: str, pull_number: int, refresh: bool = False) -> bool:
+        # Merge decisions outrank list refreshes when the rate-limit budget runs low.
+        with self.github.priority(PRIORITY_HIGH):
+            pr = await self._load_pull(owner, repo, pull_number, refresh)
+
+            if pr.get("state") != "open":
+                return False
+            if not self._is_allowed_base(pr["base"]["ref"]):
+                return False
 
-        head_sha = pr["head"]["sha"]
-        self.github.approve_action_required_runs_for_sha(owner, repo, head_sha)
-        if not self._is_ci_success(owner, repo, head_sha):
+            head_sha = pr["head"]["sha"]
+            self._note_head((owner, repo, pull_number), head_sha)
+            await self._approve_actions_runs(owner, repo, head_sha)
+            if not await self._is_ci_success(owner, repo, head_sha):
+                return False
+
+            try:
+                # Pinned to the evaluated head, so a push the store has not seen yet is not merged;
+                # one merge at a time per base branch.
+                await self.merge_queue.merge(
+                    owner,
+                    repo,
+                    pr["base"]["ref"],
+                    pull_number,
+                    head_sha,
+                    lambda: self.github.merge_pull(
+                        owner=owner,
+                        repo=repo,
+                        pull_number=pull_number,
+                        commit_title=f"auto-merge: PR #{pull_number}",
+                        sha=head_sha,
+                    ),
+                )
+            except GithubApiError as exc:
+                if exc.status_code == 405 and not refresh:
+                    # Still not mergeable after the queue's retries; the next push re-evaluates it.
+                    return False
+                if exc.status_code != 409 or refresh:
+                    raise
+                # The head moved; the next trigger for the new head evaluates it.
+                await self._load_pull(owner, repo, pull_number, refresh=True)
+                return False
+            return True
+
+    def _note_head(self, key: PullKey, sha: Optional[str]):
+        if not sha:
+            return
+        heads = self._heads.pop(key, None) or {"head": sha, "superseded": []}
+        if heads["head"] != sha:
+            older = [heads["head"]] + [item for item in heads["superseded"] if item != sha]
+            heads = {"head": sha, "superseded": older[:SUPERSEDED_SHAS]}
+        self._heads[key] = heads
+        while len(self._heads) > MAX_TRACKED_PULLS:
+            del self._heads[next(iter(self._heads))]
+
+    def _is_superseded(self, key: PullKey, sha: Optional[str]) -> bool:
+        heads = self._heads.get(key)
+        return bool(sha and heads and sha in heads["superseded"])
+
+    async def _request_merge(self, owner: str, repo: str, pull_number: int, head_sha: Optional[str] = None) -> bool:
+        # Returns whether the PR was merged inline; debounced evaluations report False.
+        key = (owner, repo, pull_number)
+        if self._is_superseded(key, head_sha):
+            # Checks finishing on a commit the PR has moved past cannot make it mergeable.
+            AUTO_MERGE_TRIGGERS.inc(outcome="stale")
             return False
+        self._note_head(key, head_sha)
+        if self.merge_debounce_seconds <= 0:
+            AUTO_MERGE_TRIGGERS.inc(outcome="evaluated")
+            return await self._try_auto_merge(owner, repo, pull_number)
+        AUTO_MERGE_TRIGGERS.inc(outcome=self._defer_merge(key) if self.queue else self._schedule_merge(key))
+        return False
 
-        self.github.merge_pull(
-            owner=owner,
-            repo=repo,
-            pull_number=pull_number,
-            commit_title=f"auto-merge: PR #{pull_number}",
+    def _defer_merge(self, key: PullKey) -> str:
+        owner, repo, pull_number = key
+        payload = {"repository": {"name": repo, "owner": {"login": owner}}, "number": pull_number}
+        return self.queue.defer(
+            f"auto-merge:{owner}/{repo}#{pull_number}",
+            AUTO_MERGE_EVENT,
+            json.dumps(payload),
+            self.merge_debounce_seconds,
+            self.merge_debounce_seconds * MAX_DEBOUNCE_WINDOWS,
         )
-        return True
 
-    def evaluate_pull(self, owner: str, repo: str, pull_number: int) -> Dict:
+    def _schedule_merge(self, key: PullKey) -> str:
+        # One CI push fans out into a synchronize, a check_run per job and a check_suite; they
+        # all fold into a single evaluation once the PR has been quiet for the debounce window.
+        now = time.monotonic()
+        pending = self._merges.get(key)
+        if pending is not None:
+            if pending["running"]:
+                # Evaluate once more afterwards; this trigger may carry what the running one missed.
+                pending["rerun"] = True
+            else:
+                pending["due"] = min(now + self.merge_debounce_seconds, pending["deadline"])
+            return "coalesced"
+
+        pending = {
+            "due": now + self.merge_debounce_seconds,
+            "deadline": now + self.merge_debounce_seconds * MAX_DEBOUNCE_WINDOWS,
+            "running": False,
+            "rerun": False,
+        }
+        self._merges[key] = pending
+        pending["task"] = asyncio.ensure_future(self._debounced_merge(key, pending))
+        pending["task"].add_done_callback(self._merge_done)
+        return "scheduled"
+
+    async def _debounced_merge(self, key: PullKey, pending: Dict[str, Any]):
+        owner, repo, pull_number = key
+        try:
+            while True:
+                delay = pending["due"] - time.monotonic()
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            pending["running"] = True
+            await self._try_auto_merge(owner, repo, pull_number)
+            self.cache.clear(f"challenge:detail:{repo}")
+        finally:
+            self._merges.pop(key, None)
+            if pending["rerun"] and not self._closed:
+                self._schedule_merge(key)
+
+    def _merge_done(self, task: asyncio.Future):
+        if not task.cancelled():
+            # A failed evaluation is retried by the PR's next event or by POST .../evaluate.
+            task.exception()
+
+    async def wait_merges(self):
+        # Deferred evaluations are run by the queue's dispatcher, which must be running.
+        while self._merges:
+            await asyncio.gather(*[pending["task"] for pending in list(self._merges.values())], return_exceptions=True)
+        while self.queue and self.queue.outstanding(AUTO_MERGE_EVENT):
+            await asyncio.sleep(0.01)
+
+    async def close(self):
+        self._closed = True
+        tasks = [pending["task"] for pending in self._merges.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.merge_queue.close()
+        self.check_runs.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending_merges": len(self._merges) + (self.queue.outstanding(AUTO_MERGE_EVENT) if self.queue else 0),
+            "tracked_pulls": len(self._heads),
+            "merge_queue": self.merge_queue.stats(),
+            **self.check_runs.stats(),
+        }
+
+    async def evaluate_pull(self, owner: str, repo: str, pull_number: int) -> Dict:
         if not repo.startswith(f"{settings.challenge_repo_prefix}-"):
             return {"ok": True, "processed": False, "merged": False}
-        merged = self._try_auto_merge(owner, repo, pull_number)
-        self.cache.clear("challenges:list")
+        merged = await self._try_auto_merge(owner, repo, pull_number, refresh=True)
         self.cache.clear(f"challenge:detail:{repo}")
         return {"ok": True, "processed": True, "merged": merged}
 
+    def _apply_repository_event(self, action: str, repo: Dict, changes: Dict) -> bool:
+        # Keeps the challenge index in step with the org; returns whether it was touched.
+        prefix = f"{settings.challenge_repo_prefix}-"
+        name = repo.get("name", "")
+        old_name = ((changes.get("repository") or {}).get("name") or {}).get("from", "")
+        touched = False
+        if action == "renamed" and old_name.startswith(prefix):
+            self.index.remove(old_name)
+            self.cache.clear(f"challenge:detail:{old_name}")
+            touched = True
+        if not name.startswith(prefix):
+            return touched
+
+        if action in {"deleted", "archived"}:
+            self.index.remove(name)
+        elif action in {"created", "renamed", "edited", "unarchived", "transferred"}:
+            self.index.upsert(index_entry(repo))
+        else:
+            return touched
+        self.cache.clear(f"challenge:detail:{name}")
+        return True
+
+    def _record_submission(self, repo_name: str, pull: Dict):
+        # Every pull_request delivery carries the full PR, so the store is upserted without
+        # a GitHub call; challenges that were never backfilled get their backfill later.
+        if self.submissions.upsert(repo_name, [to_submission(pull)]) and self.submissions.is_backfilled(repo_name):
+            self.index.annotate(repo_name, submission_count=self.submissions.count(repo_name))
+
     def _collect_pr_numbers_from_check_event(self, payload: Dict) -> List[int]:
         prs = payload.get("check_run", {}).get("pull_requests", [])
         if not prs:
@@ -84,32 +347,63 @@ class WebhookService:
                 result.append(number)
         return result
 
-    def process(self, event: str, payload: Dict) -> Dict:
+    async def process(self, event: str, payload: Dict) -> Dict:
+        started = time.perf_counter()
+        try:
+            return await self._process(event, payload)
+        finally:
+            WEBHOOK_PROCESSING_SECONDS.observe(time.perf_counter() - started, event=event or "unknown")
+
+    async def _process(self, event: str, payload: Dict) -> Dict:
         action = payload.get("action", "")
 
         repo = payload.get("repository", {})
         repo_name = repo.get("name", "")
         owner = repo.get("owner", {}).get("login", settings.github_org)
 
+        if event == "repository":
+            processed = self._apply_repository_event(action, repo, payload.get("changes") or {})
+            return {"ok": True, "action": action, "processed": processed}
+
         if not repo_name.startswith(f"{settings.challenge_repo_prefix}-"):
             return {"ok": True, "action": action, "processed": False}
 
         merged = False
 
+        if event == AUTO_MERGE_EVENT:
+            # A debounced evaluation; errors propagate so the queue retries it.
+            if isinstance(payload.get("number"), int):
+                merged = await self._try_auto_merge(owner, repo_name, payload["number"])
+            self.cache.clear(f"challenge:detail:{repo_name}")
+            return {"ok": True, "action": action, "processed": True, "merged": merged}
+
+        if event == "pull_request" and PULL_FIELDS <= payload.get("pull_request", {}).keys():
+            self._record_submission(repo_name, payload["pull_request"])
+
+        if event == "check_run" and isinstance(payload.get("check_run"), dict):
+            self.check_runs.record(owner, repo_name, payload["check_run"])
+
         if event == "pull_request" and action in {"opened", "synchronize", "reopened"}:
-            pull_number = payload.get("pull_request", {}).get("number")
+            pull = payload.get("pull_request", {})
+            pull_number = pull.get("number")
             if isinstance(pull_number, int):
-                merged = self._try_auto_merge(owner, repo_name, pull_number)
+                self._note_head((owner, repo_name, pull_number), (pull.get("head") or {}).get("sha"))
+                merged = await self._request_merge(owner, repo_name, pull_number)
 
         elif event in {"check_run", "check_suite"} and action == "completed":
+            head_sha = payload.get(event, {}).get("head_sha")
             for number in self._collect_pr_numbers_from_check_event(payload):
-                if self._try_auto_merge(owner, repo_name, number):
+                if await self._request_merge(owner, repo_name, number, head_sha):
                     merged = True
 
+        elif event == "workflow_run" and action in {"requested", "completed"}:
+            await self._apply_workflow_run(owner, repo_name, payload.get("workflow_run") or {})
+
         elif event == "pull_request" and action == "closed":
             merged = bool(payload.get("pull_request", {}).get("merged"))
+            pull_number = payload.get("pull_request", {}).get("number")
+            self._heads.pop((owner, repo_name, pull_number), None)
 
-        self.cache.clear("challenges:list")
         self.cache.clear(f"challenge:detail:{repo_name}")
 
         return {"ok": True, "action": action, "processed": True, "merged": merged}
@@ -0,0 +1,423 @@
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+import httpx
+
+
+# In-process stand-in for the GitHub REST/GraphQL endpoints GithubClient uses. It plugs
+# into GithubClient(transport=...) and simulates latency, X-RateLimit-* budgets, Link
+# pagination and ETag revalidation, and counts upstream calls per endpoint template.
+class GithubStandIn(httpx.AsyncBaseTransport):
+    def __init__(
+        self,
+        org: str = "SciLand-9",
+        latency_seconds: float = 0.0,
+        rate_limit: int = 5000,
+        rate_limit_window_seconds: int = 3600,
+        base_url: str = "https://api.github.com",
+    ):
+        self.org = org
+        self.latency_seconds = latency_seconds
+        self.rate_limit = rate_limit
+        self.rate_limit_window_seconds = rate_limit_window_seconds
+        self.base_path = httpx.URL(base_url).path.rstrip("/")
+        self.remaining = rate_limit
+        self.reset_at = int(time.time()) + rate_limit_window_seconds
+
+        self.repos: Dict[str, Dict[str, Any]] = {}
+        self.users: Dict[str, str] = {}
+        self.calls: Counter = Counter()
+        self._ids = itertools.count(1)
+        # Logical clock: every timestamp handed out is one second after the previous one.
+        self._epoch = int(time.time())
+        self._ticks = itertools.count()
+
+        self._routes: List[Tuple[str, re.Pattern, Any]] = []
+        for method, template, handler in [
+            ("GET", "/user", self._get_user),
+            ("POST", "/graphql", self._graphql),
+            ("GET", "/orgs/{org}/repos", self._list_org_repos),
+            ("POST", "/orgs/{org}/repos", self._create_repo),
+            ("GET", "/repos/{owner}/{repo}", self._get_repo),
+            ("GET", "/repos/{owner}/{repo}/readme", self._get_readme),
+            ("GET", "/repos/{owner}/{repo}/branches", self._list_branches),
+            ("PUT", "/repos/{owner}/{repo}/branches/{branch+}/protection", self._protect_branch),
+            ("GET", "/repos/{owner}/{repo}/branches/{branch+}", self._get_branch),
+            ("POST", "/repos/{owner}/{repo}/git/refs", self._create_ref),
+            ("PATCH", "/repos/{owner}/{repo}/git/refs/heads/{branch+}", self._update_ref),
+            ("POST", "/repos/{owner}/{repo}/git/trees", self._create_tree),
+            ("POST", "/repos/{owner}/{repo}/git/commits", self._create_commit),
+            ("PUT", "/repos/{owner}/{repo}/contents/{path+}", self._put_file),
+            ("GET", "/repos/{owner}/{repo}/pulls", self._list_pulls),
+            ("GET", "/repos/{owner}/{repo}/pulls/{number}", self._get_pull),
+            ("PUT", "/repos/{owner}/{repo}/pulls/{number}/merge", self._merge_pull),
+            ("PUT", "/repos/{owner}/{repo}/collaborators/{username}", self._add_collaborator),
+            ("GET", "/repos/{owner}/{repo}/commits/{ref}/check-runs", self._get_check_runs),
+            ("GET", "/repos/{owner}/{repo}/commits/{ref}/check-suites", self._get_check_suites),
+            ("GET", "/repos/{owner}/{repo}/actions/runs", self._list_actions_runs),
+            ("POST", "/repos/{owner}/{repo}/actions/runs/{run_id}/approve", self._approve_run),
+        ]:
+            pattern = re.sub(r"\{(\w+)\+\}", r"(?P<\1>.+)", template)
+            pattern = re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", pattern)
+            self._routes.append((method, re.compile(f"^{pattern}$"), (template, handler)))
+
+    # -- seeding ---------------------------------------------------------------------------
+
+    def add_user(self, token: str, login: str):
+        self.users[token] = login
+
+    def add_repo(self, name: str, description: str = "", branches: Optional[List[str]] = None, readme: str = "") -> Dict[str, Any]:
+        sha = self._sha(name)
+        stamp = self._now()
+        repo = {
+            "name": name,
+            "description": description,
+            "created_at": stamp,
+            "updated_at": stamp,
+            "default_branch": "main",
+            "branches": {branch: sha for branch in ["main"] + (branches or [])},
+            "files": {"README.md": readme or f"# {name}\n"},
+            "protected": set(),
+            "collaborators": {},
+            "pulls": {},
+            "check_runs": {},
+            "actions_runs": [],
+        }
+        self.repos[name] = repo
+        return repo
+
+    def add_pull(
+        self,
+        repo_name: str,
+        base: str,
+        state: str = "open",
+        merged: bool = False,
+        checks: str = "success",
+        check_count: int = 1,
+    ) -> Dict[str, Any]:
+        repo = self.repos[repo_name]
+        number = len(repo["pulls"]) + 1
+        head_sha = self._sha(f"{repo_name}-pr-{number}")
+        pull = {
+            "number": number,
+            "title": f"submission #{number}",
+            "html_url": f"https://github.com/{self.org}/{repo_name}/pull/{number}",
+            "state": state,
+            "merged_at": "2026-01-01T00:00:00Z" if merged else None,
+            "updated_at": self._now(),
+            "user": {"login": f"user-{number}"},
+            "base": {"ref": base},
+            "head": {"ref": f"submissions/{number}", "sha": head_sha, "repo": {"owner": {"login": f"user-{number}"}}},
+        }
+        repo["pulls"][number] = pull
+        repo["check_runs"][head_sha] = [
+            {"id": next(self._ids), "head_sha": head_sha, "status": "completed", "conclusion": checks} for _ in range(check_count)
+        ]
+        return pull
+
+    def seed_org(self, repo_count: int, challenge_ratio: float = 0.5, version_count: int = 3, pulls_per_repo: int = 5):
+        challenge_every = max(1, round(1 / challenge_ratio)) if challenge_ratio > 0 else 0
+        for index in range(repo_count):
+            if challenge_every and index % challenge_every == 0:
+                name = f"challenge-seed-{index:05d}"
+                self.add_repo(
+                    name,
+                    description=f"SciLand challenge: Seed {index}",
+                    branches=[f"version/v{i}" for i in range(1, version_count + 1)],
+                )
+                for number in range(pulls_per_repo):
+                    self.add_pull(name, base=f"version/v{number % version_count + 1}")
+            else:
+                self.add_repo(f"other-repo-{index:05d}", description="unrelated")
+
+    # -- transport -------------------------------------------------------------------------
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+        path = unquote(request.url.path)
+        if self.base_path and path.startswith(self.base_path):
+            path = path[len(self.base_path):]
+        for method, pattern, (template, handler) in self._routes:
+            match = pattern.match(path)
+            if method != request.method or not match:
+                continue
+            self.calls[f"{method} {template}"] += 1
+            return self._respond(request, template, handler, match.groupdict())
+
+        self.calls[f"{request.method} <unmatched>"] += 1
+        return httpx.Response(404, json={"message": "Not Found"})
+
+    def _respond(self, request: httpx.Request, template: str, handler, params: Dict[str, str]) -> httpx.Response:
+        if time.time() >= self.reset_at:
+            self.remaining = self.rate_limit
+            self.reset_at = int(time.time()) + self.rate_limit_window_seconds
+
+        conditional = request.method == "GET" and bool(request.headers.get("If-None-Match"))
+        if self.remaining <= 0 and not conditional:
+            return httpx.Response(403, json={"message": "API rate limit exceeded"}, headers=self._rate_headers())
+
+        body = json.loads(request.content) if request.content else None
+        status, payload, extra_headers = handler(request, params, body)
+
+        data = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        etag = f'"{hashlib.sha1(data).hexdigest()}"'
+        if conditional and status == 200 and request.headers.get("If-None-Match") == etag:
+            # 304s do not consume rate limit.
+            return httpx.Response(304, headers={**self._rate_headers(), "ETag": etag})
+        if self.remaining <= 0:
+            return httpx.Response(403, json={"message": "API rate limit exceeded"}, headers=self._rate_headers())
+        self.remaining -= 1
+
+        headers = {**self._rate_headers(), "Content-Type": "application/json", **(extra_headers or {})}
+        if request.method == "GET" and status == 200:
+            headers["ETag"] = etag
+        return httpx.Response(status, content=data, headers=headers)
+
+    def _rate_headers(self) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(self.remaining, 0)),
+            "X-RateLimit-Reset": str(self.reset_at),
+            "X-RateLimit-Resource": "core",
+        }
+
+    def _now(self) -> str:
+        return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self._epoch + next(self._ticks)))
+
+    def _sha(self, seed: str) -> str:
+        return hashlib.sha1(f"{seed}-{next(self._ids)}".encode("utf-8")).hexdigest()
+
+    def _paginate(self, request: httpx.Request, items: List[Any]):
+        per_page = int(request.url.params.get("per_page", 30))
+        page = int(request.url.params.get("page", 1))
+        last_page = max(1, -(-len(items) // per_page))
+        chunk = items[(page - 1) * per_page: page * per_page]
+        headers = {}
+        if last_page > 1:
+            links = []
+            if page < last_page:
+                links.append(f'<{request.url.copy_set_param("page", page + 1)}>; rel="next"')
+            links.append(f'<{request.url.copy_set_param("page", last_page)}>; rel="last"')
+            headers["Link"] = ", ".join(links)
+        return 200, chunk, headers
+
+    def _repo(self, params: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        return self.repos.get(params.get("repo", ""))
+
+    def _repo_payload(self, repo: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "name": repo["name"],
+            "description": repo["description"],
+            "html_url": f"https://github.com/{self.org}/{repo['name']}",
+            "default_branch": repo["default_branch"],
+            "created_at": repo["created_at"],
+            "updated_at": repo["updated_at"],
+            "owner": {"login": self.org},
+        }
+
+    def _not_found(self):
+        return 404, {"message": "Not Found"}, None
+
+    # -- handlers --------------------------------------------------------------------------
+
+    def _get_user(self, request, params, body):
+        token = request.headers.get("Authorization", "").replace("Bearer ", "", 1)
+        login = self.users.get(token)
+        if not login:
+            return 401, {"message": "Bad credentials"}, None
+        return 200, {"login": login, "id": abs(hash(login)) % 100000}, None
+
+    def _list_org_repos(self, request, params, body):
+        return self._paginate(request, [self._repo_payload(repo) for repo in self.repos.values()])
+
+    def _create_repo(self, request, params, body):
+        if body["name"] in self.repos:
+            return 422, {"message": "name already exists on this account"}, None
+        repo = self.add_repo(body["name"], description=body.get("description", ""))
+        return 201, self._repo_payload(repo), None
+
+    def _get_repo(self, request, params, body):
+        repo = self._repo(params)
+        return (200, self._repo_payload(repo), None) if repo else self._not_found()
+
+    def _get_readme(self, request, params, body):
+        repo = self._repo(params)
+        if not repo or "README.md" not in repo["files"]:
+            return self._not_found()
+        encoded = base64.b64encode(repo["files"]["README.md"].encode("utf-8")).decode("ascii")
+        return 200, {"name": "README.md", "content": encoded}, None
+
+    def _list_branches(self, request, params, body):
+        repo = self._repo(params)
+        if not repo:
+            return self._not_found()
+        return self._paginate(request, [{"name": name, "commit": {"sha": sha}} for name, sha in repo["branches"].items()])
+
+    def _get_branch(self, request, params, body):
+        repo = self._repo(params)
+        if not repo or params["branch"] not in repo["branches"]:
+            return self._not_found()
+        sha = repo["branches"][params["branch"]]
+        return 200, {"name": params["branch"], "commit": {"sha": sha, "commit": {"tree": {"sha": f"tree-{sha}"}}}}, None
+
+    def _protect_branch(self, request, params, body):
+        repo = self._repo(params)
+        if not repo or params["branch"] not in repo["branches"]:
+            return self._not_found()
+        repo["protected"].add(params["branch"])
+        return 200, {"url": request.url.path}, None
+
+    def _create_ref(self, request, params, body):
+        repo = self._repo(params)
+        if not repo:
+            return self._not_found()
+        branch = body["ref"].replace("refs/heads/", "", 1)
+        if branch in repo["branches"]:
+            return 422, {"message": "Reference already exists"}, None
+        repo["branches"][branch] = body["sha"]
+        return 201, {"ref": body["ref"], "object": {"sha": body["sha"]}}, None
+
+    def _update_ref(self, request, params, body):
+        repo = self._repo(params)
+        if not repo or params["branch"] not in repo["branches"]:
+            return self._not_found()
+        repo["branches"][params["branch"]] = body["sha"]
+        return 200, {"ref": f"refs/heads/{params['branch']}", "object": {"sha": body["sha"]}}, None
+
+    def _create_tree(self, request, params, body):
+        repo = self._repo(params)
+        if not repo:
+            return self._not_found()
+        for entry in body.get("tree", []):
+            repo["files"][entry["path"]] = entry.get("content", "")
+        return 201, {"sha": self._sha("tree")}, None
+
+    def _create_commit(self, request, params, body):
+        return (201, {"sha": self._sha("commit"), "tree": {"sha": body["tree"]}}, None) if self._repo(params) else self._not_found()
+
+    def _put_file(self, request, params, body):
+        repo = self._repo(params)
+        if not repo:
+            return self._not_found()
+        repo["files"][params["path"]] = base64.b64decode(body["content"]).decode("utf-8", errors="ignore")
+        sha = self._sha("content")
+        repo["branches"][body.get("branch") or repo["default_branch"]] = sha
+        return 201, {"commit": {"sha": sha}}, None
+
+    def _list_pulls(self, request, params, body):
+        repo = self._repo(params)
+        if not repo:
+            return self._not_found()
+        state = request.url.params.get("state", "open")
+        pulls = [pull for pull in reversed(list(repo["pulls"].values())) if state == "all" or pull["state"] == state]
+        if request.url.params.get("sort") == "updated":
+            pulls.sort(key=lambda pull: pull["updated_at"], reverse=request.url.params.get("direction", "desc") == "desc")
+        return self._paginate(request, pulls)
+
+    def _get_pull(self, request, params, body):
+        repo = self._repo(params)
+        pull = repo["pulls"].get(int(params["number"])) if repo else None
+        return (200, pull, None) if pull else self._not_found()
+
+    def _merge_pull(self, request, params, body):
+        repo = self._repo(params)
+        pull = repo["pulls"].get(int(params["number"])) if repo else None
+        if not pull:
+            return self._not_found()
+        if pull["state"] != "open":
+            return 405, {"message": "Pull Request is not mergeable"}, None
+        if (body or {}).get("sha") and body["sha"] != pull["head"]["sha"]:
+            return 409, {"message": "Head branch was modified. Review and try the merge again."}, None
+        pull["state"] = "closed"
+        pull["merged_at"] = pull["updated_at"] = self._now()
+        return 200, {"merged": True, "sha": self._sha("merge")}, None
+
+    def _add_collaborator(self, request, params, body):
+        repo = self._repo(params)
+        if not repo:
+            return self._not_found()
+        repo["collaborators"][params["username"]] = (body or {}).get("permission", "push")
+        return 201, {"permission": repo["collaborators"][params["username"]]}, None
+
+    def _get_check_runs(self, request, params, body):
+        repo = self._repo(params)
+        if not repo:
+            return self._not_found()
+        runs = repo["check_runs"].get(params["ref"], [])
+        return 200, {"total_count": len(runs), "check_runs": runs}, None
+
+    def _get_check_suites(self, request, params, body):
+        return (200, {"total_count": 0, "check_suites": []}, None) if self._repo(params) else self._not_found()
+
+    def _list_actions_runs(self, request, params, body):
+        repo = self._repo(params)
+        if not repo:
+            return self._not_found()
+        runs = repo["actions_runs"]
+        head_sha = request.url.params.get("head_sha")
+        if head_sha:
+            runs = [run for run in runs if run.get("head_sha") == head_sha]
+        status = request.url.params.get("status")
+        if status:
+            runs = [run for run in runs if status in (run.get("status"), run.get("conclusion"))]
+        per_page = int(request.url.params.get("per_page", 30))
+        return 200, {"total_count": len(runs), "workflow_runs": runs[:per_page]}, None
+
+    def _approve_run(self, request, params, body):
+        repo = self._repo(params)
+        if not repo:
+            return self._not_found()
+        for run in repo["actions_runs"]:
+            if run.get("id") == int(params["run_id"]):
+                run["conclusion"] = "success"
+                return 201, {}, None
+        return self._not_found()
+
+    def _graphql(self, request, params, body):
+        variables = body.get("variables") or {}
+        repo = self.repos.get(variables.get("name", ""))
+        if not repo:
+            return 200, {"data": {"repository": None}, "errors": [{"type": "NOT_FOUND", "message": "Could not resolve to a Repository"}]}, None
+
+        names = sorted(name[len("version/"):] for name in repo["branches"] if name.startswith("version/"))
+        start = int(variables.get("refsAfter") or 0)
+        page = names[start: start + 100]
+        pulls = list(reversed(list(repo["pulls"].values())))[: variables.get("pulls", 20)]
+        return 200, {
+            "data": {
+                "repository": {
+                    "description": repo["description"],
+                    "url": f"https://github.com/{self.org}/{repo['name']}",
+                    "defaultBranchRef": {"name": repo["default_branch"]},
+                    "readme": {"text": repo["files"]["README.md"]} if "README.md" in repo["files"] else None,
+                    "refs": {
+                        "nodes": [{"name": name} for name in page],
+                        "pageInfo": {"hasNextPage": start + 100 < len(names), "endCursor": str(start + 100)},
+                    },
+                    "pullRequests": {
+                        "nodes": [
+                            {
+                                "number": pull["number"],
+                                "title": pull["title"],
+                                "url": pull["html_url"],
+                                "state": "MERGED" if pull["merged_at"] else pull["state"].upper(),
+                                "mergedAt": pull["merged_at"],
+                                "baseRefName": pull["base"]["ref"],
+                                "headRefName": pull["head"]["ref"],
+                            }
+                            for pull in pulls
+                        ]
+                    },
+                }
+            }
+        }, None
@@ -0,0 +1,224 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List
+
+MODERATOR_KEY = "bench-moderator-key"
+
+
+def configure_env(cache_dir: str, cache_ttl_seconds: int):
+    # Settings are read at import time, so the environment has to be in place first.
+    os.environ["GITHUB_TOKEN"] = "bench-token"
+    os.environ["GITHUB_ORG"] = "SciLand-9"
+    os.environ["GITHUB_API_BASE"] = "https://api.github.com"
+    os.environ["GITHUB_WEBHOOK_SECRET"] = ""
+    os.environ["MODERATOR_API_KEY"] = MODERATOR_KEY
+    os.environ["CACHE_TTL_SECONDS"] = str(cache_ttl_seconds)
+    os.environ["CACHE_FILE"] = os.path.join(cache_dir, "cache.json")
+    os.environ["CHALLENGE_INDEX_FILE"] = os.path.join(cache_dir, "challenge_index.json")
+    os.environ["SUBMISSION_STORE_DIR"] = os.path.join(cache_dir, "submissions")
+    os.environ["PROVISIONING_DIR"] = os.path.join(cache_dir, "provisioning")
+    os.environ["MERGE_DEBOUNCE_SECONDS"] = "0.1"
+    os.environ["CHECK_RUN_STORE_PATH"] = os.path.join(cache_dir, "check_runs.sqlite3")
+    os.environ["WEBHOOK_QUEUE_PATH"] = os.path.join(cache_dir, "webhooks.sqlite3")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def drive(calls: List[Callable[[], Awaitable[Any]]], concurrency: int) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = Counter()
+
+    async def one(call):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await call()
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(call) for call in calls))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(calls),
+        "elapsed_seconds": round(elapsed, 3),
+        "rps": round(len(calls) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "errors": dict(errors),
+    }
+
+
+async def scenario_read_mix(client, standin, args) -> Dict[str, Any]:
+    challenge_ids = [name for name in standin.repos if name.startswith("challenge-")]
+    rng = random.Random(args.seed)
+    calls = []
+    for _ in range(args.requests):
+        if rng.random() < args.detail_ratio:
+            challenge_id = rng.choice(challenge_ids)
+            calls.append(lambda challenge_id=challenge_id: client.get(f"/api/v1/challenges/{challenge_id}"))
+        else:
+            calls.append(lambda: client.get("/api/v1/challenges"))
+    return await drive(calls, args.concurrency)
+
+
+async def scenario_webhook_storm(client, standin, args, webhooks) -> Dict[str, Any]:
+    challenge_ids = [name for name in standin.repos if name.startswith("challenge-")]
+    calls = []
+    for index in range(args.webhook_prs):
+        repo_name = challenge_ids[index % len(challenge_ids)]
+        pull = standin.add_pull(repo_name, base="version/v1", check_count=args.checks_per_pr)
+        head_sha = pull["head"]["sha"]
+        runs = standin.repos[repo_name]["check_runs"][head_sha]
+        repository = {"name": repo_name, "owner": {"login": standin.org}}
+        pull_refs = [{"number": pull["number"], "head": {"sha": head_sha}, "base": {"ref": "version/v1"}}]
+        events = [("pull_request", {"action": "synchronize", "repository": repository, "pull_request": pull})]
+        completed = {"head_sha": head_sha, "status": "completed", "conclusion": "success", "pull_requests": pull_refs}
+        for run in runs:
+            events.append(("check_run", {"action": "completed", "repository": repository, "check_run": {**run, "pull_requests": pull_refs}}))
+        events.append(("workflow_run", {"action": "completed", "repository": repository, "workflow_run": {**completed, "id": runs[0]["id"]}}))
+        events.append(("check_suite", {"action": "completed", "repository": repository, "check_suite": completed}))
+        for event, payload in events:
+            body = json.dumps(payload)
+            delivery_id = f"bench-{len(calls)}"
+            calls.append(
+                lambda event=event, body=body, delivery_id=delivery_id: client.post(
+                    "/api/v1/webhooks/github",
+                    content=body,
+                    headers={"X-GitHub-Event": event, "X-GitHub-Delivery": delivery_id, "Content-Type": "application/json"},
+                )
+            )
+    result = await drive(calls, args.concurrency)
+    # Deliveries are acknowledged once queued; count the upstream calls of processing them too.
+    await webhooks.wait_idle()
+    await webhooks.service.wait_merges()
+    return result
+
+
+async def scenario_create(client, standin, args, version_count: int) -> Dict[str, Any]:
+    calls = []
+    for index in range(args.create_repeats):
+        payload = {
+            "title": f"Bench challenge {version_count} {index}",
+            "description": "Benchmark challenge created against the GitHub stand-in.",
+            "version_count": version_count,
+        }
+        calls.append(
+            lambda payload=payload: client.post(
+                "/api/v1/challenges",
+                json=payload,
+                headers={"Authorization": f"Bearer {MODERATOR_KEY}"},
+            )
+        )
+    return await drive(calls, 1)
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    import httpx
+
+    from app.main import create_app
+    from app.services.github_client import GithubClient
+    from bench.github_standin import GithubStandIn
+
+    standin = GithubStandIn(
+        latency_seconds=args.latency_ms / 1000,
+        rate_limit=args.rate_limit,
+    )
+    standin.seed_org(repo_count=args.repos, challenge_ratio=args.challenge_ratio, pulls_per_repo=args.pulls_per_repo)
+    github = GithubClient(transport=standin)
+    app = create_app(github=github)
+
+    scenarios = []
+    if "read" in args.scenarios:
+        scenarios.append(("read_mix", lambda client: scenario_read_mix(client, standin, args)))
+    if "webhook" in args.scenarios:
+        scenarios.append(("webhook_storm", lambda client: scenario_webhook_storm(client, standin, args, app.state.webhooks)))
+    if "create" in args.scenarios:
+        for version_count in args.version_counts:
+            scenarios.append(
+                (f"create_v{version_count}", lambda client, version_count=version_count: scenario_create(client, standin, args, version_count))
+            )
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for name, scenario in scenarios:
+            before = Counter(standin.calls)
+            result = await scenario(client)
+            upstream = standin.calls - before
+            result.update(
+                {
+                    "scenario": name,
+                    "upstream_calls": sum(upstream.values()),
+                    "upstream_by_endpoint": dict(upstream.most_common()),
+                    "rate_limit_remaining": standin.remaining,
+                }
+            )
+            results.append(result)
+    await app.state.webhooks.close()
+    await app.state.webhooks.service.close()
+    await github.aclose()
+    return results
+
+
+def print_table(results: List[Dict[str, Any]]):
+    header = f"{'scenario':<16}{'requests':>10}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}{'upstream':>10}{'errors':>10}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        errors = sum(result["errors"].values())
+        print(
+            f"{result['scenario']:<16}{result['requests']:>10}{result['rps']:>10}{result['p50_ms']:>10}"
+            f"{result['p99_ms']:>10}{result['upstream_calls']:>10}{errors:>10}"
+        )
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Offline load benchmark for the SciLand API against a GitHub stand-in.")
+    parser.add_argument("--scenarios", nargs="+", default=["read", "webhook", "create"], choices=["read", "webhook", "create"])
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="simulated GitHub latency per call")
+    parser.add_argument("--rate-limit", type=int, default=5000)
+    parser.add_argument("--repos", type=int, default=1000, help="repos seeded in the org")
+    parser.add_argument("--challenge-ratio", type=float, default=0.2)
+    parser.add_argument("--pulls-per-repo", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=500, help="requests in the read mix")
+    parser.add_argument("--detail-ratio", type=float, default=0.7)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--webhook-prs", type=int, default=20)
+    parser.add_argument("--checks-per-pr", type=int, default=3)
+    parser.add_argument("--version-counts", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--create-repeats", type=int, default=1)
+    parser.add_argument("--cache-ttl", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_path", help="also write results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    with tempfile.TemporaryDirectory() as cache_dir:
+        configure_env(cache_dir, args.cache_ttl)
+        results = asyncio.run(run(args))
+    print_table(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
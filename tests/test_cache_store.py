@@ -0,0 +1,90 @@
+import json
+import time
+
+import pytest
+
+from app.services.cache_store import MISS, CacheStore, FileCacheStore
+
+
+def test_mutations_are_logged_and_replayed_after_crash(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    store = FileCacheStore(path, ttl_seconds=60, flush_interval_seconds=60)
+    store.set('challenges:list', [{'challenge_id': 'challenge-a'}])
+    store.set('challenge:detail:challenge-a', {'title': 'A'})
+    store.clear('challenge:detail:challenge-a')
+    store.flush()
+
+    # No close(): the snapshot is untouched and recovery comes from the log.
+    assert json.load(open(path)) == {}
+    recovered = FileCacheStore(path, ttl_seconds=60, flush_interval_seconds=60)
+    assert recovered.get('challenges:list') == [{'challenge_id': 'challenge-a'}]
+    assert recovered.get('challenge:detail:challenge-a') is None
+
+
+def test_close_compacts_log_into_snapshot(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    store = FileCacheStore(path, ttl_seconds=60, flush_interval_seconds=60)
+    store.set('challenges:list', [])
+    store.close()
+
+    assert 'challenges:list' in json.load(open(path))
+    assert open(f'{path}.log').read() == ''
+
+
+def test_torn_log_tail_is_ignored(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    store = FileCacheStore(path, ttl_seconds=60, flush_interval_seconds=60)
+    store.set('a', 1)
+    store.flush()
+    with open(f'{path}.log', 'a') as f:
+        f.write('{"op": "set", "key": "b"')
+
+    recovered = FileCacheStore(path, ttl_seconds=60, flush_interval_seconds=60)
+    assert recovered.get('a') == 1
+    recovered.set('c', 3)
+    recovered.flush()
+    assert FileCacheStore(path, ttl_seconds=60).get('c') == 3
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    store = FileCacheStore(str(tmp_path / 'cache.json'), ttl_seconds=60, flush_interval_seconds=60, max_entries=2)
+    store.set('challenge:detail:a', {'title': 'A'})
+    store.set('challenge:detail:b', {'title': 'B'})
+    assert store.get('challenge:detail:a') == {'title': 'A'}
+    store.set('challenge:detail:c', {'title': 'C'})
+
+    assert store.get('challenge:detail:b') is None
+    assert store.get('challenge:detail:a') == {'title': 'A'}
+    assert store.get('challenge:detail:c') == {'title': 'C'}
+
+
+def test_byte_budget_and_expired_sweep(tmp_path):
+    store = FileCacheStore(str(tmp_path / 'cache.json'), ttl_seconds=0, flush_interval_seconds=60, max_bytes=200)
+    store.set('a', 'x' * 80)
+    store.set('b', 'y' * 80)
+    assert 'a' not in store._data
+
+    time.sleep(0.01)
+    store.sweep()
+    assert store._data == {}
+    assert store._bytes == 0
+
+
+def test_entries_turn_stale_before_expiring(tmp_path):
+    store = FileCacheStore(str(tmp_path / 'cache.json'), ttl_seconds=0, stale_seconds=60, flush_interval_seconds=60)
+    store.set('challenges:list', ['a'])
+    time.sleep(0.01)
+
+    assert store.get('challenges:list') is None
+    assert store.lookup('challenges:list') == (['a'], True)
+
+
+def test_backend_must_implement_lookup_set_and_clear():
+    class PartialStore(CacheStore):
+        ttl_seconds = 30
+
+        def _lookup(self, key):
+            return None, MISS
+
+    with pytest.raises(TypeError):
+        PartialStore()
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.errors import BadRequestError
+from app.services.challenge_index import ChallengeIndex
+from app.services.challenge_service import ChallengeService
+
+
+def seeded_index():
+    index = ChallengeIndex()
+    index.replace_all(
+        [
+            {'challenge_id': f'challenge-{n:03d}', 'title': f'Challenge {n}', 'created_at': f'2026-01-{n % 28 + 1:02d}T00:00:00Z'}
+            for n in range(120)
+        ]
+    )
+    index.annotate('challenge-007', description='Extract protein folding skills', submission_count=9)
+    index.annotate('challenge-042', description='Protein docking benchmark', submission_count=3)
+    return index
+
+
+def test_cursor_pages_cover_every_challenge_once():
+    index = seeded_index()
+    service = ChallengeService(None, None, index=index)
+
+    async def walk():
+        seen, cursor = [], None
+        while True:
+            page = await service.page_challenges(limit=25, cursor=cursor, sort='created')
+            seen.extend(item['challenge_id'] for item in page['items'])
+            cursor = page['next_cursor']
+            if not cursor:
+                return seen, page['total']
+
+    seen, total = asyncio.run(walk())
+    assert total == 120
+    assert len(seen) == len(set(seen)) == 120
+    created = [index.get(challenge_id)['created_at'] for challenge_id in seen]
+    assert created == sorted(created, reverse=True)
+
+
+def test_search_matches_all_terms_with_prefix_on_last():
+    index = seeded_index()
+    items, _, total = index.page(query='protein fold')
+    assert [item['challenge_id'] for item in items] == ['challenge-007']
+    items, _, total = index.page(sort='submissions', descending=True, query='protein')
+    assert [item['challenge_id'] for item in items] == ['challenge-007', 'challenge-042']
+    assert index.page(query='nothing-like-this')[2] == 0
+
+
+def test_search_index_follows_updates_and_removals():
+    index = seeded_index()
+    index.annotate('challenge-042', description='Graph coloring')
+    index.remove('challenge-007')
+    assert index.page(query='protein')[2] == 0
+    assert [item['challenge_id'] for item in index.page(query='graph')[0]] == ['challenge-042']
+
+
+def test_cursor_from_another_sort_is_rejected():
+    service = ChallengeService(None, None, index=seeded_index())
+
+    async def run():
+        page = await service.page_challenges(limit=10, sort='submissions')
+        await service.page_challenges(limit=10, cursor=page['next_cursor'], sort='created')
+
+    with pytest.raises(BadRequestError):
+        asyncio.run(run())
+
+
+def test_changes_made_during_a_scan_survive_it(tmp_path):
+    index = ChallengeIndex(str(tmp_path / 'index.json'))
+    index.replace_all([{'challenge_id': 'challenge-001', 'title': 'One'}, {'challenge_id': 'challenge-002', 'title': 'Two'}])
+    started_at = time.time()
+    # Webhooks handled while the org scan is still paging.
+    index.upsert({'challenge_id': 'challenge-003', 'title': 'Three'})
+    index.upsert({'challenge_id': 'challenge-001', 'title': 'One renamed'})
+    index.remove('challenge-002')
+
+    scan = [{'challenge_id': 'challenge-001', 'title': 'One'}, {'challenge_id': 'challenge-002', 'title': 'Two'}]
+    index.replace_all(scan, started_at)
+    assert [(item['challenge_id'], item['title']) for item in index.items()] == [
+        ('challenge-001', 'One renamed'),
+        ('challenge-003', 'Three'),
+    ]
+
+    # The next scan starts after those changes and is taken as it is.
+    ChallengeIndex(str(tmp_path / 'index.json')).replace_all(scan, time.time())
+    assert [item['title'] for item in index.items()] == ['One', 'Two']
+
+
+def test_list_without_limit_or_cursor_returns_every_challenge():
+    service = ChallengeService(None, None, index=seeded_index())
+
+    async def run():
+        return await service.page_challenges(), await service.page_challenges(limit=50)
+
+    everything, first_page = asyncio.run(run())
+    assert len(everything['items']) == everything['total'] == 120
+    assert everything['next_cursor'] is None
+    assert len(first_page['items']) == 50
+    assert first_page['next_cursor']
@@ -1,11 +1,20 @@
+import asyncio
+from contextlib import nullcontext
+
+import pytest
+
 from app.services.challenge_service import ChallengeService
 
 
 class FakeGithub:
     def __init__(self):
         self.created_repo = None
+        self.commits = []
+
+    def priority(self, level):
+        return nullcontext()
 
-    def create_org_repo(self, name, description):
+    async def create_org_repo(self, name, description):
         self.created_repo = name
         return {
             'name': name,
@@ -14,20 +23,24 @@ class FakeGithub:
             'owner': {'login': 'SciLand-9'},
         }
 
-    def get_branch(self, owner, repo, branch):
+    async def get_branch(self, owner, repo, branch):
         return {'commit': {'sha': 'abc123'}}
 
-    def put_file(self, owner, repo, branch, path, content, message):
+    async def put_file(self, owner, repo, branch, path, content, message):
         return {'ok': True}
 
-    def ensure_branch(self, owner, repo, branch, base_sha):
+    async def commit_files(self, owner, repo, branch, files, message):
+        self.commits.append((branch, dict(files)))
+        return 'def456'
+
+    async def ensure_branch(self, owner, repo, branch, base_sha):
         return {'ok': True}
 
-    def protect_branch(self, owner, repo, branch):
+    async def protect_branch(self, owner, repo, branch):
         return {'ok': True}
 
-    def list_org_repos(self):
-        return [
+    async def iter_org_repos(self):
+        for repo in [
             {
                 'name': 'challenge-demo-abc123',
                 'description': 'SciLand challenge: Demo',
@@ -40,16 +53,19 @@ class FakeGithub:
                 'html_url': 'https://github.com/SciLand-9/random-repo',
                 'default_branch': 'main',
             },
-        ]
+        ]:
+            yield repo
 
-    def get_repo(self, owner, repo):
+    async def get_repo(self, owner, repo):
         return {
+            'name': repo,
             'description': 'SciLand challenge: Demo',
             'html_url': f'https://github.com/{owner}/{repo}',
             'default_branch': 'main',
+            'owner': {'login': owner},
         }
 
-    def list_pulls(self, owner, repo, state='all', per_page=20):
+    async def list_pulls(self, owner, repo, state='all', per_page=20):
         return [
             {
                 'number': 1,
@@ -62,7 +78,15 @@ class FakeGithub:
             }
         ]
 
-    def list_branches(self, owner, repo, per_page=100):
+    async def iter_pulls(self, owner, repo, state='all'):
+        for pr in await self.list_pulls(owner, repo, state=state):
+            yield pr
+
+    async def iter_pulls_updated_since(self, owner, repo, since):
+        for pr in await self.list_pulls(owner, repo):
+            yield pr
+
+    async def list_branches(self, owner, repo, per_page=100):
         return [
             {'name': 'main'},
             {'name': 'version/v1'},
@@ -70,13 +94,23 @@ class FakeGithub:
             {'name': 'version/v3'},
         ]
 
-    def get_repo_readme(self, owner, repo):
+    async def get_repo_readme(self, owner, repo):
         return '# Demo'
 
-    def get_authenticated_user(self, token):
+    async def get_challenge_snapshot(self, owner, repo, pulls_limit=20):
+        return {
+            'description': 'SciLand challenge: Demo',
+            'html_url': f'https://github.com/{owner}/{repo}',
+            'default_branch': 'main',
+            'readme': '# Demo',
+            'branches': ['version/v10', 'version/v2', 'version/v1'],
+            'pulls': await self.list_pulls(owner, repo),
+        }
+
+    async def get_authenticated_user(self, token):
         return {'login': 'user-token'}
 
-    def add_repo_collaborator(self, owner, repo, username, permission='push'):
+    async def add_repo_collaborator(self, owner, repo, username, permission='push'):
         return {'ok': True}
 
 
@@ -87,6 +121,9 @@ class FakeCache:
     def get(self, key):
         return self.data.get(key)
 
+    def lookup(self, key):
+        return self.data.get(key), False
+
     def set(self, key, value):
         self.data[key] = value
 
@@ -96,7 +133,7 @@ class FakeCache:
 
 def test_create_challenge_returns_repo_based_challenge_id():
     service = ChallengeService(FakeGithub(), FakeCache())
-    result = service.create_challenge('My Challenge', 'Long enough description for challenge creation.', version_count=3)
+    result = asyncio.run(service.create_challenge('My Challenge', 'Long enough description for challenge creation.', version_count=3))
     assert result['challenge_id'].startswith('challenge-my-challenge-')
     assert 'version/v1' in result['branches']
     assert 'version/v2' in result['branches']
@@ -105,19 +142,260 @@ def test_create_challenge_returns_repo_based_challenge_id():
 
 def test_list_challenges_filters_non_challenge_repos():
     service = ChallengeService(FakeGithub(), FakeCache())
-    items = service.list_challenges()
+    items = asyncio.run(service.page_challenges())['items']
     assert len(items) == 1
     assert items[0]['challenge_id'] == 'challenge-demo-abc123'
 
 
 def test_create_challenge_for_requester_uses_requester_token_identity():
     service = ChallengeService(FakeGithub(), FakeCache())
-    result = service.create_challenge_for_requester(
+    result = asyncio.run(service.create_challenge_for_requester(
         title='Requester Challenge',
         description='Long enough description for requester challenge flow.',
         requester_token='token-abc',
         problem_filename='problem.md',
         problem_content='problem content',
-    )
+    ))
     assert result['requester'] == 'user-token'
     assert result['problem_file'] == 'problem.md'
+
+
+def test_create_challenge_for_requester_scaffolds_in_single_commit():
+    github = FakeGithub()
+    service = ChallengeService(github, FakeCache())
+    asyncio.run(service.create_challenge_for_requester(
+        title='Requester Challenge',
+        description='Long enough description for requester challenge flow.',
+        requester_token='token-abc',
+        problem_filename='nested/problem.md',
+        problem_content='problem content',
+        version_count=5,
+    ))
+    assert len(github.commits) == 1
+    branch, files = github.commits[0]
+    assert branch == 'main'
+    assert set(files) == {'CHALLENGE.md', '.github/workflows/skill-ci.yml', 'problem.md'}
+    assert 'version/v5' in files['.github/workflows/skill-ci.yml']
+
+
+def test_branch_setup_is_bounded_and_collects_failures(monkeypatch):
+    from app.core import config
+    from app.core.errors import GithubApiError
+
+    monkeypatch.setattr(config.settings, 'branch_setup_concurrency', 3)
+
+    class SlowGithub(FakeGithub):
+        def __init__(self):
+            super().__init__()
+            self.in_flight = 0
+            self.peak = 0
+
+        async def ensure_branch(self, owner, repo, branch, base_sha):
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            if branch == 'version/v7':
+                raise RuntimeError('boom')
+
+    github = SlowGithub()
+    service = ChallengeService(github, FakeCache())
+    with pytest.raises(GithubApiError) as exc:
+        asyncio.run(service.create_challenge('My Challenge', 'Long enough description for challenge creation.', version_count=10))
+    assert exc.value.details['failed_branches'] == {'version/v7': 'boom'}
+    assert github.peak == 3
+
+
+def test_challenge_detail_uses_graphql_snapshot():
+    service = ChallengeService(FakeGithub(), FakeCache())
+    detail = asyncio.run(service.get_challenge_detail('challenge-demo-abc123'))
+    assert detail['version_branches'] == ['version/v1', 'version/v2', 'version/v10']
+    assert detail['description'] == '# Demo'
+    assert detail['recent_submissions'][0]['status'] == 'open'
+
+
+def test_challenge_detail_falls_back_to_rest_when_graphql_fails():
+    from app.core.errors import GithubApiError
+
+    class NoGraphqlGithub(FakeGithub):
+        async def get_challenge_snapshot(self, owner, repo, pulls_limit=20):
+            raise GithubApiError('graphql unavailable', 502)
+
+    service = ChallengeService(NoGraphqlGithub(), FakeCache())
+    detail = asyncio.run(service.get_challenge_detail('challenge-demo-abc123'))
+    assert detail['version_branches'] == ['version/v1', 'version/v2', 'version/v3']
+
+
+def test_stale_entry_is_served_and_refreshed_in_background():
+    class StaleCache(FakeCache):
+        def lookup(self, key):
+            return self.data.get(key), True
+
+    github = FakeGithub()
+    cache = StaleCache()
+    cache.data['challenge:detail:challenge-demo-abc123'] = {'title': 'old'}
+    service = ChallengeService(github, cache)
+
+    async def run():
+        detail = await service.get_challenge_detail('challenge-demo-abc123')
+        await asyncio.gather(*service._background)
+        return detail
+
+    assert asyncio.run(run()) == {'title': 'old'}
+    assert cache.data['challenge:detail:challenge-demo-abc123']['title'] == 'SciLand challenge: Demo'
+
+
+def test_list_challenges_is_served_from_index_after_first_scan():
+    class CountingGithub(FakeGithub):
+        scans = 0
+
+        async def iter_org_repos(self):
+            self.scans += 1
+            async for repo in super().iter_org_repos():
+                yield repo
+
+    github = CountingGithub()
+    service = ChallengeService(github, FakeCache())
+
+    async def run():
+        await service.page_challenges()
+        await service.create_challenge('My Challenge', 'Long enough description for challenge creation.')
+        return (await service.page_challenges())['items']
+
+    items = asyncio.run(run())
+    assert github.scans == 1
+    assert [item['challenge_id'] for item in items] == ['challenge-demo-abc123', github.created_repo]
+
+
+def test_challenge_index_persists_and_reconcile_replaces_entries(tmp_path):
+    from app.services.challenge_index import ChallengeIndex
+
+    path = str(tmp_path / 'index.json')
+    index = ChallengeIndex(path)
+    index.upsert({'challenge_id': 'challenge-gone', 'title': 'gone'})
+    service = ChallengeService(FakeGithub(), FakeCache(), index=index)
+    assert asyncio.run(service.reconcile_index()) == 1
+
+    reloaded = ChallengeIndex(path)
+    assert reloaded.seeded
+    assert [item['challenge_id'] for item in reloaded.items()] == ['challenge-demo-abc123']
+
+
+def test_failed_provisioning_resumes_from_checkpoint():
+    from app.core.errors import GithubApiError
+
+    class FlakyGithub(FakeGithub):
+        def __init__(self):
+            super().__init__()
+            self.repo_creates = 0
+            self.branch_calls = []
+            self.protect_calls = []
+            self.fail_branch = 'version/v3'
+
+        async def create_org_repo(self, name, description):
+            self.repo_creates += 1
+            return await super().create_org_repo(name, description)
+
+        async def ensure_branch(self, owner, repo, branch, base_sha):
+            self.branch_calls.append(branch)
+            if branch == self.fail_branch:
+                raise GithubApiError('server error', 502)
+            return {'ok': True}
+
+        async def protect_branch(self, owner, repo, branch):
+            self.protect_calls.append(branch)
+            return True
+
+    github = FlakyGithub()
+    service = ChallengeService(github, FakeCache())
+    args = ('Flaky Challenge', 'Long enough description for challenge creation.', 4)
+    with pytest.raises(GithubApiError) as exc:
+        asyncio.run(service.create_challenge(*args))
+    assert exc.value.details['resumable'] is True
+    first_repo = github.created_repo
+
+    github.fail_branch = None
+    github.branch_calls = []
+    result = asyncio.run(service.create_challenge(*args))
+
+    assert result['challenge_id'] == first_repo
+    assert github.repo_creates == 1
+    assert len(github.commits) == 1
+    assert github.branch_calls == ['version/v3']
+    assert sorted(github.protect_calls) == ['main', 'version/v1', 'version/v2', 'version/v3', 'version/v4']
+    assert service.provisioning.pending() == []
+
+
+def test_provisioning_adopts_repo_created_before_a_crash(tmp_path):
+    from app.core.errors import GithubApiError
+    from app.services.provisioning_store import ProvisioningStore, provisioning_key
+
+    directory = str(tmp_path / 'provisioning')
+    key = provisioning_key('challenge', 'retry-1')
+    # The previous process reserved the name and died right after GitHub created the repo.
+    ProvisioningStore(directory).begin(key, 'challenge-crashed-abc123')
+
+    class ExistingRepoGithub(FakeGithub):
+        async def create_org_repo(self, name, description):
+            raise GithubApiError('name already exists on this account', 422)
+
+    github = ExistingRepoGithub()
+    service = ChallengeService(github, FakeCache(), provisioning=ProvisioningStore(directory))
+    result = asyncio.run(
+        service.create_challenge('Crashed', 'Long enough description for challenge creation.', idempotency_key='retry-1')
+    )
+    assert result['challenge_id'] == 'challenge-crashed-abc123'
+
+
+def test_coalesced_provisioning_shares_progress():
+    class SlowGithub(FakeGithub):
+        async def ensure_branch(self, owner, repo, branch, base_sha):
+            await asyncio.sleep(0.01)
+            return {'ok': True}
+
+    service = ChallengeService(SlowGithub(), FakeCache())
+    args = ('Shared Challenge', 'Long enough description for challenge creation.', 3)
+
+    async def run():
+        first, second = {}, {}
+        leader = asyncio.ensure_future(service.create_challenge(*args, progress=first))
+        await asyncio.sleep(0.005)
+        follower = asyncio.ensure_future(service.create_challenge(*args, progress=second))
+        await asyncio.sleep(0)
+        # The follower joined mid-flight and sees the run's progress so far.
+        assert second['step'] == first['step'] == 'branches'
+        results = await asyncio.gather(leader, follower)
+        return first, second, results
+
+    first, second, results = asyncio.run(run())
+    assert results[0] == results[1]
+    assert second == first
+    assert second['step'] == 'done'
+    assert second['branches'] == {'done': 3, 'total': 3}
+    assert service._provision_progress == {}
+
+
+def test_completed_branches_are_checkpointed_in_batches(tmp_path):
+    import json
+
+    from app.services.provisioning_store import ProvisioningStore
+
+    store = ProvisioningStore(str(tmp_path / 'provisioning'), flush_seconds=60)
+    store.begin('key-1', 'challenge-batch-abc123')
+    for branch in ('version/v1', 'version/v2', 'version/v3'):
+        store.add('key-1', 'branches', branch)
+    path = tmp_path / 'provisioning' / 'key-1.json'
+    assert json.loads(path.read_text())['branches'] == []
+
+    store.flush('key-1')
+    assert json.loads(path.read_text())['branches'] == ['version/v1', 'version/v2', 'version/v3']
+
+
+def test_rejected_protections_are_reported():
+    class RejectingGithub(FakeGithub):
+        async def protect_branch(self, owner, repo, branch):
+            return branch != 'version/v2'
+
+    service = ChallengeService(RejectingGithub(), FakeCache())
+    result = asyncio.run(service.create_challenge('Rejected', 'Long enough description for challenge creation.', 2))
+    assert result['protection_failures'] == {'version/v2': 'protection rejected by GitHub'}
@@ -0,0 +1,58 @@
+import threading
+
+from app.services.check_run_store import CheckRunStore
+
+
+def test_runs_are_unknown_until_seeded(tmp_path):
+    store = CheckRunStore(str(tmp_path / 'check_runs.sqlite3'))
+    store.record('SciLand-9', 'challenge-a', {'id': 1, 'name': 'lint', 'head_sha': 'abc', 'status': 'in_progress'})
+    assert store.runs('SciLand-9', 'challenge-a', 'abc') is None
+
+    runs = store.seed('SciLand-9', 'challenge-a', 'abc', [{'id': 2, 'name': 'test', 'status': 'completed', 'conclusion': 'success'}])
+    assert runs == [
+        {'id': 1, 'name': 'lint', 'status': 'in_progress', 'conclusion': None},
+        {'id': 2, 'name': 'test', 'status': 'completed', 'conclusion': 'success'},
+    ]
+    assert store.stats() == {'check_runs': 2, 'commits': 1}
+
+
+def test_only_the_latest_run_per_name_and_app_counts(tmp_path):
+    store = CheckRunStore(str(tmp_path / 'check_runs.sqlite3'))
+    actions = {'id': 15368}
+    store.seed(
+        'SciLand-9',
+        'challenge-a',
+        'abc',
+        [
+            {'id': 1, 'name': 'test', 'app': actions, 'status': 'completed', 'conclusion': 'failure'},
+            {'id': 2, 'name': 'test', 'app': {'id': 99}, 'status': 'completed', 'conclusion': 'success'},
+        ],
+    )
+    store.record('SciLand-9', 'challenge-a', {'id': 3, 'name': 'test', 'app': actions, 'head_sha': 'abc', 'status': 'queued'})
+
+    assert [(run['id'], run['status']) for run in store.runs('SciLand-9', 'challenge-a', 'abc')] == [(2, 'completed'), (3, 'queued')]
+
+
+def test_late_deliveries_do_not_reopen_completed_runs(tmp_path):
+    path = str(tmp_path / 'check_runs.sqlite3')
+    store = CheckRunStore(path)
+    store.seed('SciLand-9', 'challenge-a', 'abc', [])
+    store.record('SciLand-9', 'challenge-a', {'id': 1, 'name': 'test', 'head_sha': 'abc', 'status': 'completed', 'conclusion': 'failure'})
+    store.record('SciLand-9', 'challenge-a', {'id': 1, 'name': 'test', 'head_sha': 'abc', 'status': 'queued'})
+
+    # Shared with other workers through the same file.
+    other = CheckRunStore(path)
+    assert other.runs('SciLand-9', 'challenge-a', 'abc') == [{'id': 1, 'name': 'test', 'status': 'completed', 'conclusion': 'failure'}]
+
+
+def test_in_memory_store_is_shared_across_threads():
+    store = CheckRunStore()
+    worker = threading.Thread(
+        target=store.record,
+        args=('SciLand-9', 'challenge-a', {'id': 1, 'name': 'lint', 'head_sha': 'abc', 'status': 'queued'}),
+    )
+    worker.start()
+    worker.join()
+    assert store.seed('SciLand-9', 'challenge-a', 'abc', []) == [
+        {'id': 1, 'name': 'lint', 'status': 'queued', 'conclusion': None},
+    ]
@@ -0,0 +1,274 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.errors import GithubApiError, NotFoundError
+from app.services.github_client import GithubClient
+
+
+def make_client(handler):
+    return GithubClient(transport=httpx.MockTransport(handler))
+
+
+def test_get_repo_returns_json_payload():
+    def handler(request):
+        assert request.url.path == '/repos/SciLand-9/challenge-demo'
+        return httpx.Response(200, json={'name': 'challenge-demo'})
+
+    async def run():
+        client = make_client(handler)
+        try:
+            return await client.get_repo('SciLand-9', 'challenge-demo')
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run())['name'] == 'challenge-demo'
+
+
+def test_error_statuses_map_to_app_errors():
+    def handler(request):
+        if request.url.path.endswith('/missing'):
+            return httpx.Response(404, json={'message': 'Not Found'})
+        return httpx.Response(403, json={'message': 'Forbidden'})
+
+    async def run():
+        client = make_client(handler)
+        try:
+            with pytest.raises(NotFoundError):
+                await client.get_repo('SciLand-9', 'missing')
+            with pytest.raises(GithubApiError) as exc:
+                await client.get_repo('SciLand-9', 'forbidden')
+            assert exc.value.status_code == 403
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+
+def test_requester_calls_use_requester_token():
+    def handler(request):
+        assert request.headers['authorization'] == 'Bearer user-token'
+        return httpx.Response(200, json={'login': 'user-a'})
+
+    async def run():
+        client = make_client(handler)
+        try:
+            return await client.get_authenticated_user('user-token')
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run())['login'] == 'user-a'
+
+
+def test_conditional_get_replays_body_on_not_modified():
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get('if-none-match'))
+        if request.headers.get('if-none-match') == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={'name': 'challenge-demo'}, headers={'ETag': '"v1"'})
+
+    async def run():
+        client = make_client(handler)
+        try:
+            first = await client.get_repo('SciLand-9', 'challenge-demo')
+            second = await client.get_repo('SciLand-9', 'challenge-demo')
+            return first, second, client.stats()['conditional']
+        finally:
+            await client.aclose()
+
+    first, second, stats = asyncio.run(run())
+    assert first == second == {'name': 'challenge-demo'}
+    assert seen == [None, '"v1"']
+    assert stats['not_modified'] == 1
+
+
+def test_challenge_snapshot_maps_graphql_to_rest_shapes():
+    def handler(request):
+        assert request.url.path == '/graphql'
+        return httpx.Response(200, json={'data': {'repository': {
+            'description': 'SciLand challenge: Demo',
+            'url': 'https://github.com/SciLand-9/challenge-demo',
+            'defaultBranchRef': {'name': 'main'},
+            'readme': {'text': '# Demo'},
+            'refs': {'nodes': [{'name': 'v1'}, {'name': 'v2'}], 'pageInfo': {'hasNextPage': False, 'endCursor': None}},
+            'pullRequests': {'nodes': [{
+                'number': 3, 'title': 'submission', 'url': 'https://github.com/SciLand-9/challenge-demo/pull/3',
+                'state': 'MERGED', 'mergedAt': '2026-01-01T00:00:00Z', 'baseRefName': 'version/v1', 'headRefName': 'feat',
+            }]},
+        }}})
+
+    async def run():
+        client = make_client(handler)
+        try:
+            return await client.get_challenge_snapshot('SciLand-9', 'challenge-demo')
+        finally:
+            await client.aclose()
+
+    snapshot = asyncio.run(run())
+    assert snapshot['branches'] == ['version/v1', 'version/v2']
+    assert snapshot['readme'] == '# Demo'
+    assert snapshot['pulls'][0]['base']['ref'] == 'version/v1'
+    assert snapshot['pulls'][0]['state'] == 'closed'
+    assert snapshot['pulls'][0]['merged_at']
+
+
+def test_later_ref_pages_use_the_refs_only_query():
+    queries = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        queries.append(body['query'])
+        after = body['variables']['refsAfter']
+        refs = {
+            'nodes': [{'name': 'v2' if after else 'v1'}],
+            'pageInfo': {'hasNextPage': not after, 'endCursor': 'cursor-1'},
+        }
+        if after:
+            return httpx.Response(200, json={'data': {'repository': {'refs': refs}}})
+        return httpx.Response(200, json={'data': {'repository': {
+            'description': None, 'url': 'https://github.com/SciLand-9/challenge-demo', 'defaultBranchRef': None,
+            'readme': None, 'refs': refs, 'pullRequests': {'nodes': []},
+        }}})
+
+    async def run():
+        client = make_client(handler)
+        try:
+            return await client.get_challenge_snapshot('SciLand-9', 'challenge-demo')
+        finally:
+            await client.aclose()
+
+    snapshot = asyncio.run(run())
+    assert snapshot['branches'] == ['version/v1', 'version/v2']
+    assert 'pullRequests' in queries[0]
+    assert 'pullRequests' not in queries[1]
+
+
+def test_graphql_url_on_enterprise_server(monkeypatch):
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        if request.url.path == '/api/graphql':
+            return httpx.Response(200, json={'data': {'repository': None}, 'errors': [{'type': 'NOT_FOUND', 'message': 'no repo'}]})
+        return httpx.Response(404, json={'message': 'Not Found'})
+
+    monkeypatch.setattr(settings, 'github_api_base', 'https://ghes.example.com/api/v3')
+
+    async def run():
+        client = make_client(handler)
+        try:
+            # A repo GraphQL cannot resolve is a real not-found.
+            with pytest.raises(NotFoundError):
+                await client.graphql('query { viewer { login } }', {})
+            # A missing endpoint is an API error, so callers fall back to REST.
+            client.graphql_url = 'https://ghes.example.com/api/v3/graphql'
+            with pytest.raises(GithubApiError) as error:
+                await client.graphql('query { viewer { login } }', {})
+            return error.value
+        finally:
+            await client.aclose()
+
+    error = asyncio.run(run())
+    assert error.status_code == 404
+    assert paths == ['/api/graphql', '/api/v3/graphql']
+
+
+def test_not_modified_replays_an_entry_evicted_during_the_request():
+    def handler(request):
+        if request.headers.get('if-none-match') == '"v1"':
+            # Another request fills the LRU while this one is in flight.
+            client._validators.clear()
+            return httpx.Response(304)
+        return httpx.Response(200, json={'name': 'challenge-demo'}, headers={'ETag': '"v1"'})
+
+    client = make_client(handler)
+
+    async def run():
+        try:
+            await client.get_repo('SciLand-9', 'challenge-demo')
+            return await client.get_repo('SciLand-9', 'challenge-demo')
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == {'name': 'challenge-demo'}
+
+
+def test_requester_identity_is_cached_by_token_hash():
+    calls = []
+
+    def handler(request):
+        calls.append(request.headers['authorization'])
+        return httpx.Response(200, json={'login': 'user-a', 'id': 7})
+
+    async def run():
+        client = make_client(handler)
+        try:
+            first = await client.get_authenticated_user('user-token')
+            second = await client.get_authenticated_user('user-token')
+            return first, second, client
+        finally:
+            await client.aclose()
+
+    first, second, client = asyncio.run(run())
+    assert first['login'] == second['login'] == 'user-a'
+    assert len(calls) == 1
+    assert 'user-token' not in client._identities
+    assert client.stats()['requester_identity']['hits'] == 1
+
+
+def test_org_repos_fetches_remaining_pages_from_link_header():
+    pages = []
+
+    def handler(request):
+        page = int(request.url.params['page'])
+        pages.append(page)
+        headers = {}
+        if page == 1:
+            headers['Link'] = (
+                '<https://api.github.com/orgs/SciLand-9/repos?per_page=100&page=2>; rel="next", '
+                '<https://api.github.com/orgs/SciLand-9/repos?per_page=100&page=3>; rel="last"'
+            )
+        size = 100 if page < 3 else 5
+        return httpx.Response(200, json=[{'name': f'repo-{page}-{i}'} for i in range(size)], headers=headers)
+
+    async def run():
+        client = make_client(handler)
+        try:
+            return [repo['name'] async for repo in client.iter_org_repos()]
+        finally:
+            await client.aclose()
+
+    names = asyncio.run(run())
+    assert len(names) == 205
+    assert names[0] == 'repo-1-0' and names[-1] == 'repo-3-4'
+    assert sorted(pages) == [1, 2, 3]
+
+
+def test_actions_approval_lists_only_the_commits_runs():
+    requests = []
+
+    def handler(request):
+        requests.append((request.method, request.url.path, dict(request.url.params)))
+        if request.method == 'POST':
+            return httpx.Response(201, json={})
+        waiting = {'id': 7, 'head_sha': 'abc123', 'status': 'completed', 'conclusion': 'action_required'}
+        running = {'id': 8, 'head_sha': 'abc123', 'status': 'in_progress', 'conclusion': None}
+        return httpx.Response(200, json={'total_count': 2, 'workflow_runs': [waiting, running]})
+
+    async def run():
+        client = make_client(handler)
+        try:
+            return await client.approve_action_required_runs_for_sha('SciLand-9', 'challenge-demo', 'abc123')
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == {'listed': 2, 'approved': 1}
+    assert requests == [
+        ('GET', '/repos/SciLand-9/challenge-demo/actions/runs', {'per_page': '100', 'head_sha': 'abc123'}),
+        ('POST', '/repos/SciLand-9/challenge-demo/actions/runs/7/approve', {}),
+    ]
@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+import httpx
+
+from app.services.github_client import GithubClient
+from app.services.github_scheduler import PRIORITY_HIGH, PRIORITY_LOW, RateLimitScheduler
+
+
+def test_reserve_budget_is_kept_for_high_priority_calls():
+    scheduler = RateLimitScheduler(reserve=5, pacing_threshold=0)
+    scheduler.observe(200, {'X-RateLimit-Remaining': '5', 'X-RateLimit-Reset': str(time.time() + 0.2)})
+
+    async def run():
+        order = []
+
+        async def call(name, priority):
+            await scheduler.acquire(priority)
+            order.append(name)
+
+        low = asyncio.create_task(call('low', PRIORITY_LOW))
+        await asyncio.sleep(0)
+        high = asyncio.create_task(call('high', PRIORITY_HIGH))
+        await asyncio.gather(low, high)
+        return order
+
+    assert asyncio.run(run()) == ['high', 'low']
+    stats = scheduler.stats()
+    assert stats['queued'] == 2
+    assert stats['queue_depth'] == 0
+
+
+def test_secondary_rate_limit_is_retried_after_retry_after():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(403, json={'message': 'You have exceeded a secondary rate limit'}, headers={'Retry-After': '0'})
+        return httpx.Response(200, json={'name': 'challenge-demo'})
+
+    async def run():
+        client = GithubClient(transport=httpx.MockTransport(handler))
+        try:
+            return await client.get_repo('SciLand-9', 'challenge-demo'), client.stats()['rate_limit']
+        finally:
+            await client.aclose()
+
+    repo, stats = asyncio.run(run())
+    assert repo['name'] == 'challenge-demo'
+    assert len(calls) == 2
+    assert stats['throttled'] == 1
+
+
+def test_graphql_calls_do_not_spend_the_core_budget():
+    scheduler = RateLimitScheduler(reserve=5, pacing_threshold=0)
+    scheduler.observe(200, {'X-RateLimit-Remaining': '5', 'X-RateLimit-Reset': str(time.time() + 60)})
+
+    async def run():
+        # Core is down to its reserve, which low-priority REST calls may not touch.
+        await asyncio.wait_for(scheduler.acquire(PRIORITY_LOW, 'graphql'), timeout=1)
+
+    asyncio.run(run())
+    assert scheduler.remaining == 5
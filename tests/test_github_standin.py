@@ -0,0 +1,49 @@
+import asyncio
+
+from app.core import config
+from app.services.challenge_service import ChallengeService
+from app.services.github_client import GithubClient
+from bench.github_standin import GithubStandIn
+
+
+class MemoryCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def lookup(self, key):
+        return self.data.get(key), False
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def clear(self, key):
+        self.data.pop(key, None)
+
+
+def test_challenge_flow_against_standin(monkeypatch):
+    monkeypatch.setattr(config.settings, 'github_org', 'SciLand-9')
+    standin = GithubStandIn(org='SciLand-9')
+    standin.seed_org(repo_count=250, challenge_ratio=0.1)
+
+    async def run():
+        github = GithubClient(transport=standin)
+        service = ChallengeService(github, MemoryCache())
+        try:
+            created = await service.create_challenge('Bench Challenge', 'Long enough description for the stand-in.', version_count=4)
+            items = (await service.page_challenges())['items']
+            detail = await service.get_challenge_detail(created['challenge_id'])
+            return created, items, detail
+        finally:
+            await github.aclose()
+
+    created, items, detail = asyncio.run(run())
+    repo = standin.repos[created['challenge_id']]
+    assert repo['protected'] == {'main', 'version/v1', 'version/v2', 'version/v3', 'version/v4'}
+    assert '.github/workflows/skill-ci.yml' in repo['files']
+    assert len(items) == 26
+    assert detail['version_branches'] == ['version/v1', 'version/v2', 'version/v3', 'version/v4']
+    assert standin.calls['GET /orgs/{org}/repos'] == 3
+    assert standin.calls['POST /graphql'] == 1
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.core.errors import GithubApiError
+from app.services.github_client import GithubClient
+from app.services.job_service import JobService
+from bench.github_standin import GithubStandIn
+
+
+def test_jobs_are_capped_and_failures_recorded():
+    jobs = JobService(concurrency=2)
+    running = {'now': 0, 'peak': 0}
+
+    async def work(progress):
+        running['now'] += 1
+        running['peak'] = max(running['peak'], running['now'])
+        await asyncio.sleep(0.01)
+        running['now'] -= 1
+        progress['step'] = 'done'
+        return {'ok': True}
+
+    async def fail(progress):
+        raise GithubApiError('repo exists', 422, {'repo': 'challenge-x'})
+
+    async def run():
+        submitted = [jobs.submit('work', work) for _ in range(5)] + [jobs.submit('fail', fail)]
+        assert submitted[0]['status'] == 'queued'
+        await asyncio.sleep(0.1)
+        return [jobs.get(job['job_id']) for job in submitted]
+
+    finished = asyncio.run(run())
+    assert running['peak'] == 2
+    assert [job['status'] for job in finished] == ['succeeded'] * 5 + ['failed']
+    assert finished[0]['progress'] == {'step': 'done'}
+    assert finished[-1]['error'] == {'message': 'repo exists', 'status_code': 422, 'details': {'repo': 'challenge-x'}}
+
+
+def test_async_challenge_creation_reports_progress(monkeypatch, tmp_path):
+    monkeypatch.setattr(config.settings, 'github_org', 'SciLand-9')
+    monkeypatch.setattr(config.settings, 'github_token', 'token')
+    monkeypatch.setattr(config.settings, 'moderator_api_key', 'moderator')
+    monkeypatch.setattr(config.settings, 'cache_file', str(tmp_path / 'cache.json'))
+    monkeypatch.setattr(config.settings, 'challenge_index_file', str(tmp_path / 'index.json'))
+    monkeypatch.setattr(config.settings, 'submission_store_dir', str(tmp_path / 'submissions'))
+    monkeypatch.setattr(config.settings, 'provisioning_dir', str(tmp_path / 'provisioning'))
+    monkeypatch.setattr(config.settings, 'webhook_queue_path', str(tmp_path / 'webhooks.sqlite3'))
+    from app.main import create_app
+
+    standin = GithubStandIn(org='SciLand-9')
+    app = create_app(github=GithubClient(transport=standin))
+    with TestClient(app) as client:
+        response = client.post(
+            '/api/v1/challenges?async=true',
+            json={'title': 'Async Challenge', 'description': 'Created by a background job.', 'version_count': 6},
+            headers={'Authorization': 'Bearer moderator'},
+        )
+        assert response.status_code == 202
+        location = response.headers['Location']
+
+        deadline = time.monotonic() + 5
+        job = client.get(location).json()
+        while job['status'] in {'queued', 'running'} and time.monotonic() < deadline:
+            time.sleep(0.01)
+            job = client.get(location).json()
+
+    assert job['status'] == 'succeeded'
+    assert job['progress']['branches'] == {'done': 6, 'total': 6}
+    assert job['progress']['protection'] == {'done': 7, 'total': 7}
+    assert job['result']['challenge_id'] in standin.repos
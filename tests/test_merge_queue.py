@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from app.core.errors import GithubApiError
+from app.services.merge_queue import MergeQueue
+
+
+def test_merges_into_one_branch_are_serialized():
+    queue = MergeQueue()
+    running = {'now': 0, 'peak': 0}
+    order = []
+    seen = []
+
+    def merge(number):
+        async def run():
+            running['now'] += 1
+            running['peak'] = max(running['peak'], running['now'])
+            seen.append(queue.positions('SciLand-9', 'challenge-a'))
+            await asyncio.sleep(0.01)
+            running['now'] -= 1
+            order.append(number)
+            return {'merged': True}
+
+        return run
+
+    async def run():
+        merges = [queue.merge('SciLand-9', 'challenge-a', 'version/v1', number, f'sha{number}', merge(number)) for number in (1, 2, 3)]
+        merges.append(queue.merge('SciLand-9', 'challenge-a', 'version/v2', 4, 'sha4', merge(4)))
+        return await asyncio.gather(*merges)
+
+    results = asyncio.run(run())
+    assert results == [{'merged': True}] * 4
+    assert [number for number in order if number != 4] == [1, 2, 3]
+    assert running['peak'] == 2
+    first = seen[0]
+    assert [(item['base_ref'], item['pull_number'], item['position']) for item in first] == [
+        ('version/v1', 1, 0),
+        ('version/v1', 2, 1),
+        ('version/v1', 3, 2),
+        ('version/v2', 4, 0),
+    ]
+    assert queue.stats() == {'branches': 0, 'queued': 0}
+
+
+def test_base_branch_conflicts_are_retried():
+    queue = MergeQueue(max_attempts=3, retry_seconds=0.001)
+    calls = {'flaky': 0, 'conflict': 0}
+
+    async def flaky():
+        calls['flaky'] += 1
+        if calls['flaky'] < 3:
+            raise GithubApiError('Base branch was modified. Review and try the merge again.', 405)
+        return {'merged': True}
+
+    async def conflict():
+        calls['conflict'] += 1
+        raise GithubApiError('Pull Request is not mergeable', 405)
+
+    async def run():
+        assert await queue.merge('SciLand-9', 'challenge-a', 'version/v1', 1, 'sha1', flaky) == {'merged': True}
+        with pytest.raises(GithubApiError):
+            await queue.merge('SciLand-9', 'challenge-a', 'version/v1', 2, 'sha2', conflict)
+
+    asyncio.run(run())
+    assert calls == {'flaky': 3, 'conflict': 3}
@@ -0,0 +1,48 @@
+from app.core.metrics import CACHE_LOOKUPS, Counter, Histogram, MetricsRegistry, cache_key_family, endpoint_template
+from app.services.cache_store import FileCacheStore
+
+
+def test_endpoint_template_collapses_identifiers():
+    assert endpoint_template('/repos/SciLand-9/challenge-x/pulls/12/merge') == '/repos/{owner}/{repo}/pulls/{id}/merge'
+    assert endpoint_template('/repos/o/r/branches/version/v1/protection') == '/repos/{owner}/{repo}/branches/{branch}/protection'
+    assert endpoint_template('/repos/o/r/branches/version/v1') == '/repos/{owner}/{repo}/branches/{branch}'
+    assert endpoint_template('/repos/o/r/git/refs/heads/version/v2') == '/repos/{owner}/{repo}/git/refs/heads/{branch}'
+    assert endpoint_template('/repos/o/r/commits/abc123/check-runs') == '/repos/{owner}/{repo}/commits/{ref}/check-runs'
+    assert endpoint_template('/orgs/SciLand-9/repos?per_page=100&page=3') == '/orgs/{org}/repos'
+
+
+def test_cache_key_family_drops_challenge_ids():
+    assert cache_key_family('challenge:detail:challenge-demo-abc123') == 'challenge:detail'
+    assert cache_key_family('submissions:challenge-demo-abc123') == 'submissions'
+    assert cache_key_family('challenges:list') == 'challenges:list'
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter('demo_total', 'Demo counter.', ['result']))
+    histogram = registry.register(Histogram('demo_seconds', 'Demo latency.', buckets=(0.1, 1.0)))
+    counter.inc(result='hit')
+    counter.inc(2, result='hit')
+    histogram.observe(0.5)
+
+    text = registry.render()
+    assert '# TYPE demo_total counter' in text
+    assert 'demo_total{result="hit"} 3' in text
+    assert 'demo_seconds_bucket{le="0.1"} 0' in text
+    assert 'demo_seconds_bucket{le="1"} 1' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 1' in text
+    assert 'demo_seconds_count 1' in text
+
+
+def test_cache_lookups_are_counted_by_family_and_result(tmp_path):
+    store = FileCacheStore(str(tmp_path / 'cache.json'), ttl_seconds=60, flush_interval_seconds=60)
+    before_hit = CACHE_LOOKUPS.value(family='challenge:detail', result='hit')
+    before_miss = CACHE_LOOKUPS.value(family='challenge:detail', result='miss')
+
+    store.get('challenge:detail:challenge-a')
+    store.set('challenge:detail:challenge-a', {'title': 'A'})
+    store.get('challenge:detail:challenge-a')
+
+    assert CACHE_LOOKUPS.value(family='challenge:detail', result='hit') == before_hit + 1
+    assert CACHE_LOOKUPS.value(family='challenge:detail', result='miss') == before_miss + 1
+    store.close()
@@ -0,0 +1,40 @@
+import asyncio
+
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_with_same_key_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {'value': 42}
+
+    async def run():
+        return await asyncio.gather(*(flights.run('challenges:list', fetch) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert all(result == {'value': 42} for result in results)
+    assert len(calls) == 1
+    assert flights.stats() == {'executed': 1, 'coalesced': 4, 'in_flight': 0}
+
+
+def test_failures_are_shared_and_not_cached():
+    flights = SingleFlight()
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0)
+        raise RuntimeError('upstream down')
+
+    async def run():
+        first = await asyncio.gather(flights.run('k', fail), flights.run('k', fail), return_exceptions=True)
+        second = await asyncio.gather(flights.run('k', fail), return_exceptions=True)
+        return first + second
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(calls) == 2
@@ -0,0 +1,35 @@
+import time
+
+from app.services.sqlite_cache_store import SqliteCacheStore
+
+
+def test_workers_share_writes_and_invalidations(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    worker_a = SqliteCacheStore(path, ttl_seconds=60)
+    worker_b = SqliteCacheStore(path, ttl_seconds=60)
+    try:
+        worker_a.set('challenge:detail:challenge-a', {'title': 'A'})
+        assert worker_b.get('challenge:detail:challenge-a') == {'title': 'A'}
+
+        worker_b.clear('challenge:detail:challenge-a')
+        assert worker_a.get('challenge:detail:challenge-a') is None
+    finally:
+        worker_a.close()
+        worker_b.close()
+
+
+def test_sweep_drops_expired_rows_and_trims_to_max_entries(tmp_path):
+    store = SqliteCacheStore(str(tmp_path / 'cache.sqlite3'), ttl_seconds=60, max_entries=2)
+    try:
+        for key in ['a', 'b', 'c']:
+            store.set(key, key)
+        store.ttl_seconds = 0
+        store.set('expired', 'x')
+        time.sleep(0.01)
+        assert store.get('expired') is None
+
+        store.sweep()
+        rows = store._db.conn().execute('SELECT key FROM cache_entries ORDER BY key').fetchall()
+        assert [row[0] for row in rows] == ['b', 'c']
+    finally:
+        store.close()
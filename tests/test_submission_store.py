@@ -0,0 +1,154 @@
+import asyncio
+import time
+
+from app.core import config
+from app.services.challenge_service import ChallengeService
+from app.services.github_client import GithubClient
+from app.services.submission_store import SubmissionStore, to_submission
+from app.services.webhook_service import WebhookService
+from bench.github_standin import GithubStandIn
+
+
+class MemoryCache:
+    def __init__(self):
+        self.data = {}
+
+    def lookup(self, key):
+        return self.data.get(key), False
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def clear(self, key):
+        self.data.pop(key, None)
+
+
+def test_backfill_is_complete_and_later_reads_are_local(monkeypatch):
+    monkeypatch.setattr(config.settings, 'github_org', 'SciLand-9')
+    standin = GithubStandIn(org='SciLand-9')
+    standin.add_repo('challenge-busy')
+    for _ in range(230):
+        standin.add_pull('challenge-busy', base='version/v1')
+
+    async def run():
+        github = GithubClient(transport=standin)
+        service = ChallengeService(github, MemoryCache())
+        try:
+            first = await service.list_submissions('challenge-busy')
+            calls = sum(standin.calls.values())
+            second = await service.list_submissions('challenge-busy')
+            return first, second, sum(standin.calls.values()) - calls
+        finally:
+            await github.aclose()
+
+    first, second, extra_calls = asyncio.run(run())
+    assert len(first) == 230
+    assert first[0]['number'] == 230
+    assert second == first
+    assert extra_calls == 0
+
+
+def test_poll_picks_up_updates_missed_by_webhooks(monkeypatch):
+    monkeypatch.setattr(config.settings, 'github_org', 'SciLand-9')
+    monkeypatch.setattr(config.settings, 'submission_poll_seconds', 0)
+    standin = GithubStandIn(org='SciLand-9')
+    standin.add_repo('challenge-poll')
+    for _ in range(3):
+        standin.add_pull('challenge-poll', base='version/v1')
+
+    async def run():
+        github = GithubClient(transport=standin)
+        service = ChallengeService(github, MemoryCache())
+        try:
+            await service.list_submissions('challenge-poll')
+            standin.add_pull('challenge-poll', base='version/v1')
+            await service.list_submissions('challenge-poll')
+            await asyncio.gather(*service._background)
+            return await service.list_submissions('challenge-poll')
+        finally:
+            await asyncio.gather(*service._background)
+            await github.aclose()
+
+    items = asyncio.run(run())
+    assert [item['number'] for item in items] == [4, 3, 2, 1]
+
+
+def test_webhook_deliveries_do_not_move_the_poll_high_water():
+    store = SubmissionStore()
+    store.replace('challenge-a', [{'number': 1, 'updated_at': '2026-01-01T09:00:00Z'}])
+    # PR 2 was updated at 10:00 but its delivery was missed; PR 3's arrived.
+    store.upsert('challenge-a', [{'number': 3, 'updated_at': '2026-01-01T10:05:00Z'}])
+    assert store.high_water('challenge-a') == '2026-01-01T09:00:00Z'
+
+    polled = [{'number': 3, 'updated_at': '2026-01-01T10:05:00Z'}, {'number': 2, 'updated_at': '2026-01-01T10:00:00Z'}]
+    store.upsert('challenge-a', polled, polled=True)
+    assert [item['number'] for item in store.list('challenge-a')] == [3, 2, 1]
+    assert store.high_water('challenge-a') == '2026-01-01T10:05:00Z'
+
+
+def test_pull_request_webhook_upserts_submission():
+    store = SubmissionStore()
+    store.replace('challenge-a', [])
+    service = WebhookService(None, MemoryCache(), submissions=store)
+    pull = {
+        'number': 7,
+        'title': 'submission',
+        'html_url': 'https://github.com/SciLand-9/challenge-a/pull/7',
+        'base': {'ref': 'version/v1'},
+        'head': {'ref': 'submissions/7'},
+        'state': 'closed',
+        'merged_at': None,
+        'updated_at': '2026-02-01T00:00:00Z',
+    }
+    repository = {'name': 'challenge-a', 'owner': {'login': 'SciLand-9'}}
+    asyncio.run(service.process('pull_request', {'action': 'closed', 'repository': repository, 'pull_request': pull}))
+    assert store.list('challenge-a')[0]['status'] == 'closed'
+
+    # A late redelivery of an older state is ignored.
+    older = dict(pull, state='open', updated_at='2026-01-01T00:00:00Z')
+    assert store.upsert('challenge-a', [to_submission(older)]) == 0
+    assert store.list('challenge-a')[0]['status'] == 'closed'
+
+
+def test_store_persists_per_challenge_files(tmp_path):
+    store = SubmissionStore(str(tmp_path))
+    store.replace('challenge-a', [{'number': 1, 'updated_at': '2026-01-01T00:00:00Z'}])
+    reloaded = SubmissionStore(str(tmp_path))
+    assert reloaded.is_backfilled('challenge-a')
+    assert reloaded.high_water('challenge-a') == '2026-01-01T00:00:00Z'
+
+
+def test_backfill_keeps_webhook_upserts_made_while_it_ran():
+    store = SubmissionStore()
+    store.replace('challenge-a', [{'number': 1, 'status': 'open', 'updated_at': '2026-01-01T09:00:00Z'}])
+    started_at = time.time()
+    # Deliveries handled while the backfill is still paging.
+    store.upsert('challenge-a', [{'number': 1, 'status': 'closed', 'updated_at': '2026-01-01T10:00:00Z'}])
+    store.upsert('challenge-a', [{'number': 2, 'status': 'open', 'updated_at': '2026-01-01T10:01:00Z'}])
+
+    store.replace('challenge-a', [{'number': 1, 'status': 'open', 'updated_at': '2026-01-01T09:00:00Z'}], started_at)
+    assert [(item['number'], item['status']) for item in store.list('challenge-a')] == [(2, 'open'), (1, 'closed')]
+
+
+def test_sync_rebuilds_even_while_a_poll_is_running(monkeypatch):
+    monkeypatch.setattr(config.settings, 'github_org', 'SciLand-9')
+    monkeypatch.setattr(config.settings, 'submission_poll_seconds', 0)
+    standin = GithubStandIn(org='SciLand-9')
+    standin.add_repo('challenge-sync')
+    standin.add_pull('challenge-sync', base='version/v1')
+
+    async def run():
+        github = GithubClient(transport=standin)
+        service = ChallengeService(github, MemoryCache())
+        try:
+            await service.list_submissions('challenge-sync')
+            standin.add_pull('challenge-sync', base='version/v1')
+            # Starts a background poll; the sync must not just join it.
+            await service.list_submissions('challenge-sync')
+            await asyncio.sleep(0)
+            return await service.sync_challenge('challenge-sync')
+        finally:
+            await asyncio.gather(*service._background)
+            await github.aclose()
+
+    assert asyncio.run(run())['submission_count'] == 2
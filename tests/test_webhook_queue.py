@@ -0,0 +1,154 @@
+import asyncio
+import json
+import sqlite3
+import time
+
+from app.services.webhook_queue import WebhookDispatcher, WebhookQueue
+
+
+class FakeWebhookService:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.processed = []
+
+    async def process(self, event, payload):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError('github unavailable')
+        self.processed.append((event, payload))
+        return {'ok': True, 'processed': True}
+
+
+def test_redelivered_ids_are_dropped(tmp_path):
+    queue = WebhookQueue(str(tmp_path / 'webhooks.sqlite3'))
+    assert queue.enqueue('delivery-1', 'pull_request', '{"action": "opened"}')
+    assert not queue.enqueue('delivery-1', 'pull_request', '{"action": "opened"}')
+
+    delivery = queue.claim()
+    assert delivery == {'delivery_id': 'delivery-1', 'event': 'pull_request', 'payload': {'action': 'opened'}, 'attempts': 1}
+    queue.complete('delivery-1')
+    assert queue.claim() is None
+    # Still recognised after processing, until the retention window passes.
+    assert not queue.enqueue('delivery-1', 'pull_request', '{"action": "opened"}')
+    assert queue.stats() == {'done': 1}
+
+
+def test_failures_back_off_and_are_parked(tmp_path):
+    queue = WebhookQueue(str(tmp_path / 'webhooks.sqlite3'), max_attempts=2, retry_seconds=0.05)
+    queue.enqueue('delivery-1', 'check_run', '{}')
+
+    delivery = queue.claim()
+    queue.fail('delivery-1', delivery['attempts'], 'boom')
+    assert queue.claim() is None
+    time.sleep(0.06)
+    delivery = queue.claim()
+    assert delivery['attempts'] == 2
+    queue.fail('delivery-1', delivery['attempts'], 'boom')
+    time.sleep(0.11)
+    assert queue.claim() is None
+    assert queue.stats() == {'failed': 1}
+
+
+def test_expired_lease_is_claimed_again(tmp_path):
+    path = str(tmp_path / 'webhooks.sqlite3')
+    crashed = WebhookQueue(path, lease_seconds=0.05)
+    crashed.enqueue('delivery-1', 'pull_request', '{}')
+    assert crashed.claim()['attempts'] == 1
+
+    other = WebhookQueue(path, lease_seconds=0.05)
+    assert other.claim() is None
+    time.sleep(0.06)
+    assert other.claim()['attempts'] == 2
+
+
+def test_dispatcher_processes_and_retries(tmp_path):
+    queue = WebhookQueue(str(tmp_path / 'webhooks.sqlite3'), retry_seconds=0.01)
+    service = FakeWebhookService(failures=1)
+    dispatcher = WebhookDispatcher(queue, service, workers=2, poll_seconds=0.01)
+
+    async def run():
+        body = json.dumps({'action': 'synchronize'}).encode()
+        assert dispatcher.submit('delivery-1', 'pull_request', body)
+        assert not dispatcher.submit('delivery-1', 'pull_request', body)
+        await asyncio.sleep(0.05)
+        await dispatcher.wait_idle(timeout=2)
+        stats = dispatcher.stats()
+        await dispatcher.close()
+        return stats
+
+    stats = asyncio.run(run())
+    assert service.processed == [('pull_request', {'action': 'synchronize'})]
+    assert stats['accepted'] == 1
+    assert stats['duplicates'] == 1
+    assert stats['retried'] == 1
+    assert stats['processed'] == 1
+    assert stats['queue'] == {'done': 1}
+
+
+def test_redelivery_requeues_a_failed_delivery(tmp_path):
+    queue = WebhookQueue(str(tmp_path / 'webhooks.sqlite3'), max_attempts=1)
+    queue.enqueue('delivery-1', 'check_run', '{}')
+    queue.fail('delivery-1', queue.claim()['attempts'], 'boom')
+    assert queue.stats() == {'failed': 1}
+
+    assert queue.enqueue('delivery-1', 'check_run', '{"action": "completed"}')
+    delivery = queue.claim()
+    assert delivery['attempts'] == 1
+    assert delivery['payload'] == {'action': 'completed'}
+
+
+def test_delivery_that_keeps_crashing_its_worker_is_parked(tmp_path):
+    queue = WebhookQueue(str(tmp_path / 'webhooks.sqlite3'), max_attempts=2, lease_seconds=0.05)
+    queue.enqueue('delivery-1', 'pull_request', '{}')
+    assert queue.claim()['attempts'] == 1
+    time.sleep(0.06)
+    assert queue.claim()['attempts'] == 2
+    time.sleep(0.06)
+    assert queue.claim() is None
+    assert queue.stats() == {'failed': 1}
+
+
+def test_dispatcher_survives_database_errors(tmp_path):
+    queue = WebhookQueue(str(tmp_path / 'webhooks.sqlite3'))
+    service = FakeWebhookService()
+    dispatcher = WebhookDispatcher(queue, service, workers=1, poll_seconds=0.01)
+    claim = queue.claim
+    errors = [sqlite3.OperationalError('database is locked')]
+
+    def flaky_claim():
+        if errors:
+            raise errors.pop()
+        return claim()
+
+    queue.claim = flaky_claim
+
+    async def run():
+        dispatcher.start()
+        await asyncio.sleep(0.03)
+        dispatcher.submit('delivery-1', 'pull_request', b'{}')
+        await dispatcher.wait_idle(timeout=2)
+        stats = dispatcher.stats()
+        await dispatcher.close()
+        return stats
+
+    stats = asyncio.run(run())
+    assert service.processed == [('pull_request', {})]
+    assert stats['db_errors'] == 1
+
+
+def test_deferred_delivery_is_pushed_back_and_rerun(tmp_path):
+    queue = WebhookQueue(str(tmp_path / 'webhooks.sqlite3'))
+    assert queue.defer('auto-merge:1', 'auto_merge', '{"number": 1}', 0.05, 0.5) == 'scheduled'
+    assert queue.claim() is None
+    assert queue.defer('auto-merge:1', 'auto_merge', '{"number": 1}', 0.05, 0.5) == 'coalesced'
+    time.sleep(0.06)
+    delivery = queue.claim()
+    assert delivery['event'] == 'auto_merge'
+
+    # Triggered again mid-evaluation: evaluated once more after this run completes.
+    assert queue.defer('auto-merge:1', 'auto_merge', '{"number": 1}', 0.0, 0.5) == 'coalesced'
+    queue.complete('auto-merge:1')
+    assert queue.claim()['attempts'] == 1
+    queue.complete('auto-merge:1')
+    assert queue.outstanding('auto_merge') == 0
+    assert queue.defer('auto-merge:1', 'auto_merge', '{"number": 1}', 0.0, 0.5) == 'scheduled'
@@ -1,4 +1,9 @@
-from app.services.webhook_service import WebhookService
+import asyncio
+from contextlib import nullcontext
+
+from app.core.errors import GithubApiError
+from app.services.webhook_queue import WebhookDispatcher, WebhookQueue
+from app.services.webhook_service import MAX_ACTIONS_LISTINGS, WebhookService
 
 
 class FakeGithub:
@@ -7,25 +12,28 @@ class FakeGithub:
         self.base_ref = base_ref
         self.checks = checks or {
             'check_runs': [
-                {'status': 'completed', 'conclusion': 'success'}
+                {'id': 1, 'status': 'completed', 'conclusion': 'success'}
             ]
         }
         self.merged = False
 
-    def get_pull(self, owner, repo, pull_number):
+    def priority(self, level):
+        return nullcontext()
+
+    async def get_pull(self, owner, repo, pull_number):
         return {
             'state': self.pr_state,
             'base': {'ref': self.base_ref},
             'head': {'sha': 'abc123'},
         }
 
-    def get_check_runs(self, owner, repo, ref):
+    async def get_check_runs(self, owner, repo, ref):
         return self.checks
 
-    def approve_action_required_runs_for_sha(self, owner, repo, sha):
-        return None
+    async def approve_action_required_runs_for_sha(self, owner, repo, sha):
+        return {'listed': 1, 'approved': 0}
 
-    def merge_pull(self, owner, repo, pull_number, commit_title):
+    async def merge_pull(self, owner, repo, pull_number, commit_title, sha=None):
         self.merged = True
         return {'merged': True}
 
@@ -45,7 +53,7 @@ def test_auto_merge_when_checks_success():
         'pull_request': {'number': 1},
     }
 
-    result = svc.process('pull_request', payload)
+    result = asyncio.run(svc.process('pull_request', payload))
     assert result['processed'] is True
     assert gh.merged is True
 
@@ -60,7 +68,7 @@ def test_no_auto_merge_for_wrong_base_branch():
         'pull_request': {'number': 1},
     }
 
-    svc.process('pull_request', payload)
+    asyncio.run(svc.process('pull_request', payload))
     assert gh.merged is False
 
 
@@ -77,6 +85,240 @@ def test_signature_optional_when_secret_empty(monkeypatch):
 def test_evaluate_pull_calls_auto_merge_logic():
     gh = FakeGithub()
     svc = WebhookService(gh, FakeCache())
-    result = svc.evaluate_pull('SciLand-9', 'challenge-test-123', 1)
+    result = asyncio.run(svc.evaluate_pull('SciLand-9', 'challenge-test-123', 1))
     assert result['processed'] is True
     assert result['merged'] is True
+
+
+def test_repository_events_update_challenge_index():
+    from app.services.challenge_index import ChallengeIndex
+
+    index = ChallengeIndex()
+    service = WebhookService(FakeGithub(), FakeCache(), index=index)
+
+    def repo(name, description=''):
+        return {'name': name, 'description': description, 'html_url': f'https://github.com/SciLand-9/{name}', 'owner': {'login': 'SciLand-9'}}
+
+    async def run():
+        await service.process('repository', {'action': 'created', 'repository': repo('challenge-a')})
+        await service.process('repository', {'action': 'created', 'repository': repo('not-a-challenge')})
+        await service.process('repository', {'action': 'edited', 'repository': repo('challenge-a', 'SciLand challenge: A')})
+        await service.process(
+            'repository',
+            {'action': 'renamed', 'repository': repo('challenge-b'), 'changes': {'repository': {'name': {'from': 'challenge-a'}}}},
+        )
+        await service.process('repository', {'action': 'created', 'repository': repo('challenge-c')})
+        await service.process('repository', {'action': 'deleted', 'repository': repo('challenge-c')})
+
+    asyncio.run(run())
+    assert [item['challenge_id'] for item in index.items()] == ['challenge-b']
+
+
+class CountingGithub(FakeGithub):
+    def __init__(self):
+        super().__init__()
+        self.pull_reads = 0
+
+    async def get_pull(self, owner, repo, pull_number):
+        self.pull_reads += 1
+        return await super().get_pull(owner, repo, pull_number)
+
+
+REPOSITORY = {'name': 'challenge-test-123', 'owner': {'login': 'SciLand-9'}}
+
+
+def synchronize(sha):
+    return {'action': 'synchronize', 'repository': REPOSITORY, 'pull_request': {'number': 1, 'head': {'sha': sha}}}
+
+
+def completed(event, sha):
+    return {'action': 'completed', 'repository': REPOSITORY, event: {'head_sha': sha, 'pull_requests': [{'number': 1}]}}
+
+
+def test_ci_burst_is_coalesced_into_one_evaluation():
+    gh = CountingGithub()
+    svc = WebhookService(gh, FakeCache(), merge_debounce_seconds=0.02)
+
+    async def run():
+        await svc.process('pull_request', synchronize('abc123'))
+        for _ in range(5):
+            await svc.process('check_run', completed('check_run', 'abc123'))
+        await svc.process('check_suite', completed('check_suite', 'abc123'))
+        assert gh.pull_reads == 0
+        await svc.wait_merges()
+
+    asyncio.run(run())
+    assert gh.pull_reads == 1
+    assert gh.merged is True
+
+
+def test_failed_debounced_evaluation_is_retried_by_the_queue(tmp_path):
+    gh = CountingGithub()
+    queue = WebhookQueue(str(tmp_path / 'webhooks.sqlite3'), retry_seconds=0.01)
+    svc = WebhookService(gh, FakeCache(), merge_debounce_seconds=0.02, queue=queue)
+    dispatcher = WebhookDispatcher(queue, svc, workers=1, poll_seconds=0.01)
+    merge_pull = gh.merge_pull
+    failures = [GithubApiError('upstream error', status_code=502)]
+
+    async def flaky_merge(*args, **kwargs):
+        if failures:
+            raise failures.pop()
+        return await merge_pull(*args, **kwargs)
+
+    gh.merge_pull = flaky_merge
+
+    async def run():
+        dispatcher.start()
+        await svc.process('pull_request', synchronize('abc123'))
+        for _ in range(3):
+            await svc.process('check_run', completed('check_run', 'abc123'))
+        await svc.wait_merges()
+        await dispatcher.close()
+
+    asyncio.run(run())
+    assert gh.merged is True
+    assert dispatcher.stats()['retried'] == 1
+    assert queue.stats() == {'done': 1}
+
+
+def test_checks_for_superseded_head_are_ignored():
+    gh = CountingGithub()
+    svc = WebhookService(gh, FakeCache())
+
+    async def run():
+        await svc.process('pull_request', synchronize('old111'))
+        await svc.process('pull_request', synchronize('abc123'))
+        gh.merged = False
+        return await svc.process('check_run', completed('check_run', 'old111'))
+
+    result = asyncio.run(run())
+    assert result['merged'] is False
+    assert gh.pull_reads == 2
+
+
+class CheckCountingGithub(CountingGithub):
+    def __init__(self, checks):
+        super().__init__()
+        self.checks = {'check_runs': checks}
+        self.check_reads = 0
+
+    async def get_check_runs(self, owner, repo, ref):
+        self.check_reads += 1
+        return self.checks
+
+
+def check_run(check_id, name, status, conclusion=None):
+    return {'id': check_id, 'name': name, 'head_sha': 'abc123', 'status': status, 'conclusion': conclusion, 'pull_requests': [{'number': 1}]}
+
+
+SUBMISSION = {
+    'number': 1,
+    'title': 'submission',
+    'html_url': 'https://github.com/SciLand-9/challenge-test-123/pull/1',
+    'state': 'open',
+    'updated_at': '2026-01-01T00:00:00Z',
+    'base': {'ref': 'version/v1'},
+    'head': {'ref': 'submissions/1', 'sha': 'abc123'},
+}
+
+
+def test_merge_decision_comes_from_payloads_and_check_run_events():
+    gh = CheckCountingGithub([check_run(11, 'lint', 'queued'), check_run(12, 'test', 'in_progress')])
+    svc = WebhookService(gh, FakeCache())
+
+    async def run():
+        await svc.process('pull_request', {'action': 'synchronize', 'repository': REPOSITORY, 'pull_request': SUBMISSION})
+        assert gh.merged is False
+        await svc.process('check_run', {'action': 'completed', 'repository': REPOSITORY, 'check_run': check_run(11, 'lint', 'completed', 'success')})
+        # Still in progress according to the table; GitHub is not asked.
+        assert gh.check_reads == 1
+        gh.checks = {'check_runs': [check_run(11, 'lint', 'completed', 'success'), check_run(12, 'test', 'completed', 'success')]}
+        await svc.process('check_run', {'action': 'completed', 'repository': REPOSITORY, 'check_run': check_run(12, 'test', 'completed', 'success')})
+
+    asyncio.run(run())
+    assert gh.merged is True
+    assert gh.pull_reads == 0
+    # The seed, then one confirmation right before the merge.
+    assert gh.check_reads == 2
+
+
+def test_rerun_of_a_failed_check_replaces_it():
+    gh = CheckCountingGithub([check_run(1, 'test', 'completed', 'failure')])
+    svc = WebhookService(gh, FakeCache())
+
+    async def run():
+        await svc.process('pull_request', {'action': 'synchronize', 'repository': REPOSITORY, 'pull_request': SUBMISSION})
+        assert gh.merged is False
+        gh.checks = {'check_runs': [check_run(2, 'test', 'completed', 'success')]}
+        await svc.process('check_run', {'action': 'created', 'repository': REPOSITORY, 'check_run': check_run(2, 'test', 'queued')})
+        await svc.process('check_run', {'action': 'completed', 'repository': REPOSITORY, 'check_run': check_run(2, 'test', 'completed', 'success')})
+
+    asyncio.run(run())
+    assert gh.merged is True
+
+
+def test_runs_missing_from_the_table_block_the_merge():
+    gh = CheckCountingGithub([check_run(11, 'lint', 'in_progress')])
+    svc = WebhookService(gh, FakeCache())
+
+    async def run():
+        await svc.process('pull_request', {'action': 'synchronize', 'repository': REPOSITORY, 'pull_request': SUBMISSION})
+        # The `created` delivery for the `test` run never arrived.
+        gh.checks = {'check_runs': [check_run(11, 'lint', 'completed', 'success'), check_run(12, 'test', 'in_progress')]}
+        await svc.process('check_run', {'action': 'completed', 'repository': REPOSITORY, 'check_run': check_run(11, 'lint', 'completed', 'success')})
+
+    asyncio.run(run())
+    assert gh.merged is False
+
+
+def test_actions_runs_are_approved_from_workflow_run_events():
+    gh = FakeGithub()
+    gh.listings = 0
+    gh.approved = []
+
+    async def approve_action_required_runs_for_sha(owner, repo, sha):
+        gh.listings += 1
+        return {'listed': 1, 'approved': 0}
+
+    async def approve_actions_run(owner, repo, run_id):
+        gh.approved.append(run_id)
+        return True
+
+    async def get_pull_after_push(owner, repo, pull_number):
+        return {'state': 'open', 'base': {'ref': 'version/v1'}, 'head': {'sha': 'def456'}}
+
+    gh.approve_action_required_runs_for_sha = approve_action_required_runs_for_sha
+    gh.approve_actions_run = approve_actions_run
+    svc = WebhookService(gh, FakeCache())
+
+    async def run():
+        run = {'id': 42, 'head_sha': 'abc123', 'status': 'completed', 'conclusion': 'action_required'}
+        await svc.process('workflow_run', {'action': 'completed', 'repository': REPOSITORY, 'workflow_run': run})
+        await svc.evaluate_pull('SciLand-9', 'challenge-test-123', 1)
+        # Without workflow_run deliveries a commit is listed once, not on every evaluation.
+        gh.get_pull = get_pull_after_push
+        await svc.evaluate_pull('SciLand-9', 'challenge-test-123', 1)
+        await svc.evaluate_pull('SciLand-9', 'challenge-test-123', 1)
+
+    asyncio.run(run())
+    assert gh.approved == [42]
+    assert gh.listings == 1
+
+
+def test_commit_without_runs_yet_is_listed_again_a_bounded_number_of_times():
+    gh = FakeGithub()
+    gh.listings = 0
+
+    async def approve_action_required_runs_for_sha(owner, repo, sha):
+        gh.listings += 1
+        return {'listed': 0, 'approved': 0}
+
+    gh.approve_action_required_runs_for_sha = approve_action_required_runs_for_sha
+    svc = WebhookService(gh, FakeCache())
+
+    async def run():
+        for _ in range(MAX_ACTIONS_LISTINGS + 2):
+            await svc.evaluate_pull('SciLand-9', 'challenge-test-123', 1)
+
+    asyncio.run(run())
+    assert gh.listings == MAX_ACTIONS_LISTINGS